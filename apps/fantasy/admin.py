@@ -7,8 +7,11 @@ from .models import (
     FantasyLeague,
     FantasyPlayer,
     FantasyTeam,
+    FinalizationChunk,
+    GameweekStatusSnapshot,
     PlayerPerformance,
     PlayerTransfer,
+    TeamGameweekScore,
     TeamSelection,
 )
 
@@ -185,6 +188,58 @@ class PlayerTransferAdmin(admin.ModelAdmin):
     transfer_cost_display.short_description = "Cost"
 
 
+@admin.register(TeamGameweekScore)
+class TeamGameweekScoreAdmin(admin.ModelAdmin):
+    list_display = (
+        "fantasy_team",
+        "gameweek_display",
+        "points",
+        "captain_bonus",
+        "chip_points",
+        "total_points",
+        "rank",
+    )
+    list_filter = ("gameweek",)
+    search_fields = ("fantasy_team__name", "fantasy_team__user__username")
+    readonly_fields = ("id", "created_at", "updated_at")
+
+    def gameweek_display(self, obj):
+        return f"GW {obj.gameweek.number}"
+
+    gameweek_display.short_description = "Gameweek"
+
+
+@admin.register(FinalizationChunk)
+class FinalizationChunkAdmin(admin.ModelAdmin):
+    list_display = (
+        "gameweek_display",
+        "start_pkid",
+        "end_pkid",
+        "finalized",
+        "created_from_previous",
+        "skipped",
+        "completed_at",
+    )
+    list_filter = ("gameweek",)
+    readonly_fields = ("id", "created_at", "updated_at")
+
+    def gameweek_display(self, obj):
+        return f"GW {obj.gameweek.number}"
+
+    gameweek_display.short_description = "Gameweek"
+
+
+@admin.register(GameweekStatusSnapshot)
+class GameweekStatusSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("gameweek_display", "version", "updated_at")
+    readonly_fields = ("id", "version", "fixtures", "summary", "created_at", "updated_at")
+
+    def gameweek_display(self, obj):
+        return f"GW {obj.gameweek.number}"
+
+    gameweek_display.short_description = "Gameweek"
+
+
 @admin.register(FantasyLeague)
 class FantasyLeagueAdmin(admin.ModelAdmin):
     list_display = ("name", "commissioner_display", "gameweek_range", "teams_count")
@@ -0,0 +1,127 @@
+"""
+Compact encoding for cached API payloads.
+
+View caches used to pickle whole DRF ReturnDict/OrderedDict structures, which
+is slow to (un)pickle, bloats Redis, and has to be rendered to JSON again on
+every hit. EncodedPayload holds the rendered JSON bytes instead, compressed
+above COMPRESS_THRESHOLD, so a cache hit is written straight into the HTTP
+response: as-is when the client accepts the stored Content-Encoding, after a
+single decompression otherwise.
+
+JSON is rendered like the API's ORJSONRenderer (util.renderers.render_json).
+Payloads are compressed with zstd when the zstandard package is installed and
+gzip (stdlib) otherwise.
+"""
+
+import gzip
+from typing import Any, Optional
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from util.renderers import render_json
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESS_THRESHOLD = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+CONTENT_TYPE = "application/json"
+
+
+def _compress(body: bytes):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "zstd payload found but the zstandard package is not installed"
+            )
+        return zstandard.ZstdDecompressor().decompress(body)
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    return body
+
+
+def accepts_encoding(request, encoding: str) -> bool:
+    """Whether the request's Accept-Encoding allows the given content coding"""
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "") if request is not None else ""
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() != encoding:
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class EncodedPayload:
+    """Rendered JSON body of an API response, optionally compressed"""
+
+    __slots__ = ("body", "encoding", "empty")
+
+    def __init__(self, body: bytes, encoding: str = "", empty: bool = False):
+        self.body = body
+        self.encoding = encoding
+        # Whether the source data was empty, for get_or_fill's empty_timeout
+        self.empty = empty
+
+    def __getstate__(self):
+        return (self.body, self.encoding, self.empty)
+
+    def __setstate__(self, state):
+        self.body, self.encoding, self.empty = state
+
+    @classmethod
+    def encode(
+        cls, data: Any, threshold: int = COMPRESS_THRESHOLD
+    ) -> Optional["EncodedPayload"]:
+        """
+        Render and, above threshold bytes, compress data.
+
+        Returns:
+            EncodedPayload, or None if data is None
+        """
+        if data is None:
+            return None
+
+        body = render_json(data)
+        encoding = ""
+        if len(body) >= threshold:
+            compressed, compressed_encoding = _compress(body)
+            if len(compressed) < len(body):
+                body, encoding = compressed, compressed_encoding
+
+        empty = isinstance(data, (list, tuple, dict)) and not data
+        return cls(body, encoding, empty)
+
+    def decoded_body(self) -> bytes:
+        return _decompress(self.body, self.encoding)
+
+    def to_response(self, request=None, status: int = 200) -> HttpResponse:
+        """
+        HTTP response carrying the payload. The stored bytes are sent as they
+        are when the client accepts their encoding.
+        """
+        if self.encoding and accepts_encoding(request, self.encoding):
+            response = HttpResponse(self.body, content_type=CONTENT_TYPE, status=status)
+            response["Content-Encoding"] = self.encoding
+        else:
+            response = HttpResponse(
+                self.decoded_body(), content_type=CONTENT_TYPE, status=status
+            )
+        if self.encoding:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
@@ -5,11 +5,32 @@ Provides centralized caching functions and decorators to improve performance
 and ensure consistent cache key generation and invalidation.
 """
 
+from contextlib import contextmanager
 from django.core.cache import cache
+from django.db import connection, transaction
 from functools import wraps
 import hashlib
 import json
-from typing import Any, Callable, List
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from redis.exceptions import LockError
+
+from .cache_codec import EncodedPayload
+
+logger = logging.getLogger(__name__)
+
+# Tag sets outlive the entries registered in them; stale members are harmless
+TAG_PREFIX = "cache_tag:"
+TAG_TIMEOUT = 60 * 60 * 24 * 7
+
+_invalidation_state = threading.local()
+
+# Entries written by get_or_fill are (FILL_MARKER, fresh_until, value) envelopes,
+# so a cached None or empty result is told apart from a miss
+FILL_MARKER = "__cache_fill__"
 
 
 def cache_key(*args, **kwargs) -> str:
@@ -67,9 +88,173 @@ def invalidate_player_cache(player_id: str) -> None:
     cache.delete_many([
         f'player_{player_id}',
         f'player_performances_{player_id}',
-        'goals_leaderboard',
-        'players_list_*',  # Pattern - will need manual clearing
     ])
+    invalidate_tags('players', 'goals_leaderboard')
+
+
+def _is_empty(value: Any) -> bool:
+    if isinstance(value, EncodedPayload):
+        return value.empty
+    return value is None or (isinstance(value, (list, tuple, dict, set)) and not value)
+
+
+def _open_envelope(raw: Any):
+    """(fresh_until, value) of a get_or_fill entry, or None for a miss"""
+    if isinstance(raw, tuple) and len(raw) == 3 and raw[0] == FILL_MARKER:
+        return raw[1], raw[2]
+    return None
+
+
+class _UnlockedFill:
+    """Stand-in lock for cache backends without cache.lock"""
+
+    def release(self) -> None:
+        pass
+
+
+def _acquire_fill_lock(key: str, lock_timeout: int):
+    # SET NX with a random token: only one worker gets the lock
+    try:
+        lock = cache.lock(f"{key}:fill_lock", timeout=lock_timeout)
+    except AttributeError:
+        # cache.lock only exists on django-redis; other backends
+        # (locmem in tests, memcached) fill without single-flight
+        return _UnlockedFill()
+    return lock if lock.acquire(blocking=False) else None
+
+
+def _release_fill_lock(lock) -> None:
+    # Compare-and-delete in a Lua script, so a lock that expired and was taken
+    # by another worker is left alone
+    try:
+        lock.release()
+    except LockError:
+        pass
+
+
+def get_or_fill(
+    key: str,
+    callback: Callable,
+    timeout: int = 300,
+    grace: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+    empty_timeout: Optional[int] = None,
+    lock_timeout: int = 30,
+    wait: float = 5.0,
+) -> Any:
+    """
+    Get a value from cache, filling it from callback with a single worker.
+
+    Entries are fresh for `timeout` seconds and kept for `grace` seconds more.
+    Once stale, the first request takes a per-key lock (SET NX) and recomputes
+    while every other request is served the stale value. On a hard miss the
+    lock holder computes and the others wait up to `wait` seconds for its
+    result, instead of all hitting the database at once. None and empty
+    results are cached like any other value.
+
+    Args:
+        key: Cache key
+        callback: Function computing the value on a miss
+        timeout: Seconds the value is fresh (soft TTL)
+        grace: Extra seconds a stale value may be served (default: half of timeout)
+        tags: Optional tags to register the entry under (see set_tagged)
+        empty_timeout: Soft TTL for None/empty results, if different
+        lock_timeout: Seconds before an abandoned fill lock expires
+        wait: Seconds to wait for another worker's fill on a hard miss
+
+    Returns:
+        Cached or freshly computed value
+
+    Example:
+        data = get_or_fill(
+            f'standings_list_page_{page}', build_page, timeout=86400, tags=['standings']
+        )
+    """
+    if grace is None:
+        grace = max(30, timeout // 2)
+
+    try:
+        cached = _open_envelope(cache.get(key))
+    except Exception as e:
+        logger.error(f"Error reading cache key {key}: {e}")
+        return callback()
+
+    if cached and time.time() < cached[0]:
+        return cached[1]
+
+    lock = _acquire_fill_lock(key, lock_timeout)
+    if lock:
+        try:
+            try:
+                value = callback()
+            except Exception:
+                if cached:
+                    logger.error(
+                        f"Refreshing cache key {key} failed, serving stale value",
+                        exc_info=True,
+                    )
+                    return cached[1]
+                raise
+
+            # Stored before the lock is released, so the next lock holder
+            # finds the fresh value instead of recomputing it
+            fresh_for = timeout
+            if empty_timeout is not None and _is_empty(value):
+                fresh_for = empty_timeout
+            envelope = (FILL_MARKER, time.time() + fresh_for, value)
+            if tags:
+                set_tagged(key, envelope, fresh_for + grace, tags)
+            else:
+                cache.set(key, envelope, fresh_for + grace)
+            return value
+        finally:
+            _release_fill_lock(lock)
+
+    if cached:
+        # Another worker is refreshing
+        return cached[1]
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        cached = _open_envelope(cache.get(key))
+        if cached:
+            return cached[1]
+
+    # The filling worker is slow or gone; compute without storing
+    return callback()
+
+
+def get_or_fill_response(
+    request, key: str, callback: Callable, timeout: int = 300, **kwargs
+):
+    """
+    Cached JSON response for an API view.
+
+    Like get_or_fill, but the callback's data is stored as an EncodedPayload
+    (rendered, compressed JSON) and hits are written into the response without
+    unpickling or re-rendering the data.
+
+    Args:
+        request: The request, used for content-encoding negotiation
+        key: Cache key
+        callback: Function returning the response data, or None
+        timeout: Seconds the value is fresh
+        **kwargs: Passed on to get_or_fill (tags, empty_timeout, ...)
+
+    Returns:
+        HttpResponse, or None if the callback returned None
+
+    Example:
+        response = get_or_fill_response(
+            request, f'standings_list_page_{page}', build_page, 86400,
+            tags=['standings'],
+        )
+    """
+    payload = get_or_fill(
+        key, lambda: EncodedPayload.encode(callback()), timeout, **kwargs
+    )
+    return payload.to_response(request) if payload is not None else None
 
 
 def cache_queryset(timeout: int = 300, key_prefix: str = '') -> Callable:
@@ -92,11 +277,7 @@ def cache_queryset(timeout: int = 300, key_prefix: str = '') -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             cache_key_str = f"{key_prefix}:{cache_key(*args, **kwargs)}"
-            result = cache.get(cache_key_str)
-            if result is None:
-                result = func(*args, **kwargs)
-                cache.set(cache_key_str, result, timeout)
-            return result
+            return get_or_fill(cache_key_str, lambda: func(*args, **kwargs), timeout)
         return wrapper
     return decorator
 
@@ -105,6 +286,8 @@ def get_or_set_cache(key: str, callback: Callable, timeout: int = 300) -> Any:
     """
     Get value from cache or set it using callback.
     
+    Single-flight and stale-while-revalidate, see get_or_fill.
+
     Args:
         key: Cache key
         callback: Function to call if cache miss
@@ -120,18 +303,17 @@ def get_or_set_cache(key: str, callback: Callable, timeout: int = 300) -> Any:
             timeout=3600
         )
     """
-    result = cache.get(key)
-    if result is None:
-        result = callback()
-        cache.set(key, result, timeout)
-    return result
+    return get_or_fill(key, callback, timeout)
 
 
 def clear_pattern_cache(pattern: str) -> int:
     """
     Clear all cache keys matching a pattern.
     
-    Note: This requires Redis as the cache backend.
+    Walks the keyspace incrementally with SCAN (django-redis delete_pattern),
+    so it does not block Redis like KEYS, but it is still proportional to the
+    whole keyspace. Prefer tagging entries with set_tagged() and clearing them
+    with invalidate_tags().
     
     Args:
         pattern: Pattern to match (e.g., 'players_list_*')
@@ -139,13 +321,124 @@ def clear_pattern_cache(pattern: str) -> int:
     Returns:
         Number of keys deleted
     """
+    try:
+        return cache.delete_pattern(pattern, itersize=500) or 0
+    except AttributeError:
+        # Cache backend without pattern support
+        return 0
+
+
+def _tag_key(tag: str) -> str:
+    return cache.make_key(f"{TAG_PREFIX}{tag}")
+
+
+def set_tagged(
+    key: str, value: Any, timeout: Optional[int], tags: Iterable[str]
+) -> None:
+    """
+    Cache a value and register its key under each tag.
+
+    Tags are Redis sets of full cache keys, so invalidating a tag deletes
+    exactly the entries registered under it, without scanning the keyspace.
+
+    Args:
+        key: Cache key
+        value: Value to cache
+        timeout: Cache timeout in seconds
+        tags: Tags the entry belongs to, e.g. 'players' or 'standings'
+
+    Example:
+        set_tagged(f'players_list_team_{team_id}_page_{page}', data, 14400, ['players'])
+    """
+    cache.set(key, value, timeout)
     try:
         from django_redis import get_redis_connection
         conn = get_redis_connection("default")
-        keys = conn.keys(pattern)
-        if keys:
-            return conn.delete(*keys)
+        pipe = conn.pipeline(transaction=False)
+        full_key = cache.make_key(key)
+        for tag in tags:
+            pipe.sadd(_tag_key(tag), full_key)
+            pipe.expire(_tag_key(tag), TAG_TIMEOUT)
+        pipe.execute()
+    except Exception as e:
+        # An untagged entry still expires with its timeout
+        logger.error(f"Error tagging cache key {key}: {e}")
+
+
+def _pending_tags() -> set:
+    if not hasattr(_invalidation_state, 'pending'):
+        _invalidation_state.pending = set()
+        _invalidation_state.depth = 0
+    return _invalidation_state.pending
+
+
+def _flush_tags() -> int:
+    """Delete every entry registered under the pending tags, and the tag sets"""
+    pending = _pending_tags()
+    if not pending:
         return 0
-    except ImportError:
-        # Fallback if django-redis is not available
+    tags = list(pending)
+    pending.clear()
+
+    try:
+        from django_redis import get_redis_connection
+        conn = get_redis_connection("default")
+        pipe = conn.pipeline(transaction=False)
+        for tag in tags:
+            pipe.smembers(_tag_key(tag))
+        keys = set()
+        for members in pipe.execute():
+            keys.update(members)
+        keys.update(_tag_key(tag) for tag in tags)
+        return conn.delete(*keys)
+    except Exception as e:
+        logger.error(f"Error invalidating cache tags {tags}: {e}")
         return 0
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Invalidate every cache entry registered under the given tags.
+
+    Inside a transaction the invalidation runs once after commit, however many
+    times it is requested; inside coalesce_invalidations() it runs when the
+    outermost block exits. Otherwise it runs immediately.
+
+    Args:
+        *tags: Tags to invalidate
+    """
+    _pending_tags().update(tags)
+    if _invalidation_state.depth:
+        return
+    if connection.in_atomic_block:
+        # Later callbacks in the same transaction find nothing pending
+        transaction.on_commit(_flush_tags)
+    else:
+        _flush_tags()
+
+
+@contextmanager
+def coalesce_invalidations():
+    """
+    Defer tag invalidations until the block exits and run them once.
+
+    Usable as a context manager or decorator around bulk writes such as the
+    player and standings scrapers, which save rows one at a time and would
+    otherwise invalidate on every save.
+
+    Example:
+        with coalesce_invalidations():
+            for row in rows:
+                Player.objects.update_or_create(...)
+    """
+    _pending_tags()
+    _invalidation_state.depth += 1
+    try:
+        yield
+    finally:
+        _invalidation_state.depth -= 1
+        if not _invalidation_state.depth and _invalidation_state.pending:
+            if connection.in_atomic_block:
+                transaction.on_commit(_flush_tags)
+            else:
+                _flush_tags()
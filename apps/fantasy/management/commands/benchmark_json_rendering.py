@@ -0,0 +1,142 @@
+"""
+Django management command to benchmark the orjson renderer and parser against DRF's
+"""
+
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.fantasy.models import FantasyTeam
+from apps.fantasy.serializers import FantasyTeamSerializer
+from apps.kpl.models import Fixture, Player
+from apps.kpl.serializers import FixtureSerializer, PlayerSerializer
+from util import renderers
+from util.parsers import ORJSONParser
+from util.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ORJSONRenderer/ORJSONParser against DRF's "
+        "JSONRenderer/JSONParser on real API payloads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            help="Number of times each payload is rendered and parsed",
+            default=500,
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            help="Players per page, as served by the player list",
+            default=30,
+        )
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError(
+                "orjson is not installed; "
+                "ORJSONRenderer would fall back to JSONRenderer"
+            )
+
+        payloads = self._build_payloads(options["page_size"])
+        if not payloads:
+            raise CommandError(
+                "No players, fixtures or fantasy teams to build payloads from"
+            )
+
+        iterations = options["iterations"]
+        self.stdout.write(f"{iterations} iterations per payload")
+        for label, data in payloads:
+            expected = JSONRenderer().render(data)
+            rendered = ORJSONRenderer().render(data)
+            if json.loads(rendered) != json.loads(expected):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{label}: output is not equivalent to JSONRenderer's"
+                    )
+                )
+
+            drf_render = self._time(iterations, lambda: JSONRenderer().render(data))
+            fast_render = self._time(iterations, lambda: ORJSONRenderer().render(data))
+            drf_parse = self._time(
+                iterations, lambda: JSONParser().parse(io.BytesIO(expected))
+            )
+            fast_parse = self._time(
+                iterations, lambda: ORJSONParser().parse(io.BytesIO(expected))
+            )
+
+            self.stdout.write(f"{label} ({len(expected) / 1024:.1f} KB)")
+            self._report("render", drf_render, fast_render, iterations)
+            self._report("parse", drf_parse, fast_parse, iterations)
+
+    def _build_payloads(self, page_size):
+        """(label, serialized data) for the player list, fixture list and user team"""
+        payloads = []
+
+        players = list(
+            Player.objects.select_related("team").order_by("team__name", "name")[
+                :page_size
+            ]
+        )
+        if players:
+            payloads.append(
+                (
+                    f"players page ({len(players)})",
+                    {
+                        "count": Player.objects.count(),
+                        "next": None,
+                        "previous": None,
+                        "results": PlayerSerializer(players, many=True).data,
+                    },
+                )
+            )
+
+        fixtures = list(
+            Fixture.objects.select_related(
+                "gameweek", "home_team", "away_team"
+            ).order_by("-match_date")[:50]
+        )
+        if fixtures:
+            payloads.append(
+                (
+                    f"fixtures ({len(fixtures)})",
+                    FixtureSerializer(fixtures, many=True).data,
+                )
+            )
+
+        team = (
+            FantasyTeam.objects.select_related("user").order_by("-total_points").first()
+        )
+        if team:
+            payloads.append(
+                (
+                    "user team",
+                    FantasyTeamSerializer(
+                        [team], many=True, context={"requested_gameweek": None}
+                    ).data,
+                )
+            )
+
+        return payloads
+
+    @staticmethod
+    def _time(iterations, func):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return time.perf_counter() - started
+
+    def _report(self, label, baseline, elapsed, iterations):
+        speedup = baseline / elapsed if elapsed else float("inf")
+        self.stdout.write(
+            f"  {label}: DRF {baseline / iterations * 1e6:.1f}us, "
+            f"orjson {elapsed / iterations * 1e6:.1f}us ({speedup:.1f}x)"
+        )
@@ -0,0 +1,141 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.fantasy.models import FantasyTeam, PlayerPerformance
+from apps.fantasy.services.leaderboard import LeaderboardService
+from apps.fantasy.services.scoring import ScoringEngine
+from apps.fantasy.services.scoring_rules import RULE_SETS, get_rules
+from apps.fantasy.services.team_service import TeamOfTheWeekService
+from apps.fantasy.services.team_summary import TeamSummaryCache
+from apps.kpl.models import Gameweek
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescore every PlayerPerformance with a scoring rule set "
+        "and rebuild team totals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rules",
+            type=str,
+            help=f"Scoring rules version (available: {', '.join(sorted(RULE_SETS))})",
+            default=None,
+        )
+        parser.add_argument(
+            "--from-gameweek",
+            type=int,
+            help="First gameweek number to rescore",
+            default=None,
+        )
+        parser.add_argument(
+            "--to-gameweek",
+            type=int,
+            help="Last gameweek number to rescore",
+            default=None,
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help=(
+                "Rows fetched per cursor round trip and written per bulk update "
+                "when rebuilding totals and ranks"
+            ),
+            default=5000,
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show which team totals would change without saving anything",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            help="Maximum number of changed teams to list",
+            default=50,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            rules = get_rules(options["rules"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        dry_run = options["dry_run"]
+        chunk_size = options["chunk_size"]
+
+        performances = PlayerPerformance.objects.all()
+        gameweeks = Gameweek.objects.order_by("number")
+        if options["from_gameweek"] is not None:
+            performances = performances.filter(
+                gameweek__number__gte=options["from_gameweek"]
+            )
+        if options["to_gameweek"] is not None:
+            performances = performances.filter(
+                gameweek__number__lte=options["to_gameweek"]
+            )
+
+        self.stdout.write(
+            self.style.WARNING(
+                f"Rescoring with rules {rules.VERSION}{' (dry run)' if dry_run else ''}"
+            )
+        )
+
+        old_totals = dict(FantasyTeam.objects.values_list("pkid", "total_points"))
+
+        with transaction.atomic():
+            started = time.monotonic()
+            # One UPDATE per position; see ScoringRules.rescore
+            scanned = performances.count()
+            changed = rules.rescore(performances)
+            elapsed = time.monotonic() - started
+            rate = scanned / elapsed if elapsed else scanned
+            self.stdout.write(
+                f"Rescored {scanned} performances in {elapsed:.2f}s "
+                f"({rate:,.0f} rows/s), {changed} changed"
+            )
+
+            started = time.monotonic()
+            # Totals are summed from the gameweek scores, so those are rewritten
+            # first, also on a dry run (rolled back below)
+            for gameweek in gameweeks:
+                ScoringEngine.write_gameweek_scores(gameweek, cumulative=False)
+                ScoringEngine.rank_gameweek(gameweek, chunk_size=chunk_size)
+            ScoringEngine.refresh_cumulative_totals(chunk_size=chunk_size)
+            ScoringEngine.refresh_totals()
+            self.stdout.write(
+                f"Rebuilt team totals in {time.monotonic() - started:.2f}s"
+            )
+
+            self._report_diff(old_totals, options["show"])
+
+            if dry_run:
+                transaction.set_rollback(True)
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS("Dry run complete, no changes saved"))
+            return
+
+        ScoringEngine.rank_overall(chunk_size=chunk_size)
+        LeaderboardService.reconcile()
+        TeamSummaryCache.invalidate_all()
+        for gameweek in gameweeks:
+            TeamOfTheWeekService.store_gameweek(gameweek)
+        TeamOfTheWeekService.store_season()
+        self.stdout.write(self.style.SUCCESS("Season rescored"))
+
+    def _report_diff(self, old_totals, limit):
+        new_totals = FantasyTeam.objects.values_list("pkid", "name", "total_points")
+        diffs = [
+            (name, old_totals.get(pkid, 0), total)
+            for pkid, name, total in new_totals
+            if old_totals.get(pkid, 0) != total
+        ]
+        diffs.sort(key=lambda diff: abs(diff[2] - diff[1]), reverse=True)
+
+        self.stdout.write(f"{len(diffs)} fantasy team totals changed")
+        for name, old, new in diffs[:limit]:
+            self.stdout.write(f"  {name}: {old} -> {new} ({new - old:+d})")
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.8 on 2026-10-18 07:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0019_topcorerdata"),
+        ("fantasy", "0015_populate_chips_for_existing_teams"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamGameweekScore",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("raw_points", models.IntegerField(default=0)),
+                ("captain_bonus", models.IntegerField(default=0)),
+                ("chip_points", models.IntegerField(default=0)),
+                ("transfer_hits", models.PositiveIntegerField(default=0)),
+                ("points", models.IntegerField(default=0)),
+                ("total_points", models.IntegerField(default=0)),
+                ("rank", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "fantasy_team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="gameweek_scores",
+                        to="fantasy.fantasyteam",
+                    ),
+                ),
+                (
+                    "gameweek",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="team_scores",
+                        to="kpl.gameweek",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Team Gameweek Score",
+                "verbose_name_plural": "Team Gameweek Scores",
+                "indexes": [
+                    models.Index(
+                        fields=["gameweek", "-points"],
+                        name="fantasy_tea_gamewee_3565cd_idx",
+                    ),
+                    models.Index(
+                        fields=["fantasy_team", "-points"],
+                        name="fantasy_tea_fantasy_2409d0_idx",
+                    ),
+                ],
+                "unique_together": {("fantasy_team", "gameweek")},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.8 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fantasy", "0016_teamgameweekscore"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fantasyteam",
+            name="previous_rank",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="fantasyteam",
+            index=models.Index(
+                fields=["-total_points"], name="fantasy_fan_total_p_00606a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fantasyteam",
+            index=models.Index(
+                fields=["overall_rank"], name="fantasy_fan_overall_6eb53d_idx"
+            ),
+        ),
+    ]
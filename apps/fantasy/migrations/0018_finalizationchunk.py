@@ -0,0 +1,59 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0019_topcorerdata"),
+        ("fantasy", "0017_fantasyteam_previous_rank"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FinalizationChunk",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("start_pkid", models.BigIntegerField()),
+                ("end_pkid", models.BigIntegerField()),
+                ("finalized", models.PositiveIntegerField(default=0)),
+                ("created_from_previous", models.PositiveIntegerField(default=0)),
+                ("skipped", models.PositiveIntegerField(default=0)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, default="")),
+                (
+                    "gameweek",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="finalization_chunks",
+                        to="kpl.gameweek",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Finalization Chunk",
+                "verbose_name_plural": "Finalization Chunks",
+                "indexes": [
+                    models.Index(
+                        fields=["gameweek", "completed_at"],
+                        name="fantasy_fin_gamewee_021868_idx",
+                    )
+                ],
+                "unique_together": {("gameweek", "start_pkid", "end_pkid")},
+            },
+        ),
+    ]
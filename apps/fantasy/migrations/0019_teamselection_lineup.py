@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fantasy", "0018_finalizationchunk"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teamselection",
+            name="lineup",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Lineup snapshot frozen at finalization",
+                null=True,
+            ),
+        ),
+    ]
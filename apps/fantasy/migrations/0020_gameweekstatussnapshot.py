@@ -0,0 +1,48 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0019_topcorerdata"),
+        ("fantasy", "0019_teamselection_lineup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameweekStatusSnapshot",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("fixtures", models.JSONField(default=dict)),
+                ("summary", models.JSONField(default=dict)),
+                (
+                    "gameweek",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_snapshot",
+                        to="kpl.gameweek",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Gameweek Status Snapshot",
+                "verbose_name_plural": "Gameweek Status Snapshots",
+            },
+        ),
+    ]
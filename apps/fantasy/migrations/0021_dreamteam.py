@@ -0,0 +1,66 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0019_topcorerdata"),
+        ("fantasy", "0020_gameweekstatussnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DreamTeam",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "formation",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("3-4-3", "3-4-3"),
+                            ("3-5-2", "3-5-2"),
+                            ("4-4-2", "4-4-2"),
+                            ("4-3-3", "4-3-3"),
+                            ("5-3-2", "5-3-2"),
+                            ("5-2-3", "5-2-3"),
+                            ("5-4-1", "5-4-1"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("total_points", models.IntegerField(default=0)),
+                ("complete", models.BooleanField(default=False)),
+                ("team", models.JSONField(default=dict)),
+                (
+                    "gameweek",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dream_team",
+                        to="kpl.gameweek",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Dream Team",
+                "verbose_name_plural": "Dream Teams",
+            },
+        ),
+    ]
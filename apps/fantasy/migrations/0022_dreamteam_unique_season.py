@@ -0,0 +1,34 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:41
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def remove_duplicate_season_dream_teams(apps, schema_editor):
+    """Keep only the most recently updated season dream team"""
+    DreamTeam = apps.get_model("fantasy", "DreamTeam")
+    season = DreamTeam.objects.filter(gameweek__isnull=True).order_by("-updated_at", "-pkid")
+    latest = season.values_list("pkid", flat=True).first()
+    if latest is not None:
+        season.exclude(pkid=latest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fantasy", "0021_dreamteam"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_season_dream_teams, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="dreamteam",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce(
+                    "gameweek", models.Value(0)
+                ),
+                condition=models.Q(("gameweek__isnull", True)),
+                name="unique_season_dream_team",
+            ),
+        ),
+    ]
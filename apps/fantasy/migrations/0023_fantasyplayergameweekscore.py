@@ -0,0 +1,55 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0020_playeralias_is_confirmed"),
+        ("fantasy", "0022_dreamteam_unique_season"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FantasyPlayerGameweekScore",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("points", models.IntegerField(default=0)),
+                (
+                    "fantasy_player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="gameweek_scores",
+                        to="fantasy.fantasyplayer",
+                    ),
+                ),
+                (
+                    "gameweek",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="fantasy_player_scores",
+                        to="kpl.gameweek",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fantasy Player Gameweek Score",
+                "verbose_name_plural": "Fantasy Player Gameweek Scores",
+                "unique_together": {("fantasy_player", "gameweek")},
+            },
+        ),
+    ]
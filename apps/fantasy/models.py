@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 
 from apps.kpl.models import Fixture, Gameweek, Player
 from util.models import TimeStampedUUIDModel
@@ -36,11 +38,16 @@ class FantasyTeam(TimeStampedUUIDModel):
     free_transfers = models.PositiveIntegerField(default=1)
     total_points = models.PositiveIntegerField(default=0)
     overall_rank = models.PositiveIntegerField(null=True, blank=True)
+    previous_rank = models.PositiveIntegerField(null=True, blank=True)
     transfer_budget = models.DecimalField(max_digits=6, decimal_places=2, default=0.00)
 
     class Meta:
         verbose_name = "Fantasy Team"
         verbose_name_plural = "Fantasy Teams"
+        indexes = [
+            models.Index(fields=['-total_points']),
+            models.Index(fields=['overall_rank']),
+        ]
 
     def __str__(self):
         return f"{self.name} (Owner: {self.user.username})"
@@ -244,6 +251,12 @@ class TeamSelection(TimeStampedUUIDModel):
         blank=True,
         help_text="Active chip for this gameweek (if any)"
     )
+    lineup = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Lineup snapshot frozen at finalization",
+    )
 
     class Meta:
         verbose_name = "Team Selection"
@@ -269,3 +282,137 @@ class TeamSelection(TimeStampedUUIDModel):
 
         if self.vice_captain not in self.starters.all():
             raise ValidationError("Vice-captain must be in starting lineup.")
+
+
+class TeamGameweekScore(TimeStampedUUIDModel):
+    fantasy_team = models.ForeignKey(
+        FantasyTeam, on_delete=models.CASCADE, related_name="gameweek_scores"
+    )
+    gameweek = models.ForeignKey(
+        Gameweek, on_delete=models.PROTECT, related_name="team_scores"
+    )
+    raw_points = models.IntegerField(default=0)
+    captain_bonus = models.IntegerField(default=0)
+    chip_points = models.IntegerField(default=0)
+    transfer_hits = models.PositiveIntegerField(default=0)
+    points = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Team Gameweek Score"
+        verbose_name_plural = "Team Gameweek Scores"
+        unique_together = ["fantasy_team", "gameweek"]
+        indexes = [
+            models.Index(fields=['gameweek', '-points']),
+            models.Index(fields=['fantasy_team', '-points']),
+        ]
+
+    def __str__(self):
+        return f"{self.fantasy_team.name} - GW{self.gameweek.number}: {self.points} pts (Total: {self.total_points})"
+
+
+class FantasyPlayerGameweekScore(TimeStampedUUIDModel):
+    """
+    Points a squad player earned for its fantasy team in one gameweek: its own
+    points as a starter (or on a Bench Boost bench) plus any captain bonus.
+    FantasyPlayer.total_points is the sum of these rows.
+    """
+
+    fantasy_player = models.ForeignKey(
+        FantasyPlayer, on_delete=models.CASCADE, related_name="gameweek_scores"
+    )
+    gameweek = models.ForeignKey(
+        Gameweek, on_delete=models.PROTECT, related_name="fantasy_player_scores"
+    )
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Fantasy Player Gameweek Score"
+        verbose_name_plural = "Fantasy Player Gameweek Scores"
+        unique_together = ["fantasy_player", "gameweek"]
+
+    def __str__(self):
+        return f"{self.fantasy_player} - GW{self.gameweek.number}: {self.points} pts"
+
+
+class FinalizationChunk(TimeStampedUUIDModel):
+    """Progress of one fantasy team pk range during gameweek finalization"""
+
+    gameweek = models.ForeignKey(
+        Gameweek, on_delete=models.CASCADE, related_name="finalization_chunks"
+    )
+    start_pkid = models.BigIntegerField()
+    end_pkid = models.BigIntegerField()
+    finalized = models.PositiveIntegerField(default=0)
+    created_from_previous = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Finalization Chunk"
+        verbose_name_plural = "Finalization Chunks"
+        unique_together = ["gameweek", "start_pkid", "end_pkid"]
+        indexes = [
+            models.Index(fields=['gameweek', 'completed_at']),
+        ]
+
+    def __str__(self):
+        state = "done" if self.completed_at else "pending"
+        return f"GW{self.gameweek.number} teams {self.start_pkid}-{self.end_pkid} ({state})"
+
+
+class GameweekStatusSnapshot(TimeStampedUUIDModel):
+    """Stored gameweek status, refreshed one fixture at a time by GameweekStatusService"""
+
+    gameweek = models.OneToOneField(
+        Gameweek, on_delete=models.CASCADE, related_name="status_snapshot"
+    )
+    version = models.PositiveIntegerField(default=0)
+    fixtures = models.JSONField(default=dict)
+    summary = models.JSONField(default=dict)
+
+    class Meta:
+        verbose_name = "Gameweek Status Snapshot"
+        verbose_name_plural = "Gameweek Status Snapshots"
+
+    def __str__(self):
+        return f"GW{self.gameweek.number} status v{self.version}"
+
+
+class DreamTeam(TimeStampedUUIDModel):
+    """
+    Highest scoring valid XI, stored by TeamOfTheWeekService. A row with a
+    gameweek is that gameweek's Team of the Week; the row without one is the
+    season dream team over aggregated points.
+    """
+
+    gameweek = models.OneToOneField(
+        Gameweek,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="dream_team",
+    )
+    formation = models.CharField(max_length=10, choices=FORMATION_CHOICES, blank=True)
+    total_points = models.IntegerField(default=0)
+    complete = models.BooleanField(default=False)
+    team = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            # The gameweek column is unique, but NULLs never collide, so the
+            # season row needs its own partial index
+            models.UniqueConstraint(
+                Coalesce("gameweek", Value(0)),
+                condition=Q(gameweek__isnull=True),
+                name="unique_season_dream_team",
+            ),
+        ]
+        verbose_name = "Dream Team"
+        verbose_name_plural = "Dream Teams"
+
+    def __str__(self):
+        scope = f"GW{self.gameweek.number}" if self.gameweek_id else "Season"
+        return f"{scope} dream team: {self.total_points} pts ({self.formation})"
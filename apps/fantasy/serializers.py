@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from apps.fantasy.models import FantasyPlayer, FantasyTeam, PlayerPerformance, TeamSelection, Chip
-from apps.kpl.models import Gameweek
-from django.db.models import Sum
+from apps.kpl.services.hot_objects import HotObjects
+from django.db.models import Manager, Max, Sum
 from decimal import Decimal
 import logging
 
+from .services.squad_points import SquadPointsLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +50,7 @@ class FantasyTeamSerializer(serializers.ModelSerializer):
             "user",
             "total_points",
             "overall_rank",
+            "previous_rank",
             "budget",
             "gameweek",
             "free_transfers",
@@ -63,7 +66,7 @@ class FantasyTeamSerializer(serializers.ModelSerializer):
 
     def get_gameweek(self, obj):
         if '_active_gameweek_cached' not in self.context:
-            self.context['_active_gameweek_cached'] = Gameweek.objects.filter(is_active=True).first()
+            self.context['_active_gameweek_cached'] = HotObjects.active_gameweek()
         active_gameweek = self.context.get('_active_gameweek_cached')
         return active_gameweek.number if active_gameweek else None
 
@@ -90,7 +93,7 @@ class FantasyTeamSerializer(serializers.ModelSerializer):
                 gameweek = requested_gameweek
             else:
                 if '_active_gameweek_cached' not in self.context:
-                    self.context['_active_gameweek_cached'] = Gameweek.objects.filter(is_active=True).first()
+                    self.context['_active_gameweek_cached'] = HotObjects.active_gameweek()
                 gameweek = self.context.get('_active_gameweek_cached')
             
             if not gameweek:
@@ -129,60 +132,25 @@ class FantasyTeamSerializer(serializers.ModelSerializer):
             fantasy_team=obj, gameweek=requested_gameweek
         ).exists()
 
-    def _get_points_for_gameweek(self, obj, gameweek, team_selection=None):
-        if team_selection is None:
-            team_selection = TeamSelection.objects.filter(
-                fantasy_team=obj, gameweek=gameweek
-            ).first()
-
-        if not team_selection:
-            return 0
-
-        starter_ids = team_selection.starters.values_list("player_id", flat=True)
-
-        total_points = (
-            PlayerPerformance.objects.filter(
-                player_id__in=starter_ids, gameweek=gameweek
-            ).aggregate(total=Sum("fantasy_points"))["total"]
-            or 0
+    def _get_points_for_gameweek(self, obj, gameweek):
+        points = (
+            obj.gameweek_scores.filter(gameweek=gameweek)
+            .values_list("points", flat=True)
+            .first()
         )
-
-        if team_selection.captain_id:
-            captain_performance = PlayerPerformance.objects.filter(
-                player_id=team_selection.captain.player_id,
-                gameweek=gameweek
-            ).first()
-            if captain_performance:
-                total_points += captain_performance.fantasy_points
-
-        return total_points
+        return points or 0
 
     def get_total_points(self, obj):
-        total = 0
-        team_selections = TeamSelection.objects.filter(
-            fantasy_team=obj
-        ).select_related("gameweek", "captain__player")
-
-        for selection in team_selections:
-            total += self._get_points_for_gameweek(obj, selection.gameweek, selection)
-
-        return total
+        latest_score = (
+            obj.gameweek_scores.order_by("-gameweek__number")
+            .values_list("total_points", flat=True)
+            .first()
+        )
+        return latest_score or 0
 
     def get_best_week(self, obj):
-        team_selections = TeamSelection.objects.filter(
-            fantasy_team=obj
-        ).select_related("gameweek", "captain__player")
-
-        best_gameweek = None
-        max_points = 0
-
-        for selection in team_selections:
-            gameweek_points = self._get_points_for_gameweek(obj, selection.gameweek, selection)
-            if gameweek_points > max_points:
-                max_points = gameweek_points
-                best_gameweek = selection.gameweek.number
-
-        return max_points if best_gameweek else None
+        best = obj.gameweek_scores.aggregate(best=Max("points"))["best"]
+        return best if best and best > 0 else None
 
     def to_representation(self, instance):
         """Add gameweek context to the response"""
@@ -194,7 +162,7 @@ class FantasyTeamSerializer(serializers.ModelSerializer):
             data['requested_gameweek_name'] = f"Gameweek {requested_gameweek.number}"
         else:
             if '_active_gameweek_cached' not in self.context:
-                self.context['_active_gameweek_cached'] = Gameweek.objects.filter(is_active=True).first()
+                self.context['_active_gameweek_cached'] = HotObjects.active_gameweek()
             active_gameweek = self.context.get('_active_gameweek_cached')
             if active_gameweek:
                 data['requested_gameweek'] = active_gameweek.number
@@ -252,91 +220,43 @@ class FantasyPlayerSerializer(serializers.ModelSerializer):
             "total_points_for_team",
         )
 
+    def _requested_gameweek(self):
+        requested_gameweek = self.context.get('requested_gameweek')
+        if requested_gameweek:
+            return requested_gameweek
+        if '_active_gameweek_cached' not in self.context:
+            self.context['_active_gameweek_cached'] = HotObjects.active_gameweek()
+        return self.context.get('_active_gameweek_cached')
+
+    def _squad_points(self, obj):
+        """
+        Point fields for obj, loaded once for every player being serialized
+        and kept in the shared context
+        """
+        points = self.context.get('squad_points')
+        if points is None or obj.pk not in points:
+            if isinstance(self.parent, serializers.ListSerializer) and self.parent.instance is not None:
+                players = self.parent.instance
+                if isinstance(players, Manager):
+                    players = players.all()
+            else:
+                players = [obj]
+            points = SquadPointsLoader.load(players, self._requested_gameweek())
+            self.context['squad_points'] = points
+        return points.get(obj.pk, {})
+
     def get_total_points(self, obj):
-        total = obj.player.performances.aggregate(total_points=Sum("fantasy_points"))[
-            "total_points"
-        ]
-        return total or 0
+        return self._squad_points(obj).get("total_points", 0)
 
     def get_total_points_for_team(self, obj):
-        team_selections = TeamSelection.objects.filter(
-            fantasy_team=obj.fantasy_team, starters=obj, is_finalized=True
-        ).values_list("gameweek_id", flat=True)
-
-        total = (
-            PlayerPerformance.objects.filter(
-                player=obj.player, gameweek_id__in=team_selections
-            ).aggregate(total=Sum("fantasy_points"))["total"]
-            or 0
-        )
-
-        captain_selections = TeamSelection.objects.filter(
-            fantasy_team=obj.fantasy_team, captain=obj, is_finalized=True
-        ).values_list("gameweek_id", flat=True)
-
-        captain_bonus = (
-            PlayerPerformance.objects.filter(
-                player=obj.player, gameweek_id__in=captain_selections
-            ).aggregate(total=Sum("fantasy_points"))["total"]
-            or 0
-        )
-
-        return total + captain_bonus
+        return self._squad_points(obj).get("total_points_for_team", 0)
 
     def get_current_value(self, obj):
         return obj.player.current_value
 
     def get_gameweek_points(self, obj):
         try:
-            requested_gameweek = self.context.get('requested_gameweek')
-            
-            if requested_gameweek:
-                gameweek = requested_gameweek
-            else:
-                if '_active_gameweek_cached' not in self.context:
-                    self.context['_active_gameweek_cached'] = Gameweek.objects.filter(is_active=True).first()
-                gameweek = self.context.get('_active_gameweek_cached')
-            
-            if not gameweek:
-                return None
-
-            team_selection = TeamSelection.objects.filter(
-                fantasy_team=obj.fantasy_team, gameweek=gameweek
-            ).prefetch_related('starters', 'bench').first()
-
-            if not team_selection:
-                return None
-
-            starter_ids = [s.id for s in team_selection.starters.all()]
-            bench_ids = [b.id for b in team_selection.bench.all()]
-            
-            is_starter = obj.id in starter_ids
-            is_bench = obj.id in bench_ids
-            
-            active_chip = team_selection.active_chip
-            is_bench_boost_active = active_chip == 'BB'
-            
-            if not is_starter:
-                if not (is_bench and is_bench_boost_active):
-                    return None
-
-            performance = obj.player.performances.filter(
-                gameweek=gameweek
-            ).first()
-
-            if not performance:
-                return None
-
-            points = performance.fantasy_points
-            
-            if is_starter and team_selection.captain_id == obj.id:
-                if active_chip == 'TC':
-                    points = points * 3
-                else:
-                    points = points * 2
-
-            return points
-
+            return self._squad_points(obj).get("gameweek_points")
         except Exception as e:
             logger.error(f"Error calculating gameweek points for player {obj}: {e}", exc_info=True)
             return None
@@ -0,0 +1,125 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .squad_validator import SquadValidator
+
+POSITIONS = ("GKP", "DEF", "MID", "FWD")
+
+
+class BestXISolver:
+    """
+    Exact maximum-points starting XI under the squad rules: one of the
+    SquadValidator formations and at most MAX_PER_CLUB players per club.
+
+    Dynamic programming over clubs. The state is the number of goalkeepers,
+    defenders, midfielders and forwards picked so far; each club adds the top k
+    players of each position for every split of at most MAX_PER_CLUB picks
+    (taking a player's weaker club-mate in the same position is never better).
+    With at most 288 states and a few dozen splits per club the search is
+    exhaustive and takes milliseconds.
+    """
+
+    MAX_PER_CLUB = SquadValidator.MAX_PER_CLUB
+    XI_SIZE = 11
+    CAPS = tuple(
+        max(formation[position] for formation in SquadValidator.FORMATIONS.values())
+        for position in POSITIONS
+    )
+    TARGETS = {
+        tuple(formation[position] for position in POSITIONS): name
+        for name, formation in SquadValidator.FORMATIONS.items()
+    }
+
+    @classmethod
+    def _splits(cls, available: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """Every (gkp, def, mid, fwd) pick count a single club can contribute"""
+        splits = []
+        for g in range(min(available[0], cls.CAPS[0]) + 1):
+            for d in range(min(available[1], cls.CAPS[1]) + 1):
+                for m in range(min(available[2], cls.CAPS[2]) + 1):
+                    for f in range(min(available[3], cls.CAPS[3]) + 1):
+                        if 0 < g + d + m + f <= cls.MAX_PER_CLUB:
+                            splits.append((g, d, m, f))
+        return splits
+
+    @classmethod
+    def solve(cls, candidates: Iterable[Dict]) -> Optional[Dict]:
+        """
+        Pick the best XI.
+
+        Args:
+            candidates: Dicts with at least "club", "position" and "points"
+
+        Returns:
+            Dict with the formation (None if no valid XI exists), total points,
+            complete flag and the chosen candidates ordered by position, or
+            None if there are no candidates. Without enough players for any
+            formation the largest, then highest scoring, partial XI is returned.
+        """
+        clubs: Dict = {}
+        for candidate in candidates:
+            if candidate["position"] not in POSITIONS:
+                continue
+            by_position = clubs.setdefault(
+                candidate["club"], {p: [] for p in POSITIONS}
+            )
+            by_position[candidate["position"]].append(candidate)
+        if not clubs:
+            return None
+
+        # Best candidates first; ties broken by name so results are stable
+        for by_position in clubs.values():
+            for players in by_position.values():
+                players.sort(key=lambda c: (-c["points"], str(c.get("name", ""))))
+
+        start = (0, 0, 0, 0)
+        best = {start: 0}
+        layers = []
+        for club in sorted(clubs, key=str):
+            by_position = clubs[club]
+            available = tuple(len(by_position[p]) for p in POSITIONS)
+            gains = {}
+            for split in cls._splits(available):
+                gains[split] = sum(
+                    c["points"]
+                    for position, count in zip(POSITIONS, split)
+                    for c in by_position[position][:count]
+                )
+
+            next_best = dict(best)
+            back = {}
+            for state, points in best.items():
+                for split, gain in gains.items():
+                    target = tuple(a + b for a, b in zip(state, split))
+                    if sum(target) > cls.XI_SIZE or any(
+                        count > cap for count, cap in zip(target, cls.CAPS)
+                    ):
+                        continue
+                    total = points + gain
+                    if target not in next_best or total > next_best[target]:
+                        next_best[target] = total
+                        back[target] = (state, split)
+            layers.append((club, back))
+            best = next_best
+
+        valid = [state for state in best if state in cls.TARGETS]
+        if valid:
+            final = max(valid, key=lambda state: best[state])
+        else:
+            final = max(best, key=lambda state: (sum(state), best[state]))
+
+        chosen = []
+        state = final
+        for club, back in reversed(layers):
+            if state not in back:
+                continue
+            state, split = back[state]
+            for position, count in zip(POSITIONS, split):
+                chosen.extend(clubs[club][position][:count])
+
+        chosen.sort(key=lambda c: (POSITIONS.index(c["position"]), -c["points"]))
+        return {
+            "formation": cls.TARGETS.get(final),
+            "total_points": best[final],
+            "complete": final in cls.TARGETS,
+            "players": chosen,
+        }
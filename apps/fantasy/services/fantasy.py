@@ -5,9 +5,11 @@ from django.db import transaction, models
 from django.utils import timezone
 
 from apps.accounts.models import User
-from apps.kpl.models import Player
+from apps.kpl.services.hot_objects import HotObjects
 
-from ..models import Chip, ChipType, FantasyPlayer, FantasyTeam, Gameweek, PlayerTransfer, TeamSelection
+from ..models import Chip, ChipType, FantasyPlayer, FantasyTeam, Gameweek, TeamSelection
+from .squad_validator import SquadValidator
+from .transfers import TransferPlanner
 
 
 class FantasyService:
@@ -42,7 +44,7 @@ class FantasyService:
         starting_eleven: dict,
         bench_players: list,
     ) -> dict:
-        current_gameweek = Gameweek.objects.filter(is_active=True).first()
+        current_gameweek = HotObjects.active_gameweek()
         if not current_gameweek:
             try:
                 current_gameweek = Gameweek.objects.get(number=1)
@@ -83,8 +85,8 @@ class FantasyService:
         else:
             target_gameweek = current_gameweek
 
-        FantasyService._validate_team_composition(
-            formation, fantasy_team, starting_eleven, bench_players
+        squad_players = SquadValidator.check(
+            formation, starting_eleven, bench_players, fantasy_team=fantasy_team
         )
 
         has_captain = False
@@ -154,50 +156,17 @@ class FantasyService:
                 player_data, is_starter=False
             )
 
-        num_transfers = 0
-        transfer_cost = 0
+        transfer_plan = TransferPlanner.plan(
+            fantasy_team,
+            all_player_ids,
+            squad_players,
+            is_first_team=is_first_team,
+        )
+        num_transfers = transfer_plan["num_transfers"]
+        transfer_cost = transfer_plan["hit_cost"]
 
         if not is_first_team:
-            current_player_ids = set(
-                str(fp.player.id) for fp in fantasy_team.players.all()
-            )
-            new_player_ids = set(str(pid) for pid in all_player_ids)
-            players_to_remove = current_player_ids - new_player_ids
-            players_to_add = new_player_ids - current_player_ids
-
-            num_transfers = len(players_to_remove)
-
-            free_transfers = fantasy_team.free_transfers
-            additional_transfers = max(0, num_transfers - free_transfers)
-            transfer_cost = additional_transfers * 4  # 4 points per additional transfer
-
-            if transfer_cost > float(fantasy_team.transfer_budget):
-                raise ValidationError(
-                    f"Insufficient transfer budget. Required: {transfer_cost}, Available: {fantasy_team.transfer_budget}"
-                )
-
-            # Handle transfers
-            for player_id_out in players_to_remove:
-                player_out = Player.objects.get(id=player_id_out)
-                player_in_id = players_to_add.pop() if players_to_add else None
-                player_in = (
-                    Player.objects.get(id=player_in_id) if player_in_id else None
-                )
-                transfer_cost_per_player = 4 if num_transfers > free_transfers else 0
-                PlayerTransfer.objects.create(
-                    fantasy_team=fantasy_team,
-                    player_out=player_out,
-                    player_in=player_in,
-                    gameweek=current_gameweek,
-                    transfer_cost=transfer_cost_per_player,
-                )
-
-            # Update transfer budget and free transfers
-            if num_transfers > free_transfers:
-                fantasy_team.transfer_budget -= transfer_cost
-                fantasy_team.free_transfers = 0
-            else:
-                fantasy_team.free_transfers -= num_transfers
+            TransferPlanner.apply(fantasy_team, transfer_plan, current_gameweek)
         else:
             # First team - just clear any existing players (shouldn't happen, but safety)
             fantasy_team.players.all().delete()
@@ -207,7 +176,7 @@ class FantasyService:
 
         existing_players = {
             str(fp.player.id): fp
-            for fp in fantasy_team.players.filter(player__id__in=all_player_ids)
+            for fp in fantasy_team.players.filter(player__id__in=all_player_ids).select_related("player")
         }
 
         players_to_create = []
@@ -223,18 +192,17 @@ class FantasyService:
                 players_to_bulk_update.append(fantasy_player)
             else:
                 # Create new player
-                try:
-                    player_instance = Player.objects.get(id=player_id)
-                    fantasy_player = FantasyPlayer(
-                        fantasy_team=fantasy_team,
-                        player=player_instance,
-                        total_points=0,
-                        gameweek_added=current_gameweek,
-                        **update_data,
-                    )
-                    players_to_create.append(fantasy_player)
-                except Player.DoesNotExist:
+                player_instance = squad_players.get(player_id_str)
+                if not player_instance:
                     continue
+                fantasy_player = FantasyPlayer(
+                    fantasy_team=fantasy_team,
+                    player=player_instance,
+                    total_points=0,
+                    gameweek_added=current_gameweek,
+                    **update_data,
+                )
+                players_to_create.append(fantasy_player)
 
         if players_to_create:
             FantasyPlayer.objects.bulk_create(players_to_create)
@@ -405,111 +373,3 @@ class FantasyService:
                 "current_value", player_data.get("price", 0)
             ),
         }
-
-    @staticmethod
-    def _validate_team_composition(
-        formation: str,
-        fantasy_team: FantasyTeam,
-        starting_eleven: dict,
-        bench_players: list,
-    ) -> None:
-        formation_map = {
-            "3-4-3": {"DEF": 3, "MID": 4, "FWD": 3, "GKP": 1},
-            "3-5-2": {"DEF": 3, "MID": 5, "FWD": 2, "GKP": 1},
-            "4-4-2": {"DEF": 4, "MID": 4, "FWD": 2, "GKP": 1},
-            "4-3-3": {"DEF": 4, "MID": 3, "FWD": 3, "GKP": 1},
-            "5-3-2": {"DEF": 5, "MID": 3, "FWD": 2, "GKP": 1},
-            "5-4-1": {"DEF": 5, "MID": 4, "FWD": 1, "GKP": 1},
-            "5-2-3": {"DEF": 5, "MID": 2, "FWD": 3, "GKP": 1},
-        }
-        bench_compositions = {
-            "3-4-3": {"DEF": 2, "MID": 1, "FWD": 0, "GKP": 1},
-            "3-5-2": {"DEF": 2, "MID": 0, "FWD": 1, "GKP": 1},
-            "4-4-2": {"DEF": 1, "MID": 1, "FWD": 1, "GKP": 1},
-            "4-3-3": {"DEF": 1, "MID": 2, "FWD": 0, "GKP": 1},
-            "5-3-2": {"DEF": 0, "MID": 2, "FWD": 1, "GKP": 1},
-            "5-4-1": {"DEF": 0, "MID": 1, "FWD": 2, "GKP": 1},
-            "5-2-3": {"DEF": 0, "MID": 3, "FWD": 0, "GKP": 1},
-        }
-
-        # Count starters
-        starter_counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0}
-        bench_counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0}
-
-        if starting_eleven.get("goalkeeper"):
-            starter_counts["GKP"] += 1
-        for position in ["defenders", "midfielders", "forwards"]:
-            pos_key = {"defenders": "DEF", "midfielders": "MID", "forwards": "FWD"}[
-                position
-            ]
-            starter_counts[pos_key] += len(starting_eleven.get(position, []))
-
-        for player_data in bench_players:
-            try:
-                player = Player.objects.get(
-                    id=player_data.get("player") or player_data.get("id")
-                )
-                bench_counts[player.position] += 1
-            except Player.DoesNotExist:
-                continue
-
-        # Validate starter formation
-        required_starters = formation_map[formation]
-        for pos, required_count in required_starters.items():
-            if starter_counts[pos] != required_count:
-                raise ValidationError(
-                    f"Formation {formation} requires {required_count} {pos} starters, you have {starter_counts[pos]}"
-                )
-
-        # Validate bench composition
-        required_bench = bench_compositions[formation]
-        for pos, required_count in required_bench.items():
-            if bench_counts[pos] != required_count:
-                raise ValidationError(
-                    f"Formation {formation} requires {required_count} {pos} bench players, you have {bench_counts[pos]}"
-                )
-
-        # Validate total squad size
-        total_players = sum(starter_counts.values()) + sum(bench_counts.values())
-        if total_players != 15:
-            raise ValidationError(
-                f"Squad must have exactly 15 players, you have {total_players}"
-            )
-
-        # Validate budget - only check initial budget (70.00), not current value
-        total_value = 0
-        for player_id in [
-            starting_eleven.get("goalkeeper", {}).get("player")
-            or starting_eleven.get("goalkeeper", {}).get("id")
-        ]:
-            if player_id:
-                try:
-                    total_value += float(Player.objects.get(id=player_id).current_value)
-                except Player.DoesNotExist:
-                    continue
-        for position in ["defenders", "midfielders", "forwards"]:
-            for player_data in starting_eleven.get(position, []):
-                try:
-                    total_value += float(
-                        Player.objects.get(
-                            id=player_data.get("player") or player_data.get("id")
-                        ).current_value
-                    )
-                except Player.DoesNotExist:
-                    continue
-        for player_data in bench_players:
-            try:
-                total_value += float(
-                    Player.objects.get(
-                        id=player_data.get("player") or player_data.get("id")
-                    ).current_value
-                )
-            except Player.DoesNotExist:
-                continue
-
-        has_existing_players = fantasy_team.players.exists()
-
-        if not has_existing_players and total_value > 70.00:
-            raise ValidationError(
-                f"Team value {total_value} exceeds initial budget of 70.00"
-            )
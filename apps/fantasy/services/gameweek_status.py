@@ -1,15 +1,71 @@
+import logging
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
 
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from apps.kpl.models import Fixture, FixtureLineup, Gameweek
+from apps.kpl.models import Fixture, Gameweek
+from apps.kpl.services.hot_objects import HotObjects
+
+from ..models import GameweekStatusSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Fixture fields that feed the stored status; saves touching only other fields are ignored
+STATUS_FIELDS = {"status", "home_team_score", "away_team_score", "match_date", "gameweek"}
+
+
+class FixtureState:
+    """A fixture as stored in the status snapshot, with the attributes the status helpers read"""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.id = entry["id"]
+        self.home_team = SimpleNamespace(name=entry["home_team"])
+        self.away_team = SimpleNamespace(name=entry["away_team"])
+        self.match_date = datetime.fromisoformat(entry["match_date"])
+        self.status = entry["status"]
+        self.home_team_score = entry["home_team_score"]
+        self.away_team_score = entry["away_team_score"]
+        self.home_lineup_confirmed = entry["home_lineup_confirmed"]
+        self.away_lineup_confirmed = entry["away_lineup_confirmed"]
+        self.home_formation = entry["home_formation"]
+        self.away_formation = entry["away_formation"]
+
+    @staticmethod
+    def entry(fixture: Fixture) -> Dict[str, Any]:
+        """Snapshot entry for a fixture loaded with its teams and prefetched lineups"""
+        lineups = {lineup.side: lineup for lineup in fixture.lineups.all()}
+        home_lineup = lineups.get("home")
+        away_lineup = lineups.get("away")
+        return {
+            "id": str(fixture.id),
+            "home_team": fixture.home_team.name,
+            "away_team": fixture.away_team.name,
+            "match_date": fixture.match_date.isoformat(),
+            "status": fixture.status,
+            "home_team_score": fixture.home_team_score,
+            "away_team_score": fixture.away_team_score,
+            "home_lineup_confirmed": home_lineup.is_confirmed if home_lineup else False,
+            "away_lineup_confirmed": away_lineup.is_confirmed if away_lineup else False,
+            "home_formation": home_lineup.formation if home_lineup else None,
+            "away_formation": away_lineup.formation if away_lineup else None,
+        }
 
 
 class GameweekStatusService:
     """
-    Comprehensive service for tracking gameweek status with real-time updates
+    Comprehensive service for tracking gameweek status with real-time updates.
+
+    The fixture-derived sections are persisted per gameweek in a
+    GameweekStatusSnapshot. When a fixture's status, score, date or lineup
+    changes only that fixture's entry is reloaded, the sections are recomputed
+    in memory and the snapshot version is bumped, so clients can poll the
+    version instead of the whole document. Time-dependent parts (overall
+    status, progress, live updates) are derived from the stored entries on read.
     """
 
     def get_comprehensive_gameweek_status(
@@ -18,13 +74,14 @@ class GameweekStatusService:
         """
         Get complete gameweek status with all interesting metrics
         """
-        gameweek = self._get_gameweek(gameweek_id)
+        gameweek, snapshot = self.get_snapshot(gameweek_id)
         if not gameweek:
             return {"error": "No active gameweek found"}
 
-        fixtures = self._get_gameweek_fixtures(gameweek)
+        fixtures = self._fixture_states(snapshot)
 
         return {
+            "version": snapshot.version,
             "gameweek": {
                 "number": gameweek.number,
                 "is_active": gameweek.is_active,
@@ -36,19 +93,101 @@ class GameweekStatusService:
                     gameweek, fixtures
                 ),
             },
+            **snapshot.summary,
+            "live_updates": self._get_live_updates(fixtures),
+        }
+
+    def get_snapshot(
+        self, gameweek_id: Optional[int] = None
+    ) -> Tuple[Optional[Gameweek], Optional[GameweekStatusSnapshot]]:
+        """The gameweek to report on and its stored snapshot, built on first use"""
+        gameweek = self._get_gameweek(gameweek_id)
+        if not gameweek:
+            return None, None
+
+        snapshot = GameweekStatusSnapshot.objects.filter(gameweek=gameweek).first()
+        if snapshot is None:
+            snapshot = self.rebuild(gameweek)
+        return gameweek, snapshot
+
+    def rebuild(self, gameweek: Gameweek) -> GameweekStatusSnapshot:
+        """Recompute a gameweek's snapshot from all of its fixtures"""
+        entries = {
+            str(fixture.pk): FixtureState.entry(fixture)
+            for fixture in self._get_gameweek_fixtures(gameweek)
+        }
+        with transaction.atomic():
+            snapshot, _ = GameweekStatusSnapshot.objects.select_for_update().get_or_create(
+                gameweek=gameweek
+            )
+            self._store(snapshot, gameweek, entries)
+        return snapshot
+
+    def refresh_fixture(self, fixture_pk) -> None:
+        """
+        Update the stored entry of one fixture in every snapshot it belongs to,
+        including the snapshot of a gameweek it was moved out of or deleted from.
+        Gameweeks without a snapshot yet are left to be built on first read.
+        """
+        try:
+            key = str(fixture_pk)
+            fixture = (
+                Fixture.objects.filter(pk=fixture_pk)
+                .select_related("home_team", "away_team", "gameweek")
+                .prefetch_related("lineups")
+                .first()
+            )
+            entry = FixtureState.entry(fixture) if fixture else None
+            gameweek_id = fixture.gameweek_id if fixture else None
+
+            affected = Q(fixtures__has_key=key)
+            if gameweek_id:
+                affected |= Q(gameweek_id=gameweek_id)
+
+            with transaction.atomic():
+                snapshots = (
+                    GameweekStatusSnapshot.objects.select_for_update(of=("self",))
+                    .select_related("gameweek")
+                    .filter(affected)
+                )
+                for snapshot in snapshots:
+                    entries = dict(snapshot.fixtures)
+                    if entry and snapshot.gameweek_id == gameweek_id:
+                        entries[key] = entry
+                    else:
+                        entries.pop(key, None)
+                    self._store(snapshot, snapshot.gameweek, entries)
+
+        except Exception as e:
+            logger.error(f"Error refreshing gameweek status for fixture {fixture_pk}: {e}")
+
+    def _store(
+        self, snapshot: GameweekStatusSnapshot, gameweek: Gameweek, entries: Dict[str, Dict]
+    ) -> None:
+        snapshot.fixtures = entries
+        fixtures = self._fixture_states(snapshot)
+        snapshot.summary = {
             "match_days": self._get_match_days_status(fixtures),
             "fixtures_summary": self._get_fixtures_summary(fixtures),
             "team_performance": self._get_team_performance_summary(fixtures),
             "interesting_stats": self._get_interesting_stats(gameweek, fixtures),
             "lineups_status": self._get_lineups_status(fixtures),
-            "live_updates": self._get_live_updates(fixtures),
         }
+        snapshot.version += 1
+        snapshot.save(update_fields=["fixtures", "summary", "version", "updated_at"])
+
+    @staticmethod
+    def _fixture_states(snapshot: GameweekStatusSnapshot) -> List[FixtureState]:
+        return sorted(
+            (FixtureState(entry) for entry in snapshot.fixtures.values()),
+            key=lambda f: (f.match_date, f.id),
+        )
 
     def _get_gameweek(self, gameweek_id: Optional[int] = None) -> Optional[Gameweek]:
         if gameweek_id:
             return Gameweek.objects.filter(id=gameweek_id).first()
 
-        gameweek = Gameweek.objects.filter(is_active=True).first()
+        gameweek = HotObjects.active_gameweek()
         if not gameweek:
             return None
 
@@ -56,7 +195,7 @@ class GameweekStatusService:
         start_date = gameweek.start_date
 
         if now < start_date and gameweek.number > 1:
-            return Gameweek.objects.filter(number=gameweek.number - 1).first()
+            return HotObjects.gameweek(gameweek.number - 1)
 
         return gameweek
 
@@ -68,7 +207,7 @@ class GameweekStatusService:
             .prefetch_related("lineups")
         )
 
-    def _get_gameweek_status(self, gameweek: Gameweek, fixtures: List[Fixture]) -> str:
+    def _get_gameweek_status(self, gameweek: Gameweek, fixtures: List[FixtureState]) -> str:
         """Determine the overall gameweek status"""
         now = timezone.now()
 
@@ -100,7 +239,7 @@ class GameweekStatusService:
         return "ACTIVE"
 
     def _calculate_progress_percentage(
-        self, gameweek: Gameweek, fixtures: List[Fixture]
+        self, gameweek: Gameweek, fixtures: List[FixtureState]
     ) -> int:
         """Calculate gameweek completion percentage (treat postponed as completed)"""
         if not fixtures:
@@ -111,7 +250,7 @@ class GameweekStatusService:
 
         return int(((completed + postponed) / len(fixtures)) * 100)
 
-    def _get_match_days_status(self, fixtures: List[Fixture]) -> List[Dict[str, Any]]:
+    def _get_match_days_status(self, fixtures: List[FixtureState]) -> List[Dict[str, Any]]:
         """Group fixtures by match day and get status for each day"""
         match_days = defaultdict(list)
 
@@ -161,7 +300,7 @@ class GameweekStatusService:
 
         return result
 
-    def _get_fixtures_summary(self, fixtures: List[Fixture]) -> Dict[str, Any]:
+    def _get_fixtures_summary(self, fixtures: List[FixtureState]) -> Dict[str, Any]:
         """Get summary statistics for all fixtures"""
         completed_fixtures = [f for f in fixtures if f.status == "completed"]
 
@@ -207,7 +346,7 @@ class GameweekStatusService:
             "highest_scoring": self._get_highest_scoring_match(completed_fixtures),
         }
 
-    def _get_team_performance_summary(self, fixtures: List[Fixture]) -> Dict[str, Any]:
+    def _get_team_performance_summary(self, fixtures: List[FixtureState]) -> Dict[str, Any]:
         """Analyze team performance in this gameweek"""
         completed_fixtures = [f for f in fixtures if f.status == "completed"]
         team_stats = defaultdict(
@@ -270,7 +409,7 @@ class GameweekStatusService:
         }
 
     def _get_interesting_stats(
-        self, gameweek: Gameweek, fixtures: List[Fixture]
+        self, gameweek: Gameweek, fixtures: List[FixtureState]
     ) -> List[Dict[str, Any]]:
         """Generate interesting statistics and facts"""
         stats = []
@@ -303,9 +442,9 @@ class GameweekStatusService:
         )
 
         # Lineup confirmations
-        lineups_confirmed = FixtureLineup.objects.filter(
-            fixture__in=fixtures, is_confirmed=True
-        ).count()
+        lineups_confirmed = sum(
+            int(f.home_lineup_confirmed) + int(f.away_lineup_confirmed) for f in fixtures
+        )
 
         stats.append(
             {
@@ -320,31 +459,21 @@ class GameweekStatusService:
 
         return stats
 
-    def _get_lineups_status(self, fixtures: List[Fixture]) -> Dict[str, Any]:
+    def _get_lineups_status(self, fixtures: List[FixtureState]) -> Dict[str, Any]:
         """Get lineup confirmation status"""
         lineup_data = []
 
         for fixture in fixtures:
-            lineups = FixtureLineup.objects.filter(fixture=fixture).select_related(
-                "team"
-            )
-            home_lineup = lineups.filter(side="home").first()
-            away_lineup = lineups.filter(side="away").first()
-
             lineup_data.append(
                 {
                     "fixture_id": fixture.id,
                     "home_team": fixture.home_team.name,
                     "away_team": fixture.away_team.name,
                     "match_date": fixture.match_date.isoformat(),
-                    "home_lineup_confirmed": (
-                        home_lineup.is_confirmed if home_lineup else False
-                    ),
-                    "away_lineup_confirmed": (
-                        away_lineup.is_confirmed if away_lineup else False
-                    ),
-                    "home_formation": home_lineup.formation if home_lineup else None,
-                    "away_formation": away_lineup.formation if away_lineup else None,
+                    "home_lineup_confirmed": fixture.home_lineup_confirmed,
+                    "away_lineup_confirmed": fixture.away_lineup_confirmed,
+                    "home_formation": fixture.home_formation,
+                    "away_formation": fixture.away_formation,
                     "status": fixture.status,
                 }
             )
@@ -364,7 +493,7 @@ class GameweekStatusService:
             "lineup_details": lineup_data,
         }
 
-    def _get_live_updates(self, fixtures: List[Fixture]) -> List[Dict[str, Any]]:
+    def _get_live_updates(self, fixtures: List[FixtureState]) -> List[Dict[str, Any]]:
         """Get live updates and notifications"""
         updates = []
         now = timezone.now()
@@ -419,7 +548,7 @@ class GameweekStatusService:
         return sorted(updates, key=lambda x: x["priority"], reverse=True)[:10]
 
     # Helper methods
-    def _get_biggest_win(self, fixtures: List[Fixture]) -> Optional[Dict[str, Any]]:
+    def _get_biggest_win(self, fixtures: List[FixtureState]) -> Optional[Dict[str, Any]]:
         """Find the biggest win margin"""
         if not fixtures:
             return None
@@ -445,7 +574,7 @@ class GameweekStatusService:
         return biggest_win
 
     def _get_highest_scoring_match(
-        self, fixtures: List[Fixture]
+        self, fixtures: List[FixtureState]
     ) -> Optional[Dict[str, Any]]:
         """Find the highest scoring match"""
         if not fixtures:
@@ -471,7 +600,7 @@ class GameweekStatusService:
 
         return highest_scoring
 
-    def _get_day_interesting_fact(self, day_fixtures: List[Fixture]) -> str:
+    def _get_day_interesting_fact(self, day_fixtures: List[FixtureState]) -> str:
         """Generate an interesting fact about the match day"""
         completed = [f for f in day_fixtures if f.status == "completed"]
 
@@ -495,7 +624,7 @@ class GameweekStatusService:
         """Compare statistics to the previous gameweek"""
         return "up"
 
-    def _get_additional_stats(self, fixtures: List[Fixture]) -> List[Dict[str, Any]]:
+    def _get_additional_stats(self, fixtures: List[FixtureState]) -> List[Dict[str, Any]]:
         """Get additional interesting statistics"""
         stats = []
         return stats
@@ -0,0 +1,305 @@
+import base64
+import binascii
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import F, Sum
+from django_redis import get_redis_connection
+
+from ..models import FantasyLeague, FantasyTeam, TeamGameweekScore
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardService:
+    """
+    Redis sorted-set leaderboards.
+
+    One sorted set holds every team's total points, and one per FantasyLeague
+    holds points scored inside the league's gameweek range. Members are fantasy
+    team pks. Sets are updated incrementally by the scoring pipeline and rebuilt
+    from the database by reconcile().
+    """
+
+    OVERALL_KEY = "leaderboard:overall"
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def league_key(league_pk) -> str:
+        return f"leaderboard:league:{league_pk}"
+
+    @staticmethod
+    def _league_scores(team_ids=None, league_ids=None) -> Dict:
+        """Map league pk -> {team pk: points within the league's gameweek range}"""
+        # Kept in a single filter() so every condition uses the same league join
+        conditions = {
+            "gameweek__number__gte": F("fantasy_team__leagues__start_gameweek"),
+            "gameweek__number__lte": F("fantasy_team__leagues__end_gameweek"),
+        }
+        if team_ids is not None:
+            conditions["fantasy_team_id__in"] = team_ids
+        if league_ids is not None:
+            conditions["fantasy_team__leagues__in"] = league_ids
+        scores = TeamGameweekScore.objects.filter(**conditions)
+
+        memberships = FantasyLeague.teams.through.objects.all()
+        if team_ids is not None:
+            memberships = memberships.filter(fantasyteam_id__in=team_ids)
+        if league_ids is not None:
+            memberships = memberships.filter(fantasyleague_id__in=league_ids)
+
+        leagues: Dict = {}
+        for league_id, team_id in memberships.values_list(
+            "fantasyleague_id", "fantasyteam_id"
+        ):
+            leagues.setdefault(league_id, {})[team_id] = 0
+
+        rows = (
+            scores.values("fantasy_team__leagues", "fantasy_team_id")
+            .annotate(total=Sum("points"))
+            .values_list("fantasy_team__leagues", "fantasy_team_id", "total")
+        )
+        for league_id, team_id, total in rows:
+            if league_id in leagues and team_id in leagues[league_id]:
+                leagues[league_id][team_id] = total or 0
+
+        return leagues
+
+    @classmethod
+    def update_teams(cls, team_ids: Optional[Iterable] = None) -> None:
+        """Push the current points of the given teams (all teams if None) into Redis"""
+        try:
+            teams = FantasyTeam.objects.all()
+            if team_ids is not None:
+                teams = teams.filter(pk__in=team_ids)
+                team_ids = list(teams.values_list("pk", flat=True))
+
+            overall = dict(teams.values_list("pk", "total_points"))
+            leagues = cls._league_scores(team_ids=team_ids)
+
+            redis_conn = get_redis_connection("default")
+            pipe = redis_conn.pipeline(transaction=False)
+            if overall:
+                pipe.zadd(cls.OVERALL_KEY, overall)
+            for league_id, members in leagues.items():
+                if members:
+                    pipe.zadd(cls.league_key(league_id), members)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating leaderboards: {e}")
+
+    @classmethod
+    def remove_league_members(cls, league: FantasyLeague, team_ids: Iterable) -> None:
+        team_ids = list(team_ids)
+        if not team_ids:
+            return
+        try:
+            get_redis_connection("default").zrem(cls.league_key(league.pk), *team_ids)
+        except Exception as e:
+            logger.error(
+                f"Error removing members from league {league.name} leaderboard: {e}"
+            )
+
+    @classmethod
+    def clear_league(cls, league: FantasyLeague) -> None:
+        try:
+            get_redis_connection("default").delete(cls.league_key(league.pk))
+        except Exception as e:
+            logger.error(f"Error clearing league {league.name} leaderboard: {e}")
+
+    @classmethod
+    def reconcile(cls) -> Dict:
+        """
+        Rebuild every leaderboard from the database. Each set is written to a
+        temporary key and swapped in with RENAME so readers never see a partial set.
+        """
+        redis_conn = get_redis_connection("default")
+
+        sets = {
+            cls.OVERALL_KEY: dict(FantasyTeam.objects.values_list("pk", "total_points"))
+        }
+        for league_id, members in cls._league_scores().items():
+            sets[cls.league_key(league_id)] = members
+
+        stale = set(redis_conn.scan_iter(match="leaderboard:league:*")) - {
+            key.encode() for key in sets
+        }
+
+        pipe = redis_conn.pipeline()
+        for key, members in sets.items():
+            if not members:
+                pipe.delete(key)
+                continue
+            tmp_key = f"{key}:rebuild"
+            pipe.delete(tmp_key)
+            pipe.zadd(tmp_key, members)
+            pipe.rename(tmp_key, key)
+        if stale:
+            pipe.delete(*stale)
+        pipe.execute()
+
+        logger.info(f"Reconciled {len(sets)} leaderboards")
+        return {"leaderboards": len(sets), "removed": len(stale)}
+
+    @staticmethod
+    def _serialize(entries: List, ranks: Dict) -> List[Dict]:
+        """Attach team details and competition ranks to (member, score) pairs"""
+        teams = FantasyTeam.objects.select_related("user").in_bulk(
+            [int(member) for member, _ in entries]
+        )
+
+        results = []
+        for member, score in entries:
+            team = teams.get(int(member))
+            if not team:
+                continue
+            results.append(
+                {
+                    "rank": ranks[score],
+                    "team_id": str(team.id),
+                    "team_name": team.name,
+                    "manager": team.user.username,
+                    "points": int(score),
+                }
+            )
+        return results
+
+    @classmethod
+    def _rank_entries(cls, redis_conn, key: str, entries: List) -> List[Dict]:
+        if not entries:
+            return []
+        # A page can start or end inside a run of tied scores, so each
+        # distinct score is ranked by the number of teams above it
+        scores = list(dict.fromkeys(score for _, score in entries))
+        pipe = redis_conn.pipeline(transaction=False)
+        for score in scores:
+            pipe.zcount(key, f"({score}", "+inf")
+        ranks = {score: above + 1 for score, above in zip(scores, pipe.execute())}
+        return cls._serialize(entries, ranks)
+
+    @classmethod
+    def _ranked_range(cls, redis_conn, key: str, start: int, stop: int) -> List[Dict]:
+        entries = redis_conn.zrevrange(key, start, stop, withscores=True)
+        return cls._rank_entries(redis_conn, key, entries)
+
+    @staticmethod
+    def encode_cursor(score, member) -> str:
+        """Opaque cursor for the (score, team pk) of the last entry on a page"""
+        if isinstance(member, bytes):
+            member = member.decode()
+        raw = f"{int(score)}:{int(member)}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, int]:
+        """
+        (score, team pk) of a cursor from encode_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            score, member = raw.split(":")
+            return int(score), int(member)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    def _entries_after(
+        redis_conn, key: str, score: int, member: int, count: int
+    ) -> List:
+        """
+        Up to count (member, score) pairs ranked below (score, member).
+
+        Sorted sets order equal scores by member, descending for reverse
+        ranges, so the entries after the cursor are the tied members that
+        sort below it followed by everything under the score. This holds
+        whether or not the cursor's team is still on the board with that score.
+        """
+        anchor = str(member).encode()
+        if redis_conn.zscore(key, member) == score:
+            position = redis_conn.zrevrank(key, member)
+            return redis_conn.zrevrange(
+                key, position + 1, position + count, withscores=True
+            )
+
+        entries = []
+        offset = 0
+        while len(entries) < count:
+            tied = redis_conn.zrevrangebyscore(
+                key, score, score, start=offset, num=count, withscores=True
+            )
+            if not tied:
+                break
+            offset += len(tied)
+            entries.extend(entry for entry in tied if entry[0] < anchor)
+        entries = entries[:count]
+
+        if len(entries) < count:
+            entries += redis_conn.zrevrangebyscore(
+                key,
+                f"({score}",
+                "-inf",
+                start=0,
+                num=count - len(entries),
+                withscores=True,
+            )
+        return entries
+
+    @classmethod
+    def get_page(
+        cls, key: str, cursor: Optional[str] = None, limit: int = None
+    ) -> Dict:
+        """
+        Keyset page of a leaderboard.
+
+        Args:
+            key: Sorted set key
+            cursor: next_cursor of the previous page; None for the first page
+            limit: Page size, clamped to 1..MAX_PAGE_SIZE
+
+        Returns:
+            Dict with results, the next cursor and the leaderboard size
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(limit or cls.DEFAULT_PAGE_SIZE, cls.MAX_PAGE_SIZE))
+        redis_conn = get_redis_connection("default")
+
+        # One extra entry tells whether there is a next page
+        if cursor:
+            score, member = cls.decode_cursor(cursor)
+            entries = cls._entries_after(redis_conn, key, score, member, limit + 1)
+        else:
+            entries = redis_conn.zrevrange(key, 0, limit, withscores=True)
+
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        next_cursor = (
+            cls.encode_cursor(entries[-1][1], entries[-1][0]) if has_more else None
+        )
+        return {
+            "results": cls._rank_entries(redis_conn, key, entries),
+            "next_cursor": next_cursor,
+            "count": redis_conn.zcard(key),
+        }
+
+    @classmethod
+    def get_neighbours(
+        cls, key: str, team: FantasyTeam, neighbours: int = 5
+    ) -> Optional[Dict]:
+        """A team's position plus the teams directly above and below it"""
+        redis_conn = get_redis_connection("default")
+        position = redis_conn.zrevrank(key, team.pk)
+        if position is None:
+            return None
+
+        start = max(position - neighbours, 0)
+        results = cls._ranked_range(redis_conn, key, start, position + neighbours)
+        me = next(
+            (entry for entry in results if entry["team_id"] == str(team.id)), None
+        )
+        return {"me": me, "results": results, "count": redis_conn.zcard(key)}
@@ -0,0 +1,257 @@
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db.models import QuerySet, Sum
+from django.utils import timezone
+
+from apps.kpl.models import Gameweek, Team
+
+from ..models import ChipType, FantasyPlayer, PlayerPerformance, TeamSelection
+
+logger = logging.getLogger(__name__)
+
+StarterLink = TeamSelection.starters.through
+BenchLink = TeamSelection.bench.through
+
+
+class LineupSnapshot:
+    """
+    Immutable lineup snapshot stored on TeamSelection.lineup.
+
+    Frozen once a selection is finalized, the snapshot records every squad
+    member's slot and role together with the player details needed to display
+    the lineup, so reading a historic gameweek no longer joins the starters and
+    bench through tables, FantasyPlayer, Player and Team. The M2M relations stay
+    the source for editing an unfinalized selection.
+
+    Snapshot layout::
+
+        {
+            "frozen_at": ISO timestamp,
+            "players": [
+                {"slot": 0, "role": "C",
+                 "fantasy_player": pk, "fantasy_player_id": uuid,
+                 "player": pk, "player_id": uuid, "name": ..., "position": ...,
+                 "team": ..., "jersey_image": url,
+                 "purchase_price": ..., "current_value": ...},
+                ...
+            ],
+        }
+
+    Slots 0-10 are starters ordered GKP, DEF, MID, FWD; slots 11-14 the bench.
+    Values are as of finalization.
+    """
+
+    CAPTAIN = "C"
+    VICE_CAPTAIN = "VC"
+    STARTER = "S"
+    BENCH = "B"
+    POSITION_ORDER = {"GKP": 0, "DEF": 1, "MID": 2, "FWD": 3}
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _jersey_url(name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        return Team._meta.get_field("jersey_image").storage.url(name)
+
+    @classmethod
+    def freeze(cls, selections: QuerySet) -> int:
+        """
+        Write snapshots for finalized selections that do not have one yet.
+        Existing snapshots are never rewritten.
+
+        Returns:
+            Number of selections frozen
+        """
+        pending = list(
+            selections.filter(is_finalized=True, lineup__isnull=True).values_list(
+                "pkid", "captain_id", "vice_captain_id"
+            )
+        )
+        if not pending:
+            return 0
+
+        selection_ids = [pkid for pkid, _, _ in pending]
+        starters: Dict[int, List[int]] = {}
+        bench: Dict[int, List[int]] = {}
+        for link_model, lineups in ((StarterLink, starters), (BenchLink, bench)):
+            rows = link_model.objects.filter(
+                teamselection_id__in=selection_ids
+            ).values_list("teamselection_id", "fantasyplayer_id")
+            for selection_id, fantasy_player_id in rows:
+                lineups.setdefault(selection_id, []).append(fantasy_player_id)
+
+        fantasy_player_ids = {
+            fp_id
+            for lineups in (starters, bench)
+            for ids in lineups.values()
+            for fp_id in ids
+        }
+        players = {
+            row["pkid"]: row
+            for row in FantasyPlayer.objects.filter(pkid__in=fantasy_player_ids).values(
+                "pkid",
+                "id",
+                "purchase_price",
+                "player_id",
+                "player__id",
+                "player__name",
+                "player__position",
+                "player__current_value",
+                "player__team__name",
+                "player__team__jersey_image",
+            )
+        }
+
+        def order(fp_id):
+            row = players[fp_id]
+            return (cls.POSITION_ORDER.get(row["player__position"], 4), fp_id)
+
+        frozen_at = timezone.now().isoformat()
+        updates = []
+        for pkid, captain_id, vice_captain_id in pending:
+            entries = []
+            lineup = [
+                (fp_id, True)
+                for fp_id in sorted(starters.get(pkid, []), key=order)
+                if fp_id in players
+            ] + [
+                (fp_id, False)
+                for fp_id in sorted(bench.get(pkid, []), key=order)
+                if fp_id in players
+            ]
+            for slot, (fp_id, is_starter) in enumerate(lineup):
+                row = players[fp_id]
+                if not is_starter:
+                    role = cls.BENCH
+                elif fp_id == captain_id:
+                    role = cls.CAPTAIN
+                elif fp_id == vice_captain_id:
+                    role = cls.VICE_CAPTAIN
+                else:
+                    role = cls.STARTER
+                entries.append(
+                    {
+                        "slot": slot,
+                        "role": role,
+                        "fantasy_player": fp_id,
+                        "fantasy_player_id": str(row["id"]),
+                        "player": row["player_id"],
+                        "player_id": str(row["player__id"]),
+                        "name": row["player__name"],
+                        "position": row["player__position"],
+                        "team": row["player__team__name"],
+                        "jersey_image": cls._jersey_url(
+                            row["player__team__jersey_image"]
+                        ),
+                        "purchase_price": str(row["purchase_price"]),
+                        "current_value": str(row["player__current_value"]),
+                    }
+                )
+            updates.append(
+                TeamSelection(
+                    pkid=pkid, lineup={"frozen_at": frozen_at, "players": entries}
+                )
+            )
+
+        TeamSelection.objects.bulk_update(
+            updates, ["lineup"], batch_size=cls.BATCH_SIZE
+        )
+        logger.info(f"Froze {len(updates)} lineup snapshots")
+        return len(updates)
+
+    @classmethod
+    def entries(cls, selection: TeamSelection) -> List[Dict]:
+        return (selection.lineup or {}).get("players", [])
+
+    @classmethod
+    def is_starter(cls, entry: Dict) -> bool:
+        return entry["role"] != cls.BENCH
+
+    @classmethod
+    def player_rows(cls, selection: TeamSelection, gameweek: Gameweek) -> List[Dict]:
+        """
+        Lineup rows shaped like FantasyPlayerSerializer output, built from the
+        snapshot. gameweek_points and total_points_for_team are the points each
+        player earned for the team as ScoringEngine scores the team's finalized
+        snapshots (captain, Triple Captain, vice-captain stand-in, Bench Boost).
+        Performances come from one aggregate over every player in those
+        snapshots.
+        """
+        from .scoring import ScoringEngine
+
+        history = list(
+            TeamSelection.objects.filter(
+                fantasy_team_id=selection.fantasy_team_id,
+                is_finalized=True,
+                lineup__isnull=False,
+            ).values_list("gameweek_id", "active_chip", "lineup")
+        )
+        player_ids = {entry["player"] for entry in cls.entries(selection)}
+        for _, _, lineup in history:
+            player_ids.update(entry["player"] for entry in lineup.get("players", []))
+
+        # gameweek pk -> player pk -> (points, minutes)
+        stats: Dict[int, Dict[int, tuple]] = {}
+        performances: Dict[int, Dict[int, int]] = {}
+        rows = (
+            PlayerPerformance.objects.filter(player_id__in=player_ids)
+            .values("player_id", "gameweek_id")
+            .annotate(points=Sum("fantasy_points"), minutes=Sum("minutes_played"))
+            .values_list("player_id", "gameweek_id", "points", "minutes")
+        )
+        for player_id, gameweek_id, points, minutes in rows:
+            stats.setdefault(gameweek_id, {})[player_id] = (points or 0, minutes or 0)
+            performances.setdefault(player_id, {})[gameweek_id] = points or 0
+
+        team_points: Dict[int, int] = {}
+        earned_this_gameweek: Dict[int, int] = {}
+        for gameweek_id, active_chip, lineup in history:
+            _, _, _, earned = ScoringEngine._score_lineup(
+                lineup, active_chip, stats.get(gameweek_id, {})
+            )
+            for fantasy_player_id, points in earned.items():
+                team_points[fantasy_player_id] = (
+                    team_points.get(fantasy_player_id, 0) + points
+                )
+            if gameweek_id == gameweek.pk:
+                earned_this_gameweek = earned
+
+        fantasy_team_id = str(selection.fantasy_team.id)
+        results = []
+        for entry in cls.entries(selection):
+            is_starter = cls.is_starter(entry)
+            player_performances = performances.get(entry["player"], {})
+
+            gameweek_points = None
+            if (
+                is_starter or selection.active_chip == ChipType.BENCH_BOOST
+            ) and gameweek.pk in player_performances:
+                gameweek_points = earned_this_gameweek.get(entry["fantasy_player"], 0)
+
+            results.append(
+                {
+                    "id": entry["fantasy_player_id"],
+                    "name": entry["name"],
+                    "position": entry["position"],
+                    "team": entry["team"],
+                    "price": entry["purchase_price"],
+                    "fantasy_team": fantasy_team_id,
+                    "player": entry["player_id"],
+                    "total_points": sum(player_performances.values()),
+                    "is_captain": entry["role"] == cls.CAPTAIN,
+                    "is_vice_captain": entry["role"] == cls.VICE_CAPTAIN,
+                    "is_starter": is_starter,
+                    "purchase_price": entry["purchase_price"],
+                    # A Decimal, rendered like the serializer's get_current_value
+                    "current_value": Decimal(entry["current_value"]),
+                    "jersey_image": entry["jersey_image"],
+                    "gameweek_points": gameweek_points,
+                    "total_points_for_team": team_points.get(
+                        entry["fantasy_player"], 0
+                    ),
+                }
+            )
+        return results
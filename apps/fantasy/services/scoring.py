@@ -0,0 +1,475 @@
+import logging
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, QuerySet, Subquery, Sum, Window
+from django.db.models.functions import Coalesce, Greatest, Rank
+
+from apps.kpl.models import Fixture, Gameweek, Player
+
+from ..models import (
+    ChipType,
+    FantasyPlayer,
+    FantasyPlayerGameweekScore,
+    FantasyTeam,
+    PlayerPerformance,
+    PlayerTransfer,
+    TeamGameweekScore,
+    TeamSelection,
+)
+from .leaderboard import LeaderboardService
+from .lineup_snapshot import LineupSnapshot
+from .selection_index import SelectionIndex
+from .team_summary import TeamSummaryCache
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringEngine:
+    """
+    Set-based fantasy scoring.
+
+    Gameweek scores are computed from each finalized TeamSelection's lineup
+    snapshot against one PlayerPerformance aggregate for the gameweek and stored
+    as TeamGameweekScore rows, together with each squad player's share as
+    FantasyPlayerGameweekScore rows. Team and player season totals are summed
+    from those rows in SQL. All are written back in bulk, and a goal only
+    rescores the gameweek it was scored in, so its cost no longer grows with
+    the number of managers owning the scorer or the gameweeks played.
+    """
+
+    # Above this many affected teams, score_players filters with a subquery
+    # instead of sending the ids as an IN list in each of its queries
+    MAX_INLINE_TEAM_IDS = 1000
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def snapshot_points(gameweek: Gameweek, selections: QuerySet) -> List[Dict]:
+        """
+        Score finalized selections from their lineup snapshots. The captain's
+        points are counted twice (three times with Triple Captain); if the
+        captain did not play, the vice-captain's points are doubled instead.
+        Bench Boost adds the bench players' points. Snapshots missing for any
+        selection are frozen first.
+
+        Returns:
+            One dict per selection with fantasy_team_id, starter_points,
+            captain_bonus, chip_points, gameweek_points and earned (see
+            _score_lineup)
+        """
+        selections = selections.filter(is_finalized=True)
+        LineupSnapshot.freeze(selections)
+
+        stats = {
+            player_id: (points or 0, minutes or 0)
+            for player_id, points, minutes in PlayerPerformance.objects.filter(
+                gameweek=gameweek
+            )
+            .values("player_id")
+            .annotate(points=Sum("fantasy_points"), minutes=Sum("minutes_played"))
+            .values_list("player_id", "points", "minutes")
+        }
+
+        rows = []
+        for team_id, active_chip, lineup in selections.values_list(
+            "fantasy_team_id", "active_chip", "lineup"
+        ):
+            starter_points, captain_bonus, chip_points, earned = (
+                ScoringEngine._score_lineup(lineup, active_chip, stats)
+            )
+            rows.append(
+                {
+                    "fantasy_team_id": team_id,
+                    "starter_points": starter_points,
+                    "captain_bonus": captain_bonus,
+                    "chip_points": chip_points,
+                    "gameweek_points": starter_points + captain_bonus + chip_points,
+                    "earned": earned,
+                }
+            )
+        return rows
+
+    @staticmethod
+    def _score_lineup(lineup: Optional[Dict], active_chip: Optional[str], stats: Dict):
+        """
+        Score one lineup snapshot.
+
+        Args:
+            lineup: TeamSelection.lineup snapshot
+            active_chip: The selection's chip
+            stats: Map of player pk -> (points, minutes) for the gameweek
+
+        Returns:
+            (starter_points, captain_bonus, chip_points, earned), where earned
+            maps each FantasyPlayer pk in the lineup to the points it brought
+            the team (0 on the bench unless Bench Boost is active)
+        """
+        starter_points = bench_points = 0
+        captain = vice_captain = None
+        earned: Dict[int, int] = {}
+        for entry in (lineup or {}).get("players", []):
+            points, minutes = stats.get(entry["player"], (0, 0))
+            if entry["role"] == LineupSnapshot.BENCH:
+                bench_points += points
+                earned[entry["fantasy_player"]] = (
+                    points if active_chip == ChipType.BENCH_BOOST else 0
+                )
+                continue
+            starter_points += points
+            earned[entry["fantasy_player"]] = points
+            if entry["role"] == LineupSnapshot.CAPTAIN:
+                captain = (entry["fantasy_player"], points, minutes)
+            elif entry["role"] == LineupSnapshot.VICE_CAPTAIN:
+                vice_captain = (entry["fantasy_player"], points, minutes)
+
+        captain_bonus = 0
+        if captain and captain[2] > 0:
+            multiplier = 2 if active_chip == ChipType.TRIPLE_CAPTAIN else 1
+            captain_bonus = captain[1] * multiplier
+            earned[captain[0]] += captain_bonus
+        elif vice_captain:
+            captain_bonus = vice_captain[1]
+            earned[vice_captain[0]] += captain_bonus
+        chip_points = bench_points if active_chip == ChipType.BENCH_BOOST else 0
+        return starter_points, captain_bonus, chip_points, earned
+
+    @classmethod
+    def get_gameweek_points(cls, gameweek: Gameweek) -> Dict:
+        """Map fantasy_team_id -> points for every finalized selection in a gameweek"""
+        rows = cls.snapshot_points(
+            gameweek, TeamSelection.objects.filter(gameweek=gameweek)
+        )
+        return {row["fantasy_team_id"]: row["gameweek_points"] for row in rows}
+
+    @staticmethod
+    def _team_total_subquery():
+        """
+        Sum of the team's stored TeamGameweekScore points. Selections' lineup
+        links are not used: deleting a transferred-out FantasyPlayer cascades to
+        them and would drop that player's past points from the total.
+        """
+        totals = (
+            TeamGameweekScore.objects.filter(fantasy_team_id=OuterRef("pk"))
+            .values("fantasy_team_id")
+            .annotate(total=Sum("points"))
+            .values("total")[:1]
+        )
+        return Greatest(Coalesce(Subquery(totals), 0), 0)
+
+    @staticmethod
+    def _player_total_subquery():
+        """Sum of the player's stored FantasyPlayerGameweekScore points"""
+        totals = (
+            FantasyPlayerGameweekScore.objects.filter(fantasy_player_id=OuterRef("pk"))
+            .values("fantasy_player_id")
+            .annotate(total=Sum("points"))
+            .values("total")[:1]
+        )
+        return Greatest(Coalesce(Subquery(totals), 0), 0)
+
+    @classmethod
+    def refresh_totals(cls, team_ids: Optional[QuerySet] = None) -> int:
+        """
+        Recompute FantasyTeam.total_points from the stored TeamGameweekScore rows
+        and FantasyPlayer.total_points from the FantasyPlayerGameweekScore rows,
+        one UPDATE each. Write the gameweek scores first.
+
+        Args:
+            team_ids: Optional queryset of fantasy team primary keys to limit the update
+
+        Returns:
+            Number of fantasy teams updated
+        """
+        teams = FantasyTeam.objects.all()
+        players = FantasyPlayer.objects.all()
+        if team_ids is not None:
+            teams = teams.filter(pk__in=team_ids)
+            players = players.filter(fantasy_team_id__in=team_ids)
+
+        with transaction.atomic():
+            updated = teams.update(total_points=cls._team_total_subquery())
+            players.update(total_points=cls._player_total_subquery())
+
+        return updated
+
+    @classmethod
+    def write_gameweek_scores(
+        cls,
+        gameweek: Gameweek,
+        team_ids: Optional[QuerySet] = None,
+        cumulative: bool = True,
+    ) -> int:
+        """
+        Upsert TeamGameweekScore and FantasyPlayerGameweekScore rows for a gameweek.
+
+        The affected teams' cumulative totals are then rewritten for every
+        gameweek (see refresh_cumulative_totals), so rescoring an earlier
+        gameweek also corrects the totals of the later ones.
+
+        Args:
+            gameweek: Gameweek to materialize
+            team_ids: Optional queryset of fantasy team primary keys to limit the write
+            cumulative: Whether to refresh the cumulative totals; pass False when
+                writing several gameweeks and call refresh_cumulative_totals once
+
+        Returns:
+            Number of score rows written
+        """
+        selections = TeamSelection.objects.filter(gameweek=gameweek, is_finalized=True)
+        transfers = PlayerTransfer.objects.filter(gameweek=gameweek)
+        if team_ids is not None:
+            selections = selections.filter(fantasy_team_id__in=team_ids)
+            transfers = transfers.filter(fantasy_team_id__in=team_ids)
+
+        rows = cls.snapshot_points(gameweek, selections)
+        hits = dict(
+            transfers.values("fantasy_team_id")
+            .annotate(total=Sum("transfer_cost"))
+            .values_list("fantasy_team_id", "total")
+        )
+        scores = [
+            TeamGameweekScore(
+                fantasy_team_id=row["fantasy_team_id"],
+                gameweek=gameweek,
+                raw_points=row["starter_points"],
+                captain_bonus=row["captain_bonus"],
+                chip_points=row["chip_points"],
+                transfer_hits=int(hits.get(row["fantasy_team_id"]) or 0),
+                points=row["gameweek_points"],
+            )
+            for row in rows
+        ]
+        TeamGameweekScore.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=["fantasy_team", "gameweek"],
+            update_fields=[
+                "raw_points",
+                "captain_bonus",
+                "chip_points",
+                "transfer_hits",
+                "points",
+                "updated_at",
+            ],
+        )
+        cls._write_player_scores(gameweek, rows)
+        if cumulative:
+            cls.refresh_cumulative_totals(team_ids)
+        return len(scores)
+
+    @classmethod
+    def _write_player_scores(cls, gameweek: Gameweek, rows: List[Dict]) -> None:
+        """Upsert FantasyPlayerGameweekScore rows from snapshot_points results"""
+        earned = [
+            (fantasy_player_id, points)
+            for row in rows
+            for fantasy_player_id, points in row["earned"].items()
+        ]
+        for start in range(0, len(earned), cls.BATCH_SIZE):
+            end = start + cls.BATCH_SIZE
+            batch = earned[start:end]
+            # Snapshots keep players that have since been transferred out
+            existing = set(
+                FantasyPlayer.objects.filter(
+                    pkid__in=[fantasy_player_id for fantasy_player_id, _ in batch]
+                ).values_list("pkid", flat=True)
+            )
+            FantasyPlayerGameweekScore.objects.bulk_create(
+                [
+                    FantasyPlayerGameweekScore(
+                        fantasy_player_id=fantasy_player_id,
+                        gameweek=gameweek,
+                        points=points,
+                    )
+                    for fantasy_player_id, points in batch
+                    if fantasy_player_id in existing
+                ],
+                update_conflicts=True,
+                unique_fields=["fantasy_player", "gameweek"],
+                update_fields=["points", "updated_at"],
+            )
+
+    @staticmethod
+    def refresh_cumulative_totals(
+        team_ids: Optional[QuerySet] = None, chunk_size: int = 5000
+    ) -> int:
+        """
+        Rewrite TeamGameweekScore.total_points as each team's running sum of
+        points in gameweek order, in one window-function query. Only changed
+        rows are written back.
+
+        Returns:
+            Number of score rows updated
+        """
+        scores = TeamGameweekScore.objects.all()
+        if team_ids is not None:
+            scores = scores.filter(fantasy_team_id__in=team_ids)
+        running = scores.annotate(
+            running_total=Window(
+                expression=Sum("points"),
+                partition_by=[F("fantasy_team_id")],
+                order_by=[F("gameweek__number").asc(), F("gameweek_id").asc()],
+            )
+        ).values_list("pkid", "total_points", "running_total")
+
+        changed = []
+        updated = 0
+        for pkid, total_points, running_total in running.iterator(
+            chunk_size=chunk_size
+        ):
+            if total_points == running_total:
+                continue
+            changed.append(TeamGameweekScore(pkid=pkid, total_points=running_total))
+            if len(changed) >= chunk_size:
+                updated += TeamGameweekScore.objects.bulk_update(
+                    changed, ["total_points"]
+                )
+                changed = []
+        if changed:
+            updated += TeamGameweekScore.objects.bulk_update(changed, ["total_points"])
+        return updated
+
+    @staticmethod
+    def rank_gameweek(gameweek: Gameweek, chunk_size: int = 5000) -> int:
+        """
+        Assign TeamGameweekScore.rank by gameweek points (ties share a rank).
+        Only rows whose rank changed are written.
+
+        Returns:
+            Number of score rows updated
+        """
+        ranked = (
+            TeamGameweekScore.objects.filter(gameweek=gameweek)
+            .annotate(position=Window(expression=Rank(), order_by=F("points").desc()))
+            .values_list("pkid", "rank", "position")
+        )
+
+        changed = []
+        updated = 0
+        for pkid, rank, position in ranked.iterator(chunk_size=chunk_size):
+            if rank == position:
+                continue
+            changed.append(TeamGameweekScore(pkid=pkid, rank=position))
+            if len(changed) >= chunk_size:
+                updated += TeamGameweekScore.objects.bulk_update(changed, ["rank"])
+                changed = []
+        if changed:
+            updated += TeamGameweekScore.objects.bulk_update(changed, ["rank"])
+        return updated
+
+    @staticmethod
+    def snapshot_previous_ranks() -> int:
+        """
+        Copy every team's overall_rank into previous_rank, so rank movement is
+        shown against this point until the next snapshot. Done once per
+        gameweek, before it is scored and re-ranked.
+
+        Returns:
+            Number of fantasy teams updated
+        """
+        updated = (
+            FantasyTeam.objects.exclude(previous_rank=F("overall_rank"))
+            .exclude(overall_rank__isnull=True)
+            .update(previous_rank=F("overall_rank"))
+        )
+        if updated:
+            TeamSummaryCache.invalidate_all()
+        return updated
+
+    @staticmethod
+    def rank_overall(chunk_size: int = 5000) -> int:
+        """
+        Rank every fantasy team by total points (ties share a rank) in one
+        window-function query and write changed ranks back in chunked bulk
+        updates. previous_rank is left alone; see snapshot_previous_ranks.
+
+        Returns:
+            Number of fantasy teams whose rank changed
+        """
+        ranked = FantasyTeam.objects.annotate(
+            position=Window(expression=Rank(), order_by=F("total_points").desc())
+        ).values_list("pkid", "overall_rank", "position")
+
+        changed = []
+        updated = 0
+        for pkid, overall_rank, position in ranked.iterator(chunk_size=chunk_size):
+            if position == overall_rank:
+                continue
+
+            changed.append(FantasyTeam(pkid=pkid, overall_rank=position))
+            if len(changed) >= chunk_size:
+                updated += FantasyTeam.objects.bulk_update(changed, ["overall_rank"])
+                TeamSummaryCache.invalidate_teams([team.pkid for team in changed])
+                changed = []
+
+        if changed:
+            updated += FantasyTeam.objects.bulk_update(changed, ["overall_rank"])
+            TeamSummaryCache.invalidate_teams([team.pkid for team in changed])
+
+        logger.info(f"Overall ranks refreshed: {updated} fantasy teams moved")
+        return updated
+
+    @classmethod
+    def score_gameweek(cls, gameweek: Gameweek) -> Dict:
+        """Rescore every team with a finalized selection in the gameweek"""
+        team_ids = TeamSelection.objects.filter(
+            gameweek=gameweek, is_finalized=True
+        ).values("fantasy_team_id")
+        cls.write_gameweek_scores(gameweek)
+        updated = cls.refresh_totals(team_ids)
+        cls.rank_gameweek(gameweek)
+        LeaderboardService.update_teams(team_ids)
+        TeamSummaryCache.invalidate_teams(team_ids)
+
+        logger.info(
+            f"Scored Gameweek {gameweek.number}: {updated} fantasy teams updated"
+        )
+        return {"gameweek": gameweek.number, "teams_updated": updated}
+
+    @classmethod
+    def score_players(cls, gameweek: Gameweek, player_ids) -> int:
+        """
+        Rescore only the teams fielding any of the given players in the gameweek.
+        Affected teams come from the gameweek's SelectionIndex, falling back to a
+        join over the selections if Redis is unavailable or the players are in
+        more than MAX_INLINE_TEAM_IDS squads.
+
+        Returns:
+            Number of fantasy teams updated
+        """
+        player_ids = list(player_ids)
+        if not player_ids:
+            return 0
+
+        team_ids = SelectionIndex.get_team_ids(gameweek, player_ids)
+        if team_ids is None or len(team_ids) > cls.MAX_INLINE_TEAM_IDS:
+            team_ids = (
+                TeamSelection.objects.filter(gameweek=gameweek, is_finalized=True)
+                .filter(
+                    Q(starters__player_id__in=player_ids)
+                    | Q(bench__player_id__in=player_ids)
+                )
+                .values("fantasy_team_id")
+            )
+        elif not team_ids:
+            return 0
+
+        cls.write_gameweek_scores(gameweek, team_ids)
+        updated = cls.refresh_totals(team_ids)
+        LeaderboardService.update_teams(team_ids)
+        TeamSummaryCache.invalidate_teams(team_ids)
+        return updated
+
+    @classmethod
+    def score_fixture(cls, fixture: Fixture) -> Dict:
+        """Rescore only the teams fielding a player from either side of the fixture"""
+        if not fixture.gameweek_id:
+            return {"fixture_id": str(fixture.id), "teams_updated": 0}
+
+        player_ids = Player.objects.filter(
+            team_id__in=[fixture.home_team_id, fixture.away_team_id]
+        ).values_list("pk", flat=True)
+        updated = cls.score_players(fixture.gameweek, player_ids)
+
+        logger.info(f"Scored fixture {fixture.id}: {updated} fantasy teams updated")
+        return {"fixture_id": str(fixture.id), "teams_updated": updated}
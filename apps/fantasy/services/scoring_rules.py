@@ -0,0 +1,165 @@
+"""
+Fantasy points rules.
+
+The single source of truth for how a PlayerPerformance is scored. The same rule
+table drives the per-row calculation used by live match events and the post-match
+rebuild, and the set-based SQL expression used to rescore whole gameweeks or
+seasons in one UPDATE per position.
+"""
+
+from typing import Any, Mapping, Union
+
+from django.db.models import Case, F, QuerySet, Value, When
+
+POSITIONS = ("GKP", "DEF", "MID", "FWD")
+DEFAULT_POSITION = "FWD"
+
+SCORED_FIELDS = (
+    "minutes_played",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "saves",
+    "penalties_saved",
+    "penalties_missed",
+    "own_goals",
+    "yellow_cards",
+    "red_cards",
+)
+
+
+RULE_SETS = {}
+
+
+def register_rules(rules_class):
+    """Class decorator making a rule set selectable by its VERSION"""
+    RULE_SETS[rules_class.VERSION] = rules_class
+    return rules_class
+
+
+def get_rules(version: str = None):
+    """Return the rule set for a version, or the current one if no version is given"""
+    if version is None:
+        return ScoringRules
+    try:
+        return RULE_SETS[version]
+    except KeyError:
+        raise ValueError(
+            f"Unknown scoring rules version '{version}'. "
+            f"Available: {', '.join(sorted(RULE_SETS))}"
+        )
+
+
+@register_rules
+class ScoringRules:
+    """
+    Current scoring rules. Alternative versions subclass this, override the
+    tables and set a new VERSION, then register with @register_rules.
+    """
+
+    VERSION = "2024.1"
+
+    APPEARANCE_POINTS = 1
+    LONG_APPEARANCE_POINTS = 1
+    LONG_APPEARANCE_MINUTES = 60
+
+    # Points per unit of each stat, by position
+    STAT_POINTS = {
+        "goals_scored": {"GKP": 6, "DEF": 6, "MID": 5, "FWD": 4},
+        "assists": {"GKP": 3, "DEF": 3, "MID": 3, "FWD": 3},
+        "clean_sheets": {"GKP": 4, "DEF": 4, "MID": 1, "FWD": 0},
+        "penalties_saved": {"GKP": 5, "DEF": 5, "MID": 5, "FWD": 5},
+        "penalties_missed": {"GKP": -2, "DEF": -2, "MID": -2, "FWD": -2},
+        "own_goals": {"GKP": -2, "DEF": -2, "MID": -2, "FWD": -2},
+        "yellow_cards": {"GKP": -1, "DEF": -1, "MID": -1, "FWD": -1},
+        "red_cards": {"GKP": -3, "DEF": -3, "MID": -3, "FWD": -3},
+    }
+
+    # One point for every N saves, by position (positions not listed score nothing)
+    SAVES_PER_POINT = {"GKP": 3}
+
+    @staticmethod
+    def _position(position: str) -> str:
+        return position if position in POSITIONS else DEFAULT_POSITION
+
+    @staticmethod
+    def _value(stats: Union[Mapping, Any], field: str) -> int:
+        if isinstance(stats, Mapping):
+            return stats.get(field, 0) or 0
+        return getattr(stats, field, 0) or 0
+
+    @classmethod
+    def calculate(cls, stats: Union[Mapping, Any], position: str) -> int:
+        """
+        Points for one performance.
+
+        Args:
+            stats: PlayerPerformance (or any object / dict exposing SCORED_FIELDS)
+            position: Player position code
+        """
+        position = cls._position(position)
+        minutes = cls._value(stats, "minutes_played")
+
+        points = 0
+        if minutes > 0:
+            points += cls.APPEARANCE_POINTS
+        if minutes >= cls.LONG_APPEARANCE_MINUTES:
+            points += cls.LONG_APPEARANCE_POINTS
+
+        for field, per_position in cls.STAT_POINTS.items():
+            points += cls._value(stats, field) * per_position[position]
+
+        saves_per_point = cls.SAVES_PER_POINT.get(position)
+        if saves_per_point:
+            points += cls._value(stats, "saves") // saves_per_point
+
+        return points
+
+    @classmethod
+    def expression(cls, position: str):
+        """Database expression computing points from PlayerPerformance columns"""
+        position = cls._position(position)
+
+        points = Case(
+            When(
+                minutes_played__gte=cls.LONG_APPEARANCE_MINUTES,
+                then=Value(cls.APPEARANCE_POINTS + cls.LONG_APPEARANCE_POINTS),
+            ),
+            When(minutes_played__gt=0, then=Value(cls.APPEARANCE_POINTS)),
+            default=Value(0),
+        )
+        for field, per_position in cls.STAT_POINTS.items():
+            if per_position[position]:
+                points = points + F(field) * per_position[position]
+
+        saves_per_point = cls.SAVES_PER_POINT.get(position)
+        if saves_per_point:
+            # Integer columns divide as integers, like calculate()'s //;
+            # saves are never negative
+            points = points + F("saves") / Value(saves_per_point)
+
+        return points
+
+    @classmethod
+    def rescore(cls, performances: QuerySet) -> int:
+        """
+        Recompute fantasy_points for every PlayerPerformance in the queryset,
+        one UPDATE per position. Gives the same points as calculate(); rows
+        already scored correctly are not written.
+
+        Returns:
+            Number of rows changed
+        """
+        updated = 0
+        for position in POSITIONS:
+            rows = performances.filter(player__position=position)
+            if position == DEFAULT_POSITION:
+                # Also performances without a player or with an unknown position
+                rows = performances.exclude(
+                    player__position__in=[p for p in POSITIONS if p != DEFAULT_POSITION]
+                )
+            expression = cls.expression(position)
+            updated += rows.exclude(fantasy_points=expression).update(
+                fantasy_points=expression
+            )
+        return updated
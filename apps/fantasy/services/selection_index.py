@@ -0,0 +1,151 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from django_redis import get_redis_connection
+
+from apps.kpl.models import Gameweek
+
+from ..models import ChipType, TeamSelection
+from .lineup_snapshot import LineupSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SelectionIndex:
+    """
+    Per-gameweek inverted index of finalized selections.
+
+    Stored as a Redis hash keyed by player pk, each value a compact JSON array of
+    [fantasy_team_pk, role, multiplier] entries, so live scoring can find every
+    team affected by a player's event with a single HMGET.
+
+    Roles: C (captain), VC (vice-captain), S (starter), B (bench).
+    Multipliers are the base points multiplier before any vice-captain fallback.
+    """
+
+    CAPTAIN = "C"
+    VICE_CAPTAIN = "VC"
+    STARTER = "S"
+    BENCH = "B"
+    BUILT_FIELD = "__built__"
+    TIMEOUT = 60 * 60 * 24 * 14
+
+    @staticmethod
+    def _key(gameweek_id) -> str:
+        return f"selection_index:{gameweek_id}"
+
+    @classmethod
+    def _collect(cls, gameweek: Gameweek) -> Dict[int, List]:
+        index: Dict[int, List] = {}
+
+        selections = TeamSelection.objects.filter(gameweek=gameweek, is_finalized=True)
+        LineupSnapshot.freeze(selections)
+
+        rows = selections.values_list("fantasy_team_id", "active_chip", "lineup")
+        for team_id, chip, lineup in rows:
+            for entry in (lineup or {}).get("players", []):
+                role = entry["role"]
+                if role == cls.CAPTAIN:
+                    multiplier = 3 if chip == ChipType.TRIPLE_CAPTAIN else 2
+                elif role == cls.BENCH:
+                    multiplier = 1 if chip == ChipType.BENCH_BOOST else 0
+                else:
+                    multiplier = 1
+                index.setdefault(entry["player"], []).append(
+                    [team_id, role, multiplier]
+                )
+
+        return index
+
+    @classmethod
+    def build(cls, gameweek: Gameweek) -> int:
+        """
+        Rebuild the index for a gameweek from its finalized selections.
+
+        Returns:
+            Number of players indexed
+        """
+        index = cls._collect(gameweek)
+        key = cls._key(gameweek.id)
+        mapping = {
+            str(player_id): json.dumps(entries, separators=(",", ":"))
+            for player_id, entries in index.items()
+        }
+        mapping[cls.BUILT_FIELD] = "1"
+
+        redis_conn = get_redis_connection("default")
+        pipe = redis_conn.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, cls.TIMEOUT)
+        pipe.execute()
+
+        logger.info(
+            f"Built selection index for Gameweek {gameweek.number}: "
+            f"{len(index)} players"
+        )
+        return len(index)
+
+    @classmethod
+    def get_entries(
+        cls, gameweek: Gameweek, player_ids: Iterable[int]
+    ) -> Optional[Dict]:
+        """
+        Look up index entries for a set of players.
+
+        Returns:
+            Mapping of player pk -> list of [fantasy_team_pk, role, multiplier],
+            or None if Redis is unavailable
+        """
+        player_ids = list(player_ids)
+        if not player_ids:
+            return {}
+
+        try:
+            redis_conn = get_redis_connection("default")
+            key = cls._key(gameweek.id)
+            if not redis_conn.hexists(key, cls.BUILT_FIELD):
+                cls.build(gameweek)
+
+            values = redis_conn.hmget(key, [str(player_id) for player_id in player_ids])
+        except Exception as e:
+            logger.error(
+                f"Error reading selection index for Gameweek {gameweek.number}: {e}"
+            )
+            return None
+
+        return {
+            player_id: json.loads(value)
+            for player_id, value in zip(player_ids, values)
+            if value
+        }
+
+    @classmethod
+    def get_team_ids(
+        cls, gameweek: Gameweek, player_ids: Iterable[int]
+    ) -> Optional[Set[int]]:
+        """Fantasy team pks fielding any of the players, or None if unavailable"""
+        entries = cls.get_entries(gameweek, player_ids)
+        if entries is None:
+            return None
+        return {
+            entry[0] for player_entries in entries.values() for entry in player_entries
+        }
+
+    @classmethod
+    def is_captain(cls, gameweek: Gameweek, player_id: int) -> Optional[bool]:
+        """Whether a finalized selection captains the player, or None if unavailable"""
+        entries = cls.get_entries(gameweek, [player_id])
+        if entries is None:
+            return None
+        return any(entry[1] == cls.CAPTAIN for entry in entries.get(player_id, []))
+
+    @classmethod
+    def invalidate(cls, gameweek_id) -> None:
+        try:
+            get_redis_connection("default").delete(cls._key(gameweek_id))
+        except Exception as e:
+            logger.error(
+                f"Error invalidating selection index for gameweek {gameweek_id}: {e}"
+            )
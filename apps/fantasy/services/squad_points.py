@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Q, Sum
+
+from apps.kpl.models import Gameweek
+
+from ..models import ChipType, FantasyPlayer, PlayerPerformance, TeamSelection
+
+StarterLink = TeamSelection.starters.through
+BenchLink = TeamSelection.bench.through
+
+
+class SquadPointsLoader:
+    """
+    Per-player point fields for a batch of FantasyPlayers.
+
+    FantasyPlayerSerializer used to aggregate PlayerPerformance and re-read the
+    TeamSelection for every player it rendered. load() computes the same values
+    for a whole squad in four grouped queries (selections, starter links, bench
+    links, performances), however many players are passed, and the serializer
+    reads them from its context.
+    """
+
+    @staticmethod
+    def load(
+        fantasy_players: Iterable[FantasyPlayer], gameweek: Optional[Gameweek]
+    ) -> Dict[int, Dict]:
+        """
+        Args:
+            fantasy_players: FantasyPlayer instances to compute points for
+            gameweek: Gameweek for gameweek_points, or None
+
+        Returns:
+            Map of FantasyPlayer pk -> {"total_points", "captain_bonus",
+            "total_points_for_team", "gameweek_points"}
+        """
+        fantasy_players = list(fantasy_players)
+        if not fantasy_players:
+            return {}
+
+        fp_ids = [fp.pk for fp in fantasy_players]
+        team_ids = {fp.fantasy_team_id for fp in fantasy_players}
+        player_ids = {fp.player_id for fp in fantasy_players}
+
+        scope = Q(is_finalized=True)
+        if gameweek is not None:
+            scope |= Q(gameweek=gameweek)
+        selections = {
+            row["pkid"]: row
+            for row in TeamSelection.objects.filter(
+                scope, fantasy_team_id__in=team_ids
+            ).values(
+                "pkid",
+                "fantasy_team_id",
+                "gameweek_id",
+                "captain_id",
+                "active_chip",
+                "is_finalized",
+            )
+        }
+        current = {
+            row["fantasy_team_id"]: row
+            for row in selections.values()
+            if gameweek is not None and row["gameweek_id"] == gameweek.pk
+        }
+
+        # (selection pk, fantasy player pk) pairs for the squad only
+        started = set(
+            StarterLink.objects.filter(
+                teamselection_id__in=list(selections), fantasyplayer_id__in=fp_ids
+            ).values_list("teamselection_id", "fantasyplayer_id")
+        )
+        benched = set()
+        if current:
+            benched = set(
+                BenchLink.objects.filter(
+                    teamselection_id__in=[row["pkid"] for row in current.values()],
+                    fantasyplayer_id__in=fp_ids,
+                ).values_list("teamselection_id", "fantasyplayer_id")
+            )
+
+        performances: Dict[int, Dict[int, int]] = {}
+        rows = (
+            PlayerPerformance.objects.filter(player_id__in=player_ids)
+            .values("player_id", "gameweek_id")
+            .annotate(points=Sum("fantasy_points"))
+            .values_list("player_id", "gameweek_id", "points")
+        )
+        for player_id, gameweek_id, points in rows:
+            performances.setdefault(player_id, {})[gameweek_id] = points or 0
+
+        finalized_by_team: Dict[int, list] = {}
+        for row in selections.values():
+            if row["is_finalized"]:
+                finalized_by_team.setdefault(row["fantasy_team_id"], []).append(row)
+
+        results = {}
+        for fp in fantasy_players:
+            player_points = performances.get(fp.player_id, {})
+
+            team_points = 0
+            captain_bonus = 0
+            for row in finalized_by_team.get(fp.fantasy_team_id, []):
+                points = player_points.get(row["gameweek_id"], 0)
+                if (row["pkid"], fp.pk) in started:
+                    team_points += points
+                if row["captain_id"] == fp.pk:
+                    captain_bonus += points
+
+            gameweek_points = None
+            selection = current.get(fp.fantasy_team_id)
+            if selection is not None:
+                is_starter = (selection["pkid"], fp.pk) in started
+                on_boosted_bench = (selection["pkid"], fp.pk) in benched and selection[
+                    "active_chip"
+                ] == ChipType.BENCH_BOOST
+                if (is_starter or on_boosted_bench) and gameweek.pk in player_points:
+                    gameweek_points = player_points[gameweek.pk]
+                    if is_starter and selection["captain_id"] == fp.pk:
+                        multiplier = (
+                            3
+                            if selection["active_chip"] == ChipType.TRIPLE_CAPTAIN
+                            else 2
+                        )
+                        gameweek_points *= multiplier
+
+            results[fp.pk] = {
+                "total_points": sum(player_points.values()),
+                "captain_bonus": captain_bonus,
+                "total_points_for_team": team_points + captain_bonus,
+                "gameweek_points": gameweek_points,
+            }
+
+        return results
@@ -0,0 +1,222 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+
+from apps.kpl.models import Player
+
+from ..models import FantasyTeam
+
+STARTER_SECTIONS = ("defenders", "midfielders", "forwards")
+
+
+class SquadValidator:
+    """
+    Validates a 15-player squad in memory.
+
+    All squad members are loaded with a single in_bulk query; formation, bench
+    composition, squad size, budget and the per-club limit are then checked
+    against those rows. validate() collects every problem for dry runs; check()
+    raises them as a ValidationError for the save path.
+    """
+
+    SQUAD_SIZE = 15
+    MAX_PER_CLUB = 3
+    INITIAL_BUDGET = Decimal("70.00")
+
+    FORMATIONS = {
+        "3-4-3": {"DEF": 3, "MID": 4, "FWD": 3, "GKP": 1},
+        "3-5-2": {"DEF": 3, "MID": 5, "FWD": 2, "GKP": 1},
+        "4-4-2": {"DEF": 4, "MID": 4, "FWD": 2, "GKP": 1},
+        "4-3-3": {"DEF": 4, "MID": 3, "FWD": 3, "GKP": 1},
+        "5-3-2": {"DEF": 5, "MID": 3, "FWD": 2, "GKP": 1},
+        "5-4-1": {"DEF": 5, "MID": 4, "FWD": 1, "GKP": 1},
+        "5-2-3": {"DEF": 5, "MID": 2, "FWD": 3, "GKP": 1},
+    }
+    BENCH_COMPOSITIONS = {
+        "3-4-3": {"DEF": 2, "MID": 1, "FWD": 0, "GKP": 1},
+        "3-5-2": {"DEF": 2, "MID": 0, "FWD": 1, "GKP": 1},
+        "4-4-2": {"DEF": 1, "MID": 1, "FWD": 1, "GKP": 1},
+        "4-3-3": {"DEF": 1, "MID": 2, "FWD": 0, "GKP": 1},
+        "5-3-2": {"DEF": 0, "MID": 2, "FWD": 1, "GKP": 1},
+        "5-4-1": {"DEF": 0, "MID": 1, "FWD": 2, "GKP": 1},
+        "5-2-3": {"DEF": 0, "MID": 3, "FWD": 0, "GKP": 1},
+    }
+
+    @staticmethod
+    def _player_id(player_data: dict) -> Optional[str]:
+        player_id = player_data.get("player") or player_data.get("id")
+        return str(player_id) if player_id else None
+
+    @staticmethod
+    def squad_player_ids(
+        starting_eleven: dict, bench_players: list
+    ) -> Tuple[List[str], List[str]]:
+        """Player UUIDs of the starters and bench, in payload order"""
+        starters = []
+        goalkeeper = starting_eleven.get("goalkeeper")
+        if goalkeeper:
+            starters.append(goalkeeper)
+        for section in STARTER_SECTIONS:
+            starters.extend(starting_eleven.get(section, []))
+
+        starter_ids = [SquadValidator._player_id(p) for p in starters]
+        bench_ids = [SquadValidator._player_id(p) for p in bench_players]
+        return (
+            [player_id for player_id in starter_ids if player_id],
+            [player_id for player_id in bench_ids if player_id],
+        )
+
+    @staticmethod
+    def load_players(player_ids: List[str]) -> Dict[str, Player]:
+        """Squad players keyed by UUID string, in one query"""
+        try:
+            players = Player.objects.select_related("team").in_bulk(
+                player_ids, field_name="id"
+            )
+        except ValidationError:
+            # A malformed UUID in the payload; report every id as unknown
+            return {}
+        return {str(player_id): player for player_id, player in players.items()}
+
+    @classmethod
+    def validate(
+        cls,
+        formation: str,
+        starting_eleven: dict,
+        bench_players: list,
+        fantasy_team: Optional[FantasyTeam] = None,
+        players: Optional[Dict[str, Player]] = None,
+    ) -> Dict:
+        """
+        Check a squad without saving anything.
+
+        Args:
+            formation: Formation code, e.g. "4-4-2"
+            starting_eleven: Payload with goalkeeper and defenders/midfielders/forwards
+            bench_players: Bench payload
+            fantasy_team: Owning team; the initial budget only applies to a team
+                with no players yet
+            players: Already loaded squad players from load_players()
+
+        Returns:
+            Dict with valid, errors, position counts, club counts and squad value
+        """
+        starter_ids, bench_ids = cls.squad_player_ids(starting_eleven, bench_players)
+        if players is None:
+            players = cls.load_players(starter_ids + bench_ids)
+
+        errors = []
+
+        missing = [
+            player_id
+            for player_id in starter_ids + bench_ids
+            if player_id not in players
+        ]
+        if missing:
+            errors.append(f"Unknown players: {', '.join(missing)}")
+
+        all_ids = starter_ids + bench_ids
+        duplicates = sorted(
+            {player_id for player_id in all_ids if all_ids.count(player_id) > 1}
+        )
+        if duplicates:
+            errors.append(f"Players selected more than once: {', '.join(duplicates)}")
+
+        starter_counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0}
+        bench_counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0}
+        for player_ids, counts in (
+            (starter_ids, starter_counts),
+            (bench_ids, bench_counts),
+        ):
+            for player_id in player_ids:
+                player = players.get(player_id)
+                if player and player.position in counts:
+                    counts[player.position] += 1
+
+        required_starters = cls.FORMATIONS.get(formation)
+        required_bench = cls.BENCH_COMPOSITIONS.get(formation)
+        if required_starters is None:
+            errors.append(f"Unknown formation {formation}")
+        else:
+            for pos, required_count in required_starters.items():
+                if starter_counts[pos] != required_count:
+                    errors.append(
+                        f"Formation {formation} requires {required_count} {pos} "
+                        f"starters, you have {starter_counts[pos]}"
+                    )
+            for pos, required_count in required_bench.items():
+                if bench_counts[pos] != required_count:
+                    errors.append(
+                        f"Formation {formation} requires {required_count} {pos} "
+                        f"bench players, you have {bench_counts[pos]}"
+                    )
+
+        total_players = len(all_ids)
+        if total_players != cls.SQUAD_SIZE:
+            errors.append(
+                f"Squad must have exactly {cls.SQUAD_SIZE} players, "
+                f"you have {total_players}"
+            )
+
+        club_counts: Dict[str, int] = {}
+        total_value = Decimal("0")
+        for player_id in set(all_ids):
+            player = players.get(player_id)
+            if not player:
+                continue
+            club_counts[player.team.name] = club_counts.get(player.team.name, 0) + 1
+            total_value += player.current_value
+
+        for club, count in sorted(club_counts.items()):
+            if count > cls.MAX_PER_CLUB:
+                errors.append(
+                    f"You can't select more than {cls.MAX_PER_CLUB} players "
+                    f"from {club}, you have {count}"
+                )
+
+        # Only the initial squad is held to the starting budget
+        is_new_team = fantasy_team is None or not fantasy_team.players.exists()
+        if is_new_team and total_value > cls.INITIAL_BUDGET:
+            errors.append(
+                f"Team value {total_value} exceeds initial budget "
+                f"of {cls.INITIAL_BUDGET}"
+            )
+
+        return {
+            "valid": not errors,
+            "errors": errors,
+            "starters": starter_counts,
+            "bench": bench_counts,
+            "clubs": club_counts,
+            "squad_value": float(total_value),
+            "budget": float(cls.INITIAL_BUDGET) if is_new_team else None,
+        }
+
+    @classmethod
+    def check(
+        cls,
+        formation: str,
+        starting_eleven: dict,
+        bench_players: list,
+        fantasy_team: Optional[FantasyTeam] = None,
+    ) -> Dict[str, Player]:
+        """
+        Validate a squad and raise ValidationError listing every problem.
+
+        Returns:
+            The loaded squad players keyed by UUID string, for reuse by the caller
+        """
+        starter_ids, bench_ids = cls.squad_player_ids(starting_eleven, bench_players)
+        players = cls.load_players(starter_ids + bench_ids)
+
+        result = cls.validate(
+            formation,
+            starting_eleven,
+            bench_players,
+            fantasy_team=fantasy_team,
+            players=players,
+        )
+        if not result["valid"]:
+            raise ValidationError(result["errors"])
+        return players
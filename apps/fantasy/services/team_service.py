@@ -1,130 +1,156 @@
-from datetime import datetime
-from collections import defaultdict
+import logging
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet, Sum
 from django.utils import timezone
-from ..models import Gameweek, PlayerPerformance
+
+from apps.kpl.services.hot_objects import HotObjects
+
+from ..models import DreamTeam, Gameweek, PlayerPerformance
+from .best_xi import BestXISolver
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = (
+    "fantasy_points",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "saves",
+    "minutes_played",
+)
 
 
 class TeamOfTheWeekService:
+    """
+    Team of the Week and season dream team, picked exactly by BestXISolver.
+
+    Points are summed per player over the gameweek's PlayerPerformance rows (or
+    the whole season) in one grouped query. Completed gameweeks and the season
+    are solved once and stored as DreamTeam rows, so the endpoints are lookups;
+    a gameweek without a stored team is solved on the fly.
+    """
+
     @staticmethod
     def get_gameweek(gameweek_number=None):
         if gameweek_number:
             return Gameweek.objects.filter(number=gameweek_number).first()
 
-        gameweek = Gameweek.objects.filter(is_active=True).first()
+        gameweek = HotObjects.active_gameweek()
         if gameweek:
             now = timezone.now().date()
             start_date = gameweek.start_date
             if now < start_date and gameweek.number > 1:
-                gameweek = Gameweek.objects.filter(number=gameweek.number - 1).first()
+                gameweek = HotObjects.gameweek(gameweek.number - 1)
         return gameweek
 
     @staticmethod
-    def get_team_of_the_week(gameweek):
-        performances = PlayerPerformance.objects.filter(
-            gameweek=gameweek
-        ).select_related("player", "player__team")
+    def _candidates(performances: QuerySet) -> List[Dict]:
+        rows = performances.values(
+            "player_id",
+            "player__id",
+            "player__name",
+            "player__position",
+            "player__team__name",
+        ).annotate(**{field: Sum(field) for field in STAT_FIELDS})
+        return [
+            {
+                "club": row["player__team__name"],
+                "position": row["player__position"],
+                "points": row["fantasy_points"] or 0,
+                "name": row["player__name"],
+                "player_id": str(row["player__id"]),
+                **{field: row[field] or 0 for field in STAT_FIELDS},
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def serialize_player(candidate: Dict) -> Dict:
+        return {
+            "player_id": candidate["player_id"],
+            "name": candidate["name"],
+            "team": candidate["club"],
+            "position": candidate["position"],
+            **{field: candidate[field] for field in STAT_FIELDS},
+        }
 
-        if not performances.exists():
+    @classmethod
+    def build(cls, performances: QuerySet, gameweek_number: Optional[int]) -> Optional[Dict]:
+        """Solve the best XI over the given performances and shape the response"""
+        solution = BestXISolver.solve(cls._candidates(performances))
+        if not solution:
             return None
 
-        def get_top_players(position):
-            return list(
-                performances.filter(player__position=position).order_by(
-                    "-fantasy_points"
-                )
-            )
-
-        def select_with_team_limit(players, required, team_counts):
-            selected = []
-            for p in players:
-                if len(selected) >= required:
-                    break
-                team = p.player.team.name if p.player.team else "Unknown"
-                if team_counts.get(team, 0) < 3:
-                    selected.append(p)
-                    team_counts[team] = team_counts.get(team, 0) + 1
-            return selected, team_counts
-
-        team_counts = {}
-        gkps, team_counts = select_with_team_limit(
-            get_top_players("GKP"), 1, team_counts
-        )
-        defs, team_counts = select_with_team_limit(
-            get_top_players("DEF"), 4, team_counts
-        )
-        mids, team_counts = select_with_team_limit(
-            get_top_players("MID"), 4, team_counts
-        )
-        fwds, team_counts = select_with_team_limit(
-            get_top_players("FWD"), 2, team_counts
-        )
+        players = solution["players"]
+        distribution: Dict[str, int] = {}
+        for candidate in players:
+            distribution[candidate["club"]] = distribution.get(candidate["club"], 0) + 1
 
-        total_selected = gkps + defs + mids + fwds
-
-        # Fill remaining if less than 11
-        if len(total_selected) < 11:
-            selected_ids = {p.player.id for p in total_selected}
-            remaining = performances.exclude(player_id__in=selected_ids).order_by(
-                "-fantasy_points"
-            )
-
-            for p in remaining:
-                if len(total_selected) >= 11:
-                    break
-                team = p.player.team.name if p.player.team else "Unknown"
-                if team_counts.get(team, 0) < 3:
-                    total_selected.append(p)
-                    team_counts[team] = team_counts.get(team, 0) + 1
-
-        # Final hard enforcement
-        final_team_counts = defaultdict(int)
-        final_selected = []
-
-        for p in total_selected:
-            team = p.player.team.name if p.player.team else "Unknown"
-            if final_team_counts[team] < 3:
-                final_selected.append(p)
-                final_team_counts[team] += 1
-            if len(final_selected) >= 11:
-                break
-
-        # Split by position
-        def filter_pos(pos, limit):
-            return [p for p in final_selected if p.player.position == pos][:limit]
-
-        result = {
-            "goalkeeper": filter_pos("GKP", 1),
-            "defenders": filter_pos("DEF", 5),
-            "midfielders": filter_pos("MID", 5),
-            "forwards": filter_pos("FWD", 3),
-            "team_counts": dict(final_team_counts),
-            "complete": len(final_selected) == 11,
+        def section(position):
+            return [cls.serialize_player(c) for c in players if c["position"] == position]
+
+        return {
+            "gameweek": gameweek_number,
+            "formation": solution["formation"],
+            "total_points": solution["total_points"],
+            "complete": solution["complete"],
+            "team_distribution": distribution,
+            "goalkeeper": section("GKP"),
+            "defenders": section("DEF"),
+            "midfielders": section("MID"),
+            "forwards": section("FWD"),
         }
-        return result
 
     @staticmethod
-    def serialize_player(perf):
-        return {
-            "player_id": perf.player.id,
-            "name": perf.player.name,
-            "team": perf.player.team.name if perf.player.team else None,
-            "position": perf.player.position,
-            "fantasy_points": perf.fantasy_points,
-            "goals_scored": perf.goals_scored,
-            "assists": perf.assists,
-            "clean_sheets": perf.clean_sheets,
-            "saves": perf.saves,
-            "minutes_played": perf.minutes_played,
+    def _store(gameweek: Optional[Gameweek], team: Optional[Dict]) -> Optional[DreamTeam]:
+        if not team:
+            DreamTeam.objects.filter(gameweek=gameweek).delete()
+            return None
+
+        defaults = {
+            "formation": team["formation"] or "",
+            "total_points": team["total_points"],
+            "complete": team["complete"],
+            "team": team,
         }
+        try:
+            with transaction.atomic():
+                dream_team, _ = DreamTeam.objects.update_or_create(gameweek=gameweek, defaults=defaults)
+        except IntegrityError:
+            # A concurrent store created the row first
+            dream_team, _ = DreamTeam.objects.update_or_create(gameweek=gameweek, defaults=defaults)
+        return dream_team
 
     @classmethod
-    def serialize_team(cls, team_data, gameweek_number):
-        return {
-            "gameweek": gameweek_number,
-            "complete": team_data["complete"],
-            "team_distribution": team_data["team_counts"],
-            "goalkeeper": [cls.serialize_player(p) for p in team_data["goalkeeper"]],
-            "defenders": [cls.serialize_player(p) for p in team_data["defenders"]],
-            "midfielders": [cls.serialize_player(p) for p in team_data["midfielders"]],
-            "forwards": [cls.serialize_player(p) for p in team_data["forwards"]],
-        }
+    def store_gameweek(cls, gameweek: Gameweek) -> Optional[DreamTeam]:
+        """Solve and store a gameweek's Team of the Week"""
+        team = cls.build(PlayerPerformance.objects.filter(gameweek=gameweek), gameweek.number)
+        dream_team = cls._store(gameweek, team)
+        logger.info(
+            f"Team of the Week for Gameweek {gameweek.number}: "
+            f"{dream_team.total_points if dream_team else 0} pts"
+        )
+        return dream_team
+
+    @classmethod
+    def store_season(cls) -> Optional[DreamTeam]:
+        """Solve and store the season dream team over aggregated points"""
+        team = cls.build(PlayerPerformance.objects.all(), None)
+        return cls._store(None, team)
+
+    @classmethod
+    def get_team_of_the_week(cls, gameweek: Gameweek) -> Optional[Dict]:
+        stored = DreamTeam.objects.filter(gameweek=gameweek).values_list("team", flat=True).first()
+        if stored:
+            return stored
+        return cls.build(PlayerPerformance.objects.filter(gameweek=gameweek), gameweek.number)
+
+    @classmethod
+    def get_season_dream_team(cls) -> Optional[Dict]:
+        stored = DreamTeam.objects.filter(gameweek__isnull=True).values_list("team", flat=True).first()
+        if stored:
+            return stored
+        dream_team = cls.store_season()
+        return dream_team.team if dream_team else None
@@ -0,0 +1,130 @@
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from ..models import FantasyTeam
+
+logger = logging.getLogger(__name__)
+
+
+class TeamSummaryCache:
+    """
+    Cached user-team summary documents.
+
+    One document per user holds the serialized FantasyTeamSerializer output for
+    every gameweek variant requested so far ("current" plus any ?gameweek=N), so
+    a request is answered by a single MGET of the document and its two tokens:
+
+    - a per-user generation, incremented when that user's team, selection,
+      players, transfers, chips or scores change
+    - a global version, incremented when something every summary shows changes
+      (the active gameweek)
+
+    A document is only served while both tokens match the ones it was built
+    with. Tokens are read before building, so an invalidation that lands while a
+    document is being built leaves that document stale instead of losing the
+    invalidation. Cache errors are logged and treated as a miss.
+    """
+
+    VERSION_KEY = "team_summary:version"
+    TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def key(user_pk) -> str:
+        return f"team_summary:user:{user_pk}"
+
+    @staticmethod
+    def generation_key(user_pk) -> str:
+        return f"team_summary:generation:{user_pk}"
+
+    @staticmethod
+    def label(gameweek_number=None) -> str:
+        return str(gameweek_number) if gameweek_number else "current"
+
+    @classmethod
+    def get(cls, user_pk, gameweek_number=None) -> Tuple[Optional[Any], Dict]:
+        """
+        Look up a summary.
+
+        Returns:
+            (summary or None, token); pass the token to set() after building a miss
+        """
+        key = cls.key(user_pk)
+        generation_key = cls.generation_key(user_pk)
+        try:
+            values = cache.get_many([key, generation_key, cls.VERSION_KEY])
+        except Exception as e:
+            logger.error(f"Error reading team summary for user {user_pk}: {e}")
+            return None, {}
+
+        token = {
+            "generation": values.get(generation_key) or 0,
+            "version": values.get(cls.VERSION_KEY) or 0,
+            "entries": {},
+        }
+        document = values.get(key)
+        if (
+            document
+            and document["generation"] == token["generation"]
+            and document["version"] == token["version"]
+        ):
+            token["entries"] = document["entries"]
+            return document["entries"].get(cls.label(gameweek_number)), token
+
+        return None, token
+
+    @classmethod
+    def set(cls, user_pk, gameweek_number, summary, token: Dict) -> None:
+        """Store a freshly built summary alongside the other variants still valid"""
+        if not token:
+            return
+        entries = dict(token["entries"])
+        entries[cls.label(gameweek_number)] = summary
+        document = {
+            "generation": token["generation"],
+            "version": token["version"],
+            "entries": entries,
+        }
+        try:
+            cache.set(cls.key(user_pk), document, cls.TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error caching team summary for user {user_pk}: {e}")
+
+    @classmethod
+    def _bump(cls, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            redis_conn = get_redis_connection("default")
+            pipe = redis_conn.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(cache.make_key(key))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error invalidating team summaries: {e}")
+
+    @classmethod
+    def invalidate_users(cls, user_pks: Iterable) -> None:
+        """Invalidate the summaries of the given users once the transaction commits"""
+        keys = {
+            cls.generation_key(user_pk) for user_pk in user_pks if user_pk is not None
+        }
+        if keys:
+            transaction.on_commit(lambda: cls._bump(keys))
+
+    @classmethod
+    def invalidate_teams(cls, team_ids: Iterable) -> None:
+        """Invalidate the summaries of the owners of the given fantasy team pks"""
+        user_pks = FantasyTeam.objects.filter(pk__in=team_ids).values_list(
+            "user_id", flat=True
+        )
+        cls.invalidate_users(set(user_pks))
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        """Invalidate every summary, e.g. when the active gameweek changes"""
+        transaction.on_commit(lambda: cls._bump([cls.VERSION_KEY]))
@@ -0,0 +1,185 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.core.exceptions import ValidationError
+
+from apps.kpl.models import Player
+
+from ..models import FantasyTeam, Gameweek, PlayerTransfer, TeamSelection
+
+
+class TransferPlanner:
+    """
+    Works out the transfers implied by a new squad without touching the database
+    beyond reading the current squad.
+
+    Outgoing players are paired with incoming players of the same position where
+    possible. The team's free transfers are used first; every further transfer
+    costs HIT_COST points, paid from the transfer budget. apply() persists a plan
+    with a single bulk_create.
+    """
+
+    HIT_COST = 4
+
+    @staticmethod
+    def current_squad(fantasy_team: FantasyTeam) -> Dict[str, Player]:
+        """The team's current players keyed by UUID string"""
+        return {
+            str(fp.player.id): fp.player
+            for fp in fantasy_team.players.select_related("player__team")
+        }
+
+    @staticmethod
+    def _pair(players_out: List[Player], players_in: List[Player]) -> List[tuple]:
+        """Pair outgoing and incoming players, like-for-like positions first"""
+        remaining_in = sorted(players_in, key=lambda p: (p.position, p.name))
+        pairs = []
+        unpaired_out = []
+        for player_out in sorted(players_out, key=lambda p: (p.position, p.name)):
+            match = next(
+                (p for p in remaining_in if p.position == player_out.position), None
+            )
+            if match:
+                remaining_in.remove(match)
+                pairs.append((player_out, match))
+            else:
+                unpaired_out.append(player_out)
+        pairs.extend(zip(unpaired_out, remaining_in))
+        return pairs
+
+    @classmethod
+    def plan(
+        cls,
+        fantasy_team: FantasyTeam,
+        player_ids: Iterable,
+        squad_players: Dict[str, Player],
+        current_players: Optional[Dict[str, Player]] = None,
+        is_first_team: Optional[bool] = None,
+    ) -> Dict:
+        """
+        Compute transfers, hit cost and what remains afterwards.
+
+        Args:
+            fantasy_team: Team making the transfers
+            player_ids: UUIDs of every player in the new squad
+            squad_players: New squad players keyed by UUID string
+                (SquadValidator.load_players)
+            current_players: Current squad keyed by UUID string; loaded if omitted
+            is_first_team: Whether this is the team's first selection;
+                looked up if omitted
+
+        Returns:
+            Dict with the transfer pairs, hit cost, remaining free transfers and budget
+        """
+        if is_first_team is None:
+            is_first_team = not TeamSelection.objects.filter(
+                fantasy_team=fantasy_team
+            ).exists()
+
+        free_transfers = fantasy_team.free_transfers
+        transfer_budget = fantasy_team.transfer_budget
+
+        transfers = []
+        if not is_first_team:
+            if current_players is None:
+                current_players = cls.current_squad(fantasy_team)
+            new_ids = {str(player_id) for player_id in player_ids}
+            players_out = [
+                p for pid, p in current_players.items() if pid not in new_ids
+            ]
+            players_in = [
+                squad_players[pid]
+                for pid in new_ids - set(current_players)
+                if pid in squad_players
+            ]
+
+            for index, (player_out, player_in) in enumerate(
+                cls._pair(players_out, players_in)
+            ):
+                transfers.append(
+                    {
+                        "player_out": player_out,
+                        "player_in": player_in,
+                        "cost": 0 if index < free_transfers else cls.HIT_COST,
+                    }
+                )
+
+        num_transfers = len(transfers)
+        hit_cost = sum(transfer["cost"] for transfer in transfers)
+        if num_transfers > free_transfers:
+            remaining_free_transfers = 0
+            remaining_budget = transfer_budget - hit_cost
+        else:
+            remaining_free_transfers = free_transfers - num_transfers
+            remaining_budget = transfer_budget
+
+        return {
+            "is_first_team": is_first_team,
+            "transfers": transfers,
+            "num_transfers": num_transfers,
+            "free_transfers": free_transfers,
+            "hit_cost": hit_cost,
+            "remaining_free_transfers": remaining_free_transfers,
+            "remaining_transfer_budget": remaining_budget,
+            "affordable": Decimal(hit_cost) <= transfer_budget,
+        }
+
+    @staticmethod
+    def apply(
+        fantasy_team: FantasyTeam, plan: Dict, gameweek: Gameweek
+    ) -> List[PlayerTransfer]:
+        """Persist a plan: one bulk_create for the ledger, one update for the team"""
+        if not plan["affordable"]:
+            raise ValidationError(
+                f"Insufficient transfer budget. Required: {plan['hit_cost']}, "
+                f"Available: {fantasy_team.transfer_budget}"
+            )
+
+        created = PlayerTransfer.objects.bulk_create(
+            [
+                PlayerTransfer(
+                    fantasy_team=fantasy_team,
+                    player_out=transfer["player_out"],
+                    player_in=transfer["player_in"],
+                    gameweek=gameweek,
+                    transfer_cost=transfer["cost"],
+                )
+                for transfer in plan["transfers"]
+            ]
+        )
+
+        if plan["transfers"]:
+            fantasy_team.free_transfers = plan["remaining_free_transfers"]
+            fantasy_team.transfer_budget = plan["remaining_transfer_budget"]
+            fantasy_team.save(update_fields=["free_transfers", "transfer_budget"])
+
+        return created
+
+    @staticmethod
+    def serialize(plan: Dict) -> Dict:
+        def player(p: Player) -> Dict:
+            return {
+                "id": str(p.id),
+                "name": p.name,
+                "position": p.position,
+                "team": p.team.name,
+                "price": float(p.current_value),
+            }
+
+        return {
+            "is_first_team": plan["is_first_team"],
+            "transfers": [
+                {
+                    "player_out": player(transfer["player_out"]),
+                    "player_in": player(transfer["player_in"]),
+                    "cost": transfer["cost"],
+                }
+                for transfer in plan["transfers"]
+            ],
+            "transfers_made": plan["num_transfers"],
+            "free_transfers": plan["free_transfers"],
+            "transfer_cost": plan["hit_cost"],
+            "remaining_free_transfers": plan["remaining_free_transfers"],
+            "remaining_transfer_budget": float(plan["remaining_transfer_budget"]),
+            "affordable": plan["affordable"],
+        }
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.fantasy.models import (
+    Chip,
+    FantasyLeague,
+    FantasyPlayer,
+    FantasyTeam,
+    PlayerTransfer,
+    TeamSelection,
+)
+from apps.fantasy.services.gameweek_status import STATUS_FIELDS, GameweekStatusService
+from apps.fantasy.services.leaderboard import LeaderboardService
+from apps.fantasy.services.team_summary import TeamSummaryCache
+from apps.kpl.models import Fixture, FixtureLineup, Gameweek
+
+
+@receiver(m2m_changed, sender=FantasyLeague.teams.through)
+def sync_league_leaderboard(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        LeaderboardService.update_teams([instance.pk] if reverse else pk_set)
+    elif action == "post_remove":
+        if reverse:
+            for league in FantasyLeague.objects.filter(pk__in=pk_set):
+                LeaderboardService.remove_league_members(league, [instance.pk])
+        else:
+            LeaderboardService.remove_league_members(instance, pk_set)
+    elif action == "post_clear" and not reverse:
+        LeaderboardService.clear_league(instance)
+
+
+@receiver(post_save, sender=FantasyTeam)
+@receiver(post_delete, sender=FantasyTeam)
+def invalidate_team_summary(sender, instance, **kwargs):
+    TeamSummaryCache.invalidate_users([instance.user_id])
+
+
+@receiver(post_save, sender=TeamSelection)
+@receiver(post_delete, sender=TeamSelection)
+@receiver(post_save, sender=FantasyPlayer)
+@receiver(post_delete, sender=FantasyPlayer)
+@receiver(post_save, sender=PlayerTransfer)
+@receiver(post_save, sender=Chip)
+def invalidate_owner_team_summary(sender, instance, **kwargs):
+    TeamSummaryCache.invalidate_teams([instance.fantasy_team_id])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_team_summary(sender, instance, created, **kwargs):
+    if not created:
+        TeamSummaryCache.invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=Gameweek)
+def invalidate_all_team_summaries(sender, instance, **kwargs):
+    TeamSummaryCache.invalidate_all()
+
+
+@receiver(post_save, sender=Fixture)
+@receiver(post_delete, sender=Fixture)
+def refresh_fixture_gameweek_status(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not STATUS_FIELDS.intersection(update_fields):
+        return
+    fixture_pk = instance.pk
+    transaction.on_commit(lambda: GameweekStatusService().refresh_fixture(fixture_pk))
+
+
+@receiver(post_save, sender=FixtureLineup)
+@receiver(post_delete, sender=FixtureLineup)
+def refresh_lineup_gameweek_status(sender, instance, **kwargs):
+    fixture_pk = instance.fixture_id
+    transaction.on_commit(lambda: GameweekStatusService().refresh_fixture(fixture_pk))
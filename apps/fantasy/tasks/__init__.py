@@ -0,0 +1,2 @@
+from .leaderboards import reconcile_leaderboards  # Explicitly import the task
+from .scoring import score_gameweek_task, store_dream_teams, update_overall_ranks  # Explicitly import the task
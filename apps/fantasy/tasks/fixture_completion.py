@@ -6,11 +6,14 @@ from django.db import transaction
 from django.db.models import Q
 
 from apps.kpl.models import Fixture, Team
-from apps.fantasy.models import PlayerPerformance, FantasyPlayer, TeamSelection
+from apps.kpl.services.hot_objects import HotObjects
+from apps.fantasy.models import PlayerPerformance
+from apps.fantasy.services.scoring import ScoringEngine
 from apps.kpl.services.match_events import (
     MatchEventService,
     FantasyPointsCalculator,
-    FixtureValidator
+    FixtureValidator,
+    ProcessedEventLedger,
 )
 
 logger = logging.getLogger(__name__)
@@ -56,11 +59,15 @@ def process_clean_sheets_on_completion(fixture_id):
         total_updated = 0
         results = []
         
+        events = ProcessedEventLedger(fixture)
         for cs_team_data in clean_sheet_teams:
-            result = _process_team_clean_sheet(fixture, cs_team_data["team"])
+            result = _process_team_clean_sheet(fixture, cs_team_data["team"], events)
             total_updated += result["updated_count"]
             results.append(result)
         
+        if total_updated:
+            ScoringEngine.score_fixture(fixture)
+
         logger.info(f"Clean sheet processing complete: {total_updated} players updated")
         
         return {
@@ -79,7 +86,7 @@ def process_clean_sheets_on_completion(fixture_id):
         return {"success": False, "message": str(e)}
 
 
-def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
+def _process_team_clean_sheet(fixture: Fixture, team: Team, events: ProcessedEventLedger) -> Dict:
     """
     Process clean sheet for a specific team.
     Awards points to GKP, DEF, and MID who played.
@@ -99,6 +106,7 @@ def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
     logger.info(f"Found {performances.count()} players from {team.name} who played")
     
     with transaction.atomic():
+        events.lock()
         for performance in performances:
             player = performance.player
             position = player.position
@@ -113,7 +121,7 @@ def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
                 "clean_sheet", fixture.id, player.id, 0, f"team_{team.id}"
             )
             
-            if MatchEventService._is_event_processed(fixture, event_key):
+            if events.is_processed(event_key):
                 logger.info(f"Clean sheet already processed for {player.name}")
                 continue
             
@@ -128,19 +136,17 @@ def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
                 is_captain = MatchEventService._get_captain_status(player, fixture)
                 
                 incremental_points = FantasyPointsCalculator.calculate_incremental(
-                    performance, old_values, is_captain
+                    performance, old_values
                 )
                 performance.fantasy_points += incremental_points
                 
                 performance.save()
                 
                 # Mark event as processed
-                MatchEventService._mark_event_processed(
-                    fixture, "clean_sheet", event_key, player=player
+                events.mark(
+                    "clean_sheet", event_key, player=player
                 )
                 
-                _update_fantasy_teams_with_captain_logic(player, fixture, incremental_points)
-                
                 updated_players.append({
                     "player_name": player.name,
                     "position": position,
@@ -165,6 +171,8 @@ def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
                     "player_name": player.name,
                     "error": str(e)
                 })
+
+        events.flush()
     
     logger.info(
         f"Clean sheet processing for {team.name}: "
@@ -180,98 +188,13 @@ def _process_team_clean_sheet(fixture: Fixture, team: Team) -> Dict:
     }
 
 
-def _update_fantasy_teams_with_captain_logic(player, fixture, base_incremental_points):
-    """
-    Update fantasy team points with proper captain/vice-captain handling.
-    If captain didn't play, vice-captain gets double points.
-    """
-    try:
-        fantasy_players = FantasyPlayer.objects.filter(player=player)
-        
-        for fantasy_player in fantasy_players:
-            try:
-                team_selection = TeamSelection.objects.get(
-                    fantasy_team=fantasy_player.fantasy_team,
-                    gameweek=fixture.gameweek,
-                    is_finalized=True,
-                )
-                
-                is_starter = fantasy_player in team_selection.starters.all()
-                
-                if not is_starter:
-                    logger.debug(f"{player.name} not in starting lineup for {fantasy_player.fantasy_team.name}")
-                    continue
-                
-                points_to_add = base_incremental_points
-                role = "starter"
-                
-                if team_selection.captain.player == player:
-                    captain_performance = PlayerPerformance.objects.get(
-                        player=team_selection.captain.player,
-                        fixture=fixture,
-                        gameweek=fixture.gameweek
-                    )
-                    
-                    if captain_performance.minutes_played > 0:
-                        role = "captain"
-                    else:
-                        logger.info(f"Captain {team_selection.captain.player.name} didn't play")
-                        
-                elif team_selection.vice_captain.player == player:
-                    captain_performance = PlayerPerformance.objects.filter(
-                        player=team_selection.captain.player,
-                        fixture=fixture,
-                        gameweek=fixture.gameweek
-                    ).first()
-                    
-                    if not captain_performance or captain_performance.minutes_played == 0:
-                        points_to_add = base_incremental_points * 2
-                        role = "vice_captain_active"
-                        logger.info(
-                            f"Vice-captain {player.name} gets double points "
-                            f"(captain didn't play) for {fantasy_player.fantasy_team.name}"
-                        )
-                    else:
-                        role = "vice_captain"
-                
-                fantasy_player.total_points += points_to_add
-                fantasy_player.save()
-                
-                fantasy_team = fantasy_player.fantasy_team
-                fantasy_team.total_points += points_to_add
-                fantasy_team.save()
-                
-                logger.info(
-                    f"Updated {fantasy_player.fantasy_team.name}: "
-                    f"+{points_to_add} points for {player.name} ({role})"
-                )
-                
-            except TeamSelection.DoesNotExist:
-                logger.debug(f"No finalized team selection for {fantasy_player.fantasy_team.name} in GW{fixture.gameweek.number}")
-                continue
-            except PlayerPerformance.DoesNotExist:
-                logger.warning(f"No performance record for {player.name} in fixture {fixture.id}")
-                continue
-            except Exception as e:
-                logger.error(
-                    f"Error updating fantasy team {fantasy_player.fantasy_team.name} "
-                    f"for player {player.name}: {e}",
-                    exc_info=True
-                )
-                
-    except Exception as e:
-        logger.error(f"Error in captain/vice-captain logic for {player.name}: {e}", exc_info=True)
-
-
 def trigger_clean_sheet_processing():
     """
     Utility function to manually trigger clean sheet processing for all completed fixtures
     in the active gameweek (useful for testing or fixing missing clean sheets).
     """
-    from apps.kpl.models import Gameweek
-    
     try:
-        active_gameweek = Gameweek.objects.filter(is_active=True).first()
+        active_gameweek = HotObjects.active_gameweek()
         if not active_gameweek:
             logger.info("No active gameweek found")
             return {"success": False, "message": "No active gameweek"}
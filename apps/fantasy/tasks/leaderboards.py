@@ -0,0 +1,20 @@
+import logging
+
+from celery import shared_task
+
+from apps.fantasy.services.leaderboard import LeaderboardService
+from config.settings import base
+
+logging.config.dictConfig(base.DEFAULT_LOGGING)
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_leaderboards():
+    """Rebuild the Redis leaderboards from the database to repair any drift"""
+    try:
+        result = LeaderboardService.reconcile()
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.error(f"Error reconciling leaderboards: {str(e)}")
+        return {"status": "error", "message": str(e)}
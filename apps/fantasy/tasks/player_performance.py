@@ -1,8 +1,11 @@
 import logging
+from typing import Dict
 
 from django.db import transaction
 
 from apps.fantasy.models import PlayerPerformance
+from apps.fantasy.services.scoring import ScoringEngine
+from apps.fantasy.services.scoring_rules import SCORED_FIELDS, ScoringRules
 from apps.kpl.models import Player
 from config.settings import base
 
@@ -27,6 +30,63 @@ match_data = {
 }
 
 
+def upsert_fixture_performances(fixture, rows: Dict[int, Dict]) -> Dict:
+    """
+    Make the fixture's PlayerPerformance rows match the desired set in one upsert.
+
+    Args:
+        fixture: Fixture being written
+        rows: Mapping of player pk -> {stat field: value, "fantasy_points": value}
+
+    Returns:
+        Dict of player pk sets: created, updated, deleted, plus the unchanged count
+    """
+    written_fields = [*SCORED_FIELDS, "fantasy_points"]
+    existing = {
+        values[0]: values[1:]
+        for values in PlayerPerformance.objects.filter(fixture=fixture).values_list(
+            "player_id", "gameweek_id", *written_fields
+        )
+    }
+
+    created, updated = set(), set()
+    performances = []
+    for player_id, values in rows.items():
+        desired = (fixture.gameweek_id, *(values[field] for field in written_fields))
+        current = existing.get(player_id)
+        if current == desired:
+            continue
+
+        (updated if current else created).add(player_id)
+        performances.append(
+            PlayerPerformance(
+                player_id=player_id,
+                fixture=fixture,
+                gameweek_id=fixture.gameweek_id,
+                **{field: values[field] for field in written_fields},
+            )
+        )
+
+    if performances:
+        PlayerPerformance.objects.bulk_create(
+            performances,
+            update_conflicts=True,
+            unique_fields=["player", "fixture"],
+            update_fields=["gameweek", *written_fields, "updated_at"],
+        )
+
+    deleted = set(existing) - set(rows)
+    if deleted:
+        PlayerPerformance.objects.filter(fixture=fixture, player_id__in=deleted).delete()
+
+    return {
+        "created": created,
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": len(rows) - len(created) - len(updated),
+    }
+
+
 def update_complete_player_performance(
     fixture, home_scorers, away_scorers, match_data=None
 ):
@@ -133,49 +193,7 @@ def update_complete_player_performance(
                 ):
                     stats["clean_sheets"] = 1
 
-    def calculate_fantasy_points(stats, position):
-        points = 0
-
-        if stats["minutes_played"] > 0:
-            points += 1
-        if stats["minutes_played"] >= 60:
-            points += 1
-
-        if position == "GKP":
-            points += stats["goals_scored"] * 6
-        elif position == "DEF":
-            points += stats["goals_scored"] * 6
-        elif position == "MID":
-            points += stats["goals_scored"] * 5
-        else:
-            points += stats["goals_scored"] * 4
-
-        points += stats["assists"] * 3
-
-        if position in ["GKP", "DEF"]:
-            points += stats["clean_sheets"] * 4
-        elif position == "MID":
-            points += stats["clean_sheets"] * 1
-
-        # Saves (GKP only, every 3 saves = 1 point)
-        if position == "GKP":
-            points += stats["saves"] // 3
-
-        points += stats["penalties_saved"] * 5
-
-        points -= stats["penalties_missed"] * 2
-
-        points -= stats["own_goals"] * 2
-
-        points -= stats["yellow_cards"] * 1
-
-        points -= stats["red_cards"] * 3
-
-        return points
-
     with transaction.atomic():
-        PlayerPerformance.objects.filter(fixture=fixture).delete()
-
         process_scorers(home_scorers, fixture.home_team, fixture.away_team)
         process_scorers(away_scorers, fixture.away_team, fixture.home_team)
 
@@ -248,38 +266,26 @@ def update_complete_player_performance(
 
         apply_clean_sheets(fixture)
 
-        performance_count = 0
-        for player_id, stats in player_stats.items():
+        rows = {}
+        for stats in player_stats.values():
             player_obj = stats["player"]
-            fantasy_points = calculate_fantasy_points(stats, player_obj.position)
-
-            PlayerPerformance.objects.create(
-                player=player_obj,
-                gameweek=fixture.gameweek,
-                fixture=fixture,
-                goals_scored=stats["goals_scored"],
-                assists=stats["assists"],
-                own_goals=stats["own_goals"],
-                yellow_cards=stats["yellow_cards"],
-                red_cards=stats["red_cards"],
-                minutes_played=stats["minutes_played"],
-                clean_sheets=stats["clean_sheets"],
-                saves=stats["saves"],
-                penalties_saved=stats["penalties_saved"],
-                penalties_missed=stats["penalties_missed"],
-                fantasy_points=fantasy_points,
-            )
+            rows[player_obj.pk] = {
+                **{field: stats[field] for field in SCORED_FIELDS},
+                "fantasy_points": ScoringRules.calculate(stats, player_obj.position),
+            }
 
-            performance_count += 1
-            logger.info(
-                f"Updated performance for {player_obj.name}: "
-                f"{stats['goals_scored']}G, {stats['assists']}A, "
-                f"{stats['minutes_played']}min, {fantasy_points} pts"
-            )
+        diff = upsert_fixture_performances(fixture, rows)
+        performance_count = len(rows)
 
         logger.info(
-            f"Created {performance_count} player performances for fixture {fixture.id} "
-            f"({fixture.home_team} vs {fixture.away_team})"
+            f"Wrote {performance_count} player performances for fixture {fixture.id} "
+            f"({fixture.home_team} vs {fixture.away_team}): "
+            f"{len(diff['created'])} created, {len(diff['updated'])} updated, "
+            f"{len(diff['deleted'])} deleted"
         )
 
+        changed_players = diff["created"] | diff["updated"] | diff["deleted"]
+        if changed_players and fixture.gameweek:
+            ScoringEngine.score_players(fixture.gameweek, changed_players)
+
         return performance_count
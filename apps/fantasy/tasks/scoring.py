@@ -0,0 +1,77 @@
+import logging
+
+from celery import shared_task
+
+from apps.fantasy.services.scoring import ScoringEngine
+from apps.fantasy.services.team_service import TeamOfTheWeekService
+from apps.kpl.models import Gameweek
+from config.settings import base
+
+logging.config.dictConfig(base.DEFAULT_LOGGING)
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def score_gameweek_task(gameweek_id):
+    """
+    Rescore every fantasy team with a finalized selection in the gameweek.
+    Runs when the gameweek stops being active so totals are settled from the
+    final PlayerPerformance rows.
+    """
+    try:
+        gameweek = Gameweek.objects.get(id=gameweek_id)
+    except Gameweek.DoesNotExist:
+        logger.error(f"Gameweek {gameweek_id} not found for scoring")
+        return {"status": "error", "message": "Gameweek not found"}
+
+    try:
+        # Rank movement is shown against the ranks going into this gameweek
+        ScoringEngine.snapshot_previous_ranks()
+        result = ScoringEngine.score_gameweek(gameweek)
+        update_overall_ranks.delay()
+        store_dream_teams.delay(gameweek_id)
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.error(f"Error scoring gameweek {gameweek.number}: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+
+@shared_task
+def update_overall_ranks():
+    """
+    Refresh FantasyTeam.overall_rank for every team.
+    Runs after each completed fixture and after gameweek scoring.
+    """
+    try:
+        updated = ScoringEngine.rank_overall()
+        return {"status": "success", "teams_updated": updated}
+    except Exception as e:
+        logger.error(f"Error updating overall ranks: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+
+@shared_task
+def store_dream_teams(gameweek_id):
+    """
+    Solve and store the completed gameweek's Team of the Week and refresh the
+    season dream team, so both endpoints are lookups.
+    """
+    try:
+        gameweek = Gameweek.objects.get(id=gameweek_id)
+    except Gameweek.DoesNotExist:
+        logger.error(f"Gameweek {gameweek_id} not found for Team of the Week")
+        return {"status": "error", "message": "Gameweek not found"}
+
+    try:
+        team_of_the_week = TeamOfTheWeekService.store_gameweek(gameweek)
+        season = TeamOfTheWeekService.store_season()
+        return {
+            "status": "success",
+            "gameweek_points": team_of_the_week.total_points if team_of_the_week else 0,
+            "season_points": season.total_points if season else 0,
+        }
+    except Exception as e:
+        logger.error(
+            f"Error storing dream teams for gameweek {gameweek.number}: {str(e)}"
+        )
+        return {"status": "error", "message": str(e)}
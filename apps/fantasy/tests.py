@@ -0,0 +1,382 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.fantasy.models import (
+    ChipType,
+    FantasyPlayer,
+    FantasyPlayerGameweekScore,
+    FantasyTeam,
+    PlayerPerformance,
+    TeamGameweekScore,
+    TeamSelection,
+)
+from apps.fantasy.services.scoring import ScoringEngine
+from apps.fantasy.services.scoring_rules import POSITIONS, ScoringRules
+from apps.kpl.models import Fixture, Gameweek, Player, Team
+from apps.kpl.tasks.gameweeks import (
+    create_selections_from_previous,
+    finalize_teams_for_gameweek,
+)
+
+GAMEWEEK_PLAYERS_URL = "/api/v1/fantasy/players/gameweek-players/?gameweek=1"
+
+
+def _squad(size, finalized=False):
+    """
+    Fantasy team whose gameweek 1 selection has `size` players: the first 11
+    start, the first is captain and the second vice-captain. Player i scores
+    i + 1 points.
+    """
+    # At most 3 players may come from one real team
+    teams = [
+        Team.objects.create(
+            name=f"Club {size}-{index}", logo_url="http://example.com/club.png"
+        )
+        for index in range((size + 2) // 3)
+    ]
+    gameweek, _ = Gameweek.objects.get_or_create(
+        number=1,
+        defaults={
+            "start_date": datetime.date(2025, 1, 1),
+            "end_date": datetime.date(2025, 1, 7),
+            "transfer_deadline": timezone.now(),
+            "is_active": True,
+        },
+    )
+    fixture = Fixture.objects.create(
+        home_team=teams[0],
+        away_team=teams[1],
+        match_date=timezone.now(),
+        venue="Stadium",
+        gameweek=gameweek,
+        status="completed",
+    )
+
+    user = User.objects.create_user(
+        username=f"manager{size}",
+        email=f"manager{size}@example.com",
+        first_name="Test",
+        last_name="Manager",
+        password="password",
+    )
+    fantasy_team = FantasyTeam.objects.create(user=user, name=f"Squad {size}")
+
+    fantasy_players = []
+    for index in range(size):
+        player = Player.objects.create(
+            name=f"Player {size}-{index}",
+            team=teams[index // 3],
+            position="MID",
+        )
+        PlayerPerformance.objects.create(
+            player=player,
+            fixture=fixture,
+            gameweek=gameweek,
+            minutes_played=90,
+            fantasy_points=index + 1,
+        )
+        fantasy_players.append(
+            FantasyPlayer.objects.create(
+                fantasy_team=fantasy_team,
+                player=player,
+                purchase_price=5,
+                current_value=5,
+                gameweek_added=gameweek,
+            )
+        )
+
+    selection = TeamSelection.objects.create(
+        fantasy_team=fantasy_team,
+        gameweek=gameweek,
+        formation="4-4-2",
+        captain=fantasy_players[0],
+        vice_captain=fantasy_players[1],
+    )
+    selection.starters.set(fantasy_players[:11])
+    selection.bench.set(fantasy_players[11:])
+    if finalized:
+        TeamSelection.objects.filter(pk=selection.pk).update(is_finalized=True)
+
+    return fantasy_team, fantasy_players, gameweek
+
+
+def _client(fantasy_team):
+    client = APIClient()
+    client.force_authenticate(fantasy_team.user)
+    return client
+
+
+@pytest.mark.django_db
+def test_gameweek_players_query_count_does_not_grow_with_squad(
+    django_assert_num_queries,
+):
+    client = _client(_squad(6)[0])
+    with CaptureQueriesContext(connection) as baseline:
+        response = client.get(GAMEWEEK_PLAYERS_URL)
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+
+    for size in (11, 15):
+        client = _client(_squad(size)[0])
+        with django_assert_num_queries(len(baseline.captured_queries)):
+            response = client.get(GAMEWEEK_PLAYERS_URL)
+        assert response.status_code == 200
+        assert len(response.json()) == size
+
+
+LINEUP = {
+    "players": [
+        {"role": "C", "fantasy_player": 1, "player": 10},
+        {"role": "VC", "fantasy_player": 2, "player": 20},
+        {"role": "S", "fantasy_player": 3, "player": 30},
+        {"role": "B", "fantasy_player": 4, "player": 40},
+    ]
+}
+STATS = {10: (5, 90), 20: (3, 90), 30: (2, 90), 40: (4, 90)}
+
+
+def test_score_lineup_doubles_captain():
+    assert ScoringEngine._score_lineup(LINEUP, None, STATS) == (
+        10,
+        5,
+        0,
+        {1: 10, 2: 3, 3: 2, 4: 0},
+    )
+
+
+def test_score_lineup_triple_captain():
+    assert ScoringEngine._score_lineup(LINEUP, ChipType.TRIPLE_CAPTAIN, STATS) == (
+        10,
+        10,
+        0,
+        {1: 15, 2: 3, 3: 2, 4: 0},
+    )
+
+
+def test_score_lineup_bench_boost():
+    assert ScoringEngine._score_lineup(LINEUP, ChipType.BENCH_BOOST, STATS) == (
+        10,
+        5,
+        4,
+        {1: 10, 2: 3, 3: 2, 4: 4},
+    )
+
+
+def test_score_lineup_vice_captain_stands_in_when_captain_did_not_play():
+    stats = {**STATS, 10: (0, 0)}
+    assert ScoringEngine._score_lineup(LINEUP, None, stats) == (
+        5,
+        3,
+        0,
+        {1: 0, 2: 6, 3: 2, 4: 0},
+    )
+
+
+@pytest.mark.django_db
+def test_write_gameweek_scores():
+    fantasy_team, fantasy_players, gameweek = _squad(15, finalized=True)
+
+    assert ScoringEngine.write_gameweek_scores(gameweek) == 1
+    ScoringEngine.refresh_totals()
+
+    score = TeamGameweekScore.objects.get(fantasy_team=fantasy_team, gameweek=gameweek)
+    # Starters score 1..11, the captain's 1 point is counted twice
+    assert (score.raw_points, score.captain_bonus, score.chip_points) == (66, 1, 0)
+    assert (score.points, score.total_points) == (67, 67)
+
+    earned = dict(
+        FantasyPlayerGameweekScore.objects.filter(gameweek=gameweek).values_list(
+            "fantasy_player_id", "points"
+        )
+    )
+    assert earned[fantasy_players[0].pk] == 2
+    assert earned[fantasy_players[2].pk] == 3
+    assert earned[fantasy_players[14].pk] == 0
+
+    fantasy_team.refresh_from_db()
+    assert fantasy_team.total_points == 67
+
+
+@pytest.mark.django_db
+def test_score_players_rescores_only_the_changed_gameweek_share():
+    fantasy_team, fantasy_players, gameweek = _squad(15, finalized=True)
+    other_team, _, _ = _squad(14, finalized=True)
+    ScoringEngine.score_gameweek(gameweek)
+
+    scorer = fantasy_players[2]
+    PlayerPerformance.objects.filter(player=scorer.player).update(fantasy_points=8)
+
+    assert ScoringEngine.score_players(gameweek, [scorer.player_id]) == 1
+
+    fantasy_team.refresh_from_db()
+    scorer.refresh_from_db()
+    assert fantasy_team.total_points == 72
+    assert scorer.total_points == 8
+
+    other_team.refresh_from_db()
+    assert (
+        other_team.total_points
+        == TeamGameweekScore.objects.get(fantasy_team=other_team).points
+    )
+
+
+@pytest.mark.django_db
+def test_gameweek_players_snapshot_rows_match_scoring():
+    fantasy_team, fantasy_players, gameweek = _squad(15, finalized=True)
+    captain, vice_captain = fantasy_players[0], fantasy_players[1]
+    PlayerPerformance.objects.filter(player=captain.player).update(
+        fantasy_points=0, minutes_played=0
+    )
+    ScoringEngine.score_gameweek(gameweek)
+
+    response = _client(fantasy_team).get(GAMEWEEK_PLAYERS_URL)
+    assert response.status_code == 200
+    rows = {row["id"]: row for row in response.json()}
+
+    # The captain did not play, so the vice-captain's 2 points are doubled
+    assert rows[str(vice_captain.id)]["gameweek_points"] == 4
+    assert rows[str(captain.id)]["gameweek_points"] == 0
+    assert rows[str(fantasy_players[14].id)]["gameweek_points"] is None
+    for fantasy_player in FantasyPlayer.objects.filter(fantasy_team=fantasy_team):
+        row = rows[str(fantasy_player.id)]
+        assert row["total_points_for_team"] == fantasy_player.total_points
+        assert row["current_value"] == 4.0
+        assert "slot" not in row
+
+
+@pytest.mark.django_db
+def test_rank_movement_is_kept_until_the_next_snapshot():
+    first, second = _squad(11)[0], _squad(12)[0]
+    FantasyTeam.objects.filter(pk=first.pk).update(total_points=10)
+    FantasyTeam.objects.filter(pk=second.pk).update(total_points=20)
+    ScoringEngine.rank_overall()
+    ScoringEngine.snapshot_previous_ranks()
+
+    FantasyTeam.objects.filter(pk=first.pk).update(total_points=30)
+    assert ScoringEngine.rank_overall() == 2
+    # Later re-ranks within the gameweek keep the movement
+    assert ScoringEngine.rank_overall() == 0
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.overall_rank, first.previous_rank) == (1, 2)
+    assert (second.overall_rank, second.previous_rank) == (2, 1)
+
+
+@pytest.mark.django_db
+def test_rescore_matches_calculate_for_every_position():
+    _, _, gameweek = _squad(4)
+    fixture = Fixture.objects.get(gameweek=gameweek)
+    stat_lines = [
+        {
+            "minutes_played": 90,
+            "goals_scored": 2,
+            "assists": 1,
+            "clean_sheets": 1,
+            "saves": 7,
+        },
+        {"minutes_played": 59, "penalties_saved": 1, "penalties_missed": 1, "saves": 2},
+        {
+            "minutes_played": 30,
+            "own_goals": 1,
+            "yellow_cards": 1,
+            "red_cards": 1,
+            "saves": 3,
+        },
+        {"minutes_played": 0},
+    ]
+    performances = []
+    for position in POSITIONS:
+        for stats in stat_lines:
+            player = Player.objects.create(
+                name=f"{position} {len(performances)}",
+                team=fixture.home_team,
+                position=position,
+            )
+            performances.append(
+                PlayerPerformance.objects.create(
+                    player=player, fixture=fixture, gameweek=gameweek, **stats
+                )
+            )
+
+    ScoringRules.rescore(
+        PlayerPerformance.objects.filter(pk__in=[p.pk for p in performances])
+    )
+
+    for performance in performances:
+        performance.refresh_from_db()
+        assert performance.fantasy_points == ScoringRules.calculate(
+            performance, performance.player.position
+        )
+    # Nothing is written when the points are already right
+    assert (
+        ScoringRules.rescore(
+            PlayerPerformance.objects.filter(pk__in=[p.pk for p in performances])
+        )
+        == 0
+    )
+
+
+@pytest.mark.django_db
+def test_rescore_season_dry_run_saves_nothing():
+    fantasy_team, fantasy_players, gameweek = _squad(15, finalized=True)
+    ScoringEngine.score_gameweek(gameweek)
+    fantasy_team.refresh_from_db()
+    points = dict(PlayerPerformance.objects.values_list("pkid", "fantasy_points"))
+
+    out = io.StringIO()
+    call_command("rescore_season", dry_run=True, stdout=out)
+
+    assert "Dry run complete" in out.getvalue()
+    assert (
+        dict(PlayerPerformance.objects.values_list("pkid", "fantasy_points")) == points
+    )
+    assert (
+        FantasyTeam.objects.get(pk=fantasy_team.pk).total_points
+        == fantasy_team.total_points
+    )
+    assert TeamGameweekScore.objects.get(fantasy_team=fantasy_team).points == 67
+
+
+@pytest.mark.django_db
+def test_finalize_rolls_forward_only_teams_with_a_finalized_selection():
+    rolled, fantasy_players, gameweek = _squad(15, finalized=True)
+    unfinalized = _squad(12)[0]
+    next_gameweek = Gameweek.objects.create(
+        number=2,
+        start_date=datetime.date(2025, 1, 8),
+        end_date=datetime.date(2025, 1, 14),
+        transfer_deadline=timezone.now(),
+    )
+
+    totals = finalize_teams_for_gameweek(
+        next_gameweek,
+        min(rolled.pkid, unfinalized.pkid),
+        max(rolled.pkid, unfinalized.pkid) + 1,
+    )
+
+    assert totals == {"finalized": 0, "created_from_previous": 1, "skipped": 1}
+    assert not TeamSelection.objects.filter(
+        fantasy_team=unfinalized, gameweek=next_gameweek
+    ).exists()
+
+    selection = TeamSelection.objects.get(fantasy_team=rolled, gameweek=next_gameweek)
+    assert selection.is_finalized
+    assert (selection.captain, selection.vice_captain) == (
+        fantasy_players[0],
+        fantasy_players[1],
+    )
+    assert set(selection.starters.all()) == set(fantasy_players[:11])
+    assert set(selection.bench.all()) == set(fantasy_players[11:])
+
+    # A second pass finds nothing left to copy
+    assert create_selections_from_previous(next_gameweek) == 0
+    assert selection.starters.count() == 11
@@ -5,6 +5,7 @@ from .views import (
     FantasyPlayerViewSet,
     FantasyTeamViewSet,
     GameweekViewSet,
+    LeaderboardViewSet,
     PlayerPerformanceViewSet,
 )
 
@@ -13,6 +14,7 @@ router.register(r"teams", FantasyTeamViewSet, basename="fantasy-teams")
 router.register(r"players", FantasyPlayerViewSet, basename="fantasy-players")
 router.register(r"performance", PlayerPerformanceViewSet, basename="performance")
 router.register(r"gameweek", GameweekViewSet, basename="gameweek")
+router.register(r"leaderboards", LeaderboardViewSet, basename="leaderboards")
 
 urlpatterns = [
     path("", include(router.urls)),
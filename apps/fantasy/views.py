@@ -1,21 +1,25 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Count, Q, Sum
 from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ViewSet
 from django.db import IntegrityError, transaction
 
 from apps.fantasy.models import (
     Chip,
     ChipType,
+    FantasyLeague,
     FantasyPlayer,
     FantasyTeam,
     PlayerPerformance,
     TeamSelection,
 )
 from apps.kpl.models import Gameweek, Player
+from apps.kpl.services.hot_objects import HotObjects
 
+from .cache_utils import get_or_fill, get_or_fill_response
 from .serializers import (
     ChipSerializer,
     FantasyPlayerSerializer,
@@ -25,7 +29,12 @@ from .serializers import (
 )
 from .services.fantasy import FantasyService
 from .services.gameweek_status import GameweekStatusService
+from .services.leaderboard import LeaderboardService
+from .services.lineup_snapshot import LineupSnapshot
+from .services.squad_validator import SquadValidator
 from .services.team_service import TeamOfTheWeekService
+from .services.team_summary import TeamSummaryCache
+from .services.transfers import TransferPlanner
 
 
 class FantasyTeamViewSet(ModelViewSet):
@@ -60,9 +69,12 @@ class FantasyTeamViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], url_path="user-team")
     def get_user_team(self, request):
         try:
-            teams = FantasyTeam.objects.filter(user=request.user).select_related('user')
-            
             gameweek_number = request.query_params.get("gameweek")
+            summary, token = TeamSummaryCache.get(request.user.pk, gameweek_number)
+            if summary is not None:
+                return Response(summary, status=status.HTTP_200_OK)
+
+            teams = FantasyTeam.objects.filter(user=request.user).select_related('user')
             requested_gameweek = None
             
             if gameweek_number:
@@ -79,7 +91,10 @@ class FantasyTeamViewSet(ModelViewSet):
                 many=True,
                 context={'requested_gameweek': requested_gameweek}
             )
-            
+            TeamSummaryCache.set(
+                request.user.pk, gameweek_number, serializer.data, token
+            )
+
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -99,7 +114,9 @@ class FantasyPlayerViewSet(ModelViewSet):
         try:
             team = FantasyTeam.objects.filter(user=request.user)
             if team.exists():
-                players = FantasyPlayer.objects.filter(fantasy_team=team.first())
+                players = FantasyPlayer.objects.filter(
+                    fantasy_team=team.first()
+                ).select_related("fantasy_team", "player__team")
                 serializer = self.get_serializer(players, many=True)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             else:
@@ -131,23 +148,24 @@ class FantasyPlayerViewSet(ModelViewSet):
 
                 gameweek = last_selection.gameweek if last_selection else None
                 if not gameweek:
-                    gameweek = Gameweek.objects.filter(is_active=True).first()
+                    gameweek = HotObjects.active_gameweek()
 
             try:
-                # Optimize: prefetch related data to avoid N+1 queries
-                team_selection = TeamSelection.objects.prefetch_related(
-                    'starters__player__team',
-                    'starters__player__performances',
-                    'bench__player__team',
-                    'bench__player__performances'
-                ).select_related('captain', 'vice_captain').get(
-                    fantasy_team=fantasy_team, gameweek=gameweek
-                )
+                team_selection = TeamSelection.objects.select_related(
+                    "fantasy_team"
+                ).get(fantasy_team=fantasy_team, gameweek=gameweek)
 
-                # Combine and select_related to avoid N+1 queries when serializing
-                players = list(team_selection.starters.select_related('player__team').all()) + list(
-                    team_selection.bench.select_related('player__team').all()
-                )
+                # Finalized selections are read from their frozen lineup snapshot
+                if team_selection.lineup:
+                    return Response(
+                        LineupSnapshot.player_rows(team_selection, gameweek),
+                        status=status.HTTP_200_OK,
+                    )
+
+                related = ("fantasy_team", "player__team")
+                players = list(
+                    team_selection.starters.select_related(*related).all()
+                ) + list(team_selection.bench.select_related(*related).all())
 
                 serializer = FantasyPlayerSerializer(
                     players, 
@@ -181,43 +199,14 @@ class FantasyPlayerViewSet(ModelViewSet):
             
     @action(detail=False, methods=["get"], url_path="available-gameweeks")
     def get_available_gameweeks(self, request):
-        from django.core.cache import cache
-        
         try:
             fantasy_team = FantasyTeam.objects.get(user=request.user)
             cache_key = f"available_gameweeks_{fantasy_team.id}"
-            
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return Response(cached_data, status=status.HTTP_200_OK)
-            
-            gameweeks_with_selections = Gameweek.objects.filter(
-                team_selections__fantasy_team=fantasy_team
-            ).distinct().order_by('-number')
-            
-            active_gameweek = Gameweek.objects.filter(is_active=True).first()
-            
-            gameweeks_data = []
-            for gw in gameweeks_with_selections:
-                gameweeks_data.append({
-                    'number': gw.number,
-                    'name': f'Gameweek {gw.number}',
-                    'is_active': gw.is_active,
-                    'has_selection': True
-                })
-            
-            if active_gameweek and active_gameweek not in gameweeks_with_selections:
-                gameweeks_data.append({
-                    'number': active_gameweek.number,
-                    'name': f'Gameweek {active_gameweek.number} (Current)',
-                    'is_active': True,
-                    'has_selection': False
-                })
-            
-            cache.set(cache_key, gameweeks_data, 300)
-            
+            gameweeks_data = get_or_fill(
+                cache_key, lambda: self._available_gameweeks(fantasy_team), 300
+            )
             return Response(gameweeks_data, status=status.HTTP_200_OK)
-            
+
         except FantasyTeam.DoesNotExist:
             return Response(
                 {"detail": "Fantasy team not found."}, 
@@ -228,8 +217,33 @@ class FantasyPlayerViewSet(ModelViewSet):
                 {"detail": "An unexpected error occurred.", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-            
 
+    @staticmethod
+    def _available_gameweeks(fantasy_team):
+        gameweeks_with_selections = Gameweek.objects.filter(
+            team_selections__fantasy_team=fantasy_team
+        ).distinct().order_by('-number')
+
+        active_gameweek = HotObjects.active_gameweek()
+
+        gameweeks_data = []
+        for gw in gameweeks_with_selections:
+            gameweeks_data.append({
+                'number': gw.number,
+                'name': f'Gameweek {gw.number}',
+                'is_active': gw.is_active,
+                'has_selection': True
+            })
+
+        if active_gameweek and active_gameweek not in gameweeks_with_selections:
+            gameweeks_data.append({
+                'number': active_gameweek.number,
+                'name': f'Gameweek {active_gameweek.number} (Current)',
+                'is_active': True,
+                'has_selection': False
+            })
+
+        return gameweeks_data
 
     @action(detail=False, methods=["get"], url_path="available-chips")
     def available_chips(self, request):
@@ -353,6 +367,57 @@ class FantasyPlayerViewSet(ModelViewSet):
                 {"detail": "An unexpected error occurred.", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    @action(detail=False, methods=["post"], url_path="validate-squad")
+    def validate_squad(self, request):
+        """Dry-run squad validation for the team builder; nothing is saved"""
+        try:
+            fantasy_team = FantasyTeam.objects.filter(user=request.user).first()
+            formation = request.data.get(
+                "formation", fantasy_team.formation if fantasy_team else None
+            )
+
+            result = SquadValidator.validate(
+                formation=formation,
+                starting_eleven=request.data.get("startingEleven", {}),
+                bench_players=request.data.get("benchPlayers", []),
+                fantasy_team=fantasy_team,
+            )
+            return Response(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response(
+                {"detail": "An unexpected error occurred.", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["post"], url_path="transfer-preview")
+    def transfer_preview(self, request):
+        """
+        Transfers, hit cost and remaining free transfers for a proposed squad;
+        nothing is saved
+        """
+        try:
+            fantasy_team = FantasyTeam.objects.get(user=request.user)
+            starter_ids, bench_ids = SquadValidator.squad_player_ids(
+                request.data.get("startingEleven", {}),
+                request.data.get("benchPlayers", []),
+            )
+            player_ids = starter_ids + bench_ids
+            squad_players = SquadValidator.load_players(player_ids)
+
+            plan = TransferPlanner.plan(fantasy_team, player_ids, squad_players)
+            return Response(TransferPlanner.serialize(plan), status=status.HTTP_200_OK)
+
+        except FantasyTeam.DoesNotExist:
+            return Response(
+                {"detail": "Fantasy team not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {"detail": "An unexpected error occurred.", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
     @action(detail=False, methods=["post"], url_path="save-team-players")
     def save_team_players(self, request):
         try:
@@ -392,6 +457,11 @@ class FantasyPlayerViewSet(ModelViewSet):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        except DjangoValidationError as e:
+            return Response(
+                {"detail": "Validation error occurred.", "errors": e.messages},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {"detail": "An unexpected error occurred.", "error": str(e)},
@@ -405,48 +475,49 @@ class PlayerPerformanceViewSet(ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="goals-leaderboard")
     def goals_leaderboard(self, request):
-        from django.core.cache import cache
-        from apps.kpl.models import TopcorerData, Gameweek
+        from apps.kpl.models import TopcorerData
         
         limit = int(request.query_params.get("limit", 5))
         cache_key = f"goals_leaderboard_limit_{limit}"
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data, status=status.HTTP_200_OK)
 
-        # Get the active gameweek
-        active_gameweek = Gameweek.objects.filter(is_active=True).first()
-        
-        if not active_gameweek:
+        def build():
+            # Get the active gameweek
+            active_gameweek = HotObjects.active_gameweek()
+            if not active_gameweek:
+                return None
+
+            # Fetch top scorers from scraped data
+            top_scorers = TopcorerData.objects.filter(
+                gameweek=active_gameweek
+            ).select_related('player', 'player__team').order_by('rank')[:limit]
+
+            leaderboard_data = []
+            for scorer in top_scorers:
+                leaderboard_data.append({
+                    "rank": scorer.rank,
+                    "player_id": scorer.player.id if scorer.player else None,
+                    "player_name": scorer.player_name,
+                    "team_name": scorer.team_name,
+                    "total_goals": scorer.goals,
+                    "total_assists": 0,  # Not available from external source
+                    "total_appearances": 0,  # Not available from external source
+                    "total_fantasy_points": 0,  # Not available from external source
+                    "goals_per_game": 0,  # Not available from external source
+                })
+
+            return {"count": len(leaderboard_data), "results": leaderboard_data}
+
+        # No active gameweek is cached briefly, so the 404 is rechecked after a minute
+        response = get_or_fill_response(
+            request, cache_key, build, 600, tags=["goals_leaderboard"], empty_timeout=60
+        )
+        if response is None:
             return Response(
                 {"detail": "No active gameweek found."},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Fetch top scorers from scraped data
-        top_scorers = TopcorerData.objects.filter(
-            gameweek=active_gameweek
-        ).select_related('player', 'player__team').order_by('rank')[:limit]
-        
-        leaderboard_data = []
-        for scorer in top_scorers:
-            leaderboard_data.append({
-                "rank": scorer.rank,
-                "player_id": scorer.player.id if scorer.player else None,
-                "player_name": scorer.player_name,
-                "team_name": scorer.team_name,
-                "total_goals": scorer.goals,
-                "total_assists": 0,  # Not available from external source
-                "total_appearances": 0,  # Not available from external source
-                "total_fantasy_points": 0,  # Not available from external source
-                "goals_per_game": 0,  # Not available from external source
-            })
-        
-        result = {"count": len(leaderboard_data), "results": leaderboard_data}
-        cache.set(cache_key, result, 600)
-        
-        return Response(result, status=status.HTTP_200_OK)
+        return response
 
 
     @action(detail=False, methods=["get"], url_path="gameweek-team")
@@ -468,8 +539,19 @@ class PlayerPerformanceViewSet(ModelViewSet):
                 status=status.HTTP_200_OK,
             )
 
-        serialized = TeamOfTheWeekService.serialize_team(team_data, gameweek.number)
-        return Response(serialized, status=status.HTTP_200_OK)
+        return Response(team_data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="dream-team")
+    def season_dream_team(self, request):
+        team_data = TeamOfTheWeekService.get_season_dream_team()
+
+        if not team_data:
+            return Response(
+                {"detail": "No performances found for this season."},
+                status=status.HTTP_200_OK,
+            )
+
+        return Response(team_data, status=status.HTTP_200_OK)
 
 
 class GameweekViewSet(ModelViewSet):
@@ -484,4 +566,107 @@ class GameweekViewSet(ModelViewSet):
         if "error" in data:
             return Response(data, status=status.HTTP_404_NOT_FOUND)
 
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="status/version")
+    def get_gameweek_status_version(self, request):
+        """Cheap poll: the stored status version, to refetch status on change"""
+        gameweek_id = request.query_params.get("gameweek_id")
+        gameweek, snapshot = GameweekStatusService().get_snapshot(gameweek_id)
+
+        if not gameweek:
+            return Response(
+                {"error": "No active gameweek found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            {
+                "gameweek": gameweek.number,
+                "version": snapshot.version,
+                "updated_at": snapshot.updated_at.isoformat(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class LeaderboardViewSet(ViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _get_leaderboard_key(self, request):
+        league_id = request.query_params.get("league")
+        if not league_id:
+            return LeaderboardService.OVERALL_KEY
+
+        try:
+            league = FantasyLeague.objects.filter(id=league_id).first()
+        except DjangoValidationError:
+            raise ValidationError({"detail": f"Invalid league id {league_id}."})
+        if not league:
+            raise ValidationError({"detail": f"League {league_id} not found."})
+        return LeaderboardService.league_key(league.pk)
+
+    @staticmethod
+    def _int_param(request, name, default, maximum, minimum=1):
+        """Integer query parameter clamped to minimum..maximum; 400 if not a number"""
+        value = request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({"detail": f"{name} must be an integer."})
+        return max(minimum, min(value, maximum))
+
+    def list(self, request):
+        try:
+            key = self._get_leaderboard_key(request)
+            limit = self._int_param(
+                request,
+                "limit",
+                LeaderboardService.DEFAULT_PAGE_SIZE,
+                LeaderboardService.MAX_PAGE_SIZE,
+            )
+
+            try:
+                data = LeaderboardService.get_page(
+                    key, cursor=request.query_params.get("cursor"), limit=limit
+                )
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid cursor."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(data, status=status.HTTP_200_OK)
+        except ValidationError:
+            raise
+        except Exception as e:
+            return Response(
+                {"detail": "An unexpected error occurred.", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="me")
+    def my_position(self, request):
+        try:
+            key = self._get_leaderboard_key(request)
+
+            fantasy_team = FantasyTeam.objects.filter(user=request.user).first()
+            if not fantasy_team:
+                return Response(
+                    {"detail": "No fantasy team found for this user."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            neighbours = self._int_param(request, "neighbours", 5, 50, minimum=0)
+            data = LeaderboardService.get_neighbours(key, fantasy_team, neighbours)
+            if data is None:
+                return Response(
+                    {"detail": "Your team is not ranked on this leaderboard yet."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            return Response(data, status=status.HTTP_200_OK)
+        except ValidationError:
+            raise
+        except Exception as e:
+            return Response(
+                {"detail": "An unexpected error occurred.", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -7,6 +7,7 @@ from .models import (
     FixtureLineupPlayer,
     Gameweek,
     Player,
+    PlayerAlias,
     Standing,
     Team,
     ProcessedMatchEvent, 
@@ -45,6 +46,25 @@ class PlayerAdmin(admin.ModelAdmin):
     search_fields = ("name", "team__name")
 
 
+@admin.register(PlayerAlias)
+class PlayerAliasAdmin(admin.ModelAdmin):
+    list_display = ("normalized_name", "canonical_player", "team", "is_confirmed", "created_at")
+    list_filter = ("is_confirmed", "team")
+    search_fields = ("normalized_name", "canonical_player__name", "team__name")
+    autocomplete_fields = ("canonical_player",)
+    actions = ["confirm_aliases"]
+
+    def confirm_aliases(self, request, queryset):
+        from .services.player_names import PlayerNameIndex
+
+        updated = queryset.filter(is_confirmed=False).update(is_confirmed=True)
+        # update() sends no post_save, so drop the loaded name indexes here
+        PlayerNameIndex.invalidate()
+        self.message_user(request, f"Confirmed {updated} aliases")
+
+    confirm_aliases.short_description = "Confirm selected aliases"
+
+
 @admin.register(Fixture)
 class FixtureAdmin(admin.ModelAdmin):
     list_display = (
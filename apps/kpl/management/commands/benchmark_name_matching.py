@@ -0,0 +1,139 @@
+"""
+Django management command to benchmark trigram name matching against difflib
+"""
+
+import time
+from difflib import get_close_matches
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.kpl.models import Player, PlayerAlias, TopcorerData
+from apps.kpl.services import normalize_player_name
+from apps.kpl.services.name_matching import TrigramMatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark trigram player name matching against difflib "
+        "over recorded scraped names"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            help=(
+                "Number of lookups to run (recorded names are cycled to reach it, "
+                "with caches cleared before each)"
+            ),
+            default=3000,
+        )
+        parser.add_argument(
+            "--names-file",
+            type=str,
+            help=(
+                "Optional file with one scraped name per line "
+                "to add to the recorded names"
+            ),
+            default=None,
+        )
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            help="Trigram similarity cutoff",
+            default=0.45,
+        )
+        parser.add_argument(
+            "--cutoff",
+            type=float,
+            help="difflib ratio cutoff",
+            default=0.75,
+        )
+
+    def handle(self, *args, **options):
+        samples = self._load_samples(options["names_file"])
+        if not samples:
+            raise CommandError(
+                "No recorded scraped names found "
+                "(top scorer data, aliases or --names-file)"
+            )
+
+        players = list(Player.objects.values_list("pkid", "name"))
+        if not players:
+            raise CommandError("No players to match against")
+
+        lookups = list(islice(cycle(samples), options["count"]))
+        self.stdout.write(
+            f"{len(lookups)} lookups ({len(samples)} distinct recorded names) "
+            f"against {len(players)} players"
+        )
+
+        started = time.perf_counter()
+        by_name = {}
+        for pkid, name in players:
+            by_name.setdefault(normalize_player_name(name), pkid)
+        names = list(by_name)
+        difflib_results = []
+        for name, _ in lookups:
+            matches = get_close_matches(
+                normalize_player_name(name), names, n=1, cutoff=options["cutoff"]
+            )
+            difflib_results.append(by_name[matches[0]] if matches else None)
+        self._report("difflib", time.perf_counter() - started, lookups, difflib_results)
+
+        started = time.perf_counter()
+        matcher = TrigramMatcher(players)
+        built = time.perf_counter() - started
+        trigram_results = []
+        for name, _ in lookups:
+            # Cycled names would otherwise be answered from the result
+            # and trigram caches
+            matcher.clear_cache()
+            match = matcher.best(name, min_score=options["min_score"])
+            trigram_results.append(match.key if match else None)
+        elapsed = time.perf_counter() - started
+        self._report("trigram", elapsed, lookups, trigram_results)
+        self.stdout.write(
+            f"  index build: {built * 1000:.1f}ms for {len(matcher)} names"
+        )
+
+        agreed = sum(1 for a, b in zip(difflib_results, trigram_results) if a == b)
+        self.stdout.write(self.style.SUCCESS(f"Agreement: {agreed}/{len(lookups)}"))
+
+    def _load_samples(self, names_file):
+        """(scraped name, known player pk or None) pairs"""
+        samples = list(
+            TopcorerData.objects.values_list("player_name", "player_id").distinct()
+        )
+        samples += list(
+            PlayerAlias.objects.filter(is_confirmed=True).values_list(
+                "normalized_name", "canonical_player_id"
+            )
+        )
+        if names_file:
+            try:
+                with open(names_file, encoding="utf-8") as handle:
+                    samples += [(line.strip(), None) for line in handle if line.strip()]
+            except OSError as e:
+                raise CommandError(f"Cannot read {names_file}: {e}")
+        return samples
+
+    def _report(self, label, elapsed, lookups, results):
+        matched = sum(1 for result in results if result is not None)
+        known = [
+            (expected, result)
+            for (_, expected), result in zip(lookups, results)
+            if expected
+        ]
+        correct = sum(1 for expected, result in known if expected == result)
+        rate = len(lookups) / elapsed if elapsed else len(lookups)
+        accuracy = (
+            f", {correct}/{len(known)} correct where the player is known"
+            if known
+            else ""
+        )
+        self.stdout.write(
+            f"{label}: {elapsed * 1000:.1f}ms ({rate:,.0f} lookups/s), "
+            f"{matched} matched{accuracy}"
+        )
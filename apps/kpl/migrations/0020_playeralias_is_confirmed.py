@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kpl", "0019_topcorerdata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="playeralias",
+            name="is_confirmed",
+            field=models.BooleanField(default=True),
+        ),
+    ]
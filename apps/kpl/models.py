@@ -228,6 +228,8 @@ class PlayerAlias(TimeStampedUUIDModel):
     )
     normalized_name = models.CharField(max_length=120)
     jersey_number = models.PositiveIntegerField(null=True, blank=True)
+    # Aliases suggested by fuzzy matching are only used once confirmed in the admin
+    is_confirmed = models.BooleanField(default=True)
 
     class Meta:
         unique_together = ("team", "normalized_name")
@@ -0,0 +1,6 @@
+from .fixture_lineups import (  # noqa: F401
+    map_role_to_position,
+    match_player_for_team,
+    normalize_player_name,
+    upsert_fixture_lineup,
+)
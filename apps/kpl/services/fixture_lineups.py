@@ -110,7 +110,7 @@ def match_player_for_team(
     normalized_name: str,
     jersey_number: Optional[int],
 ) -> Optional[Player]:
-    alias = cast(Optional[PlayerAlias], PlayerAlias.objects.filter(team=team, normalized_name=normalized_name).select_related("canonical_player").first())  # type: ignore[attr-defined]
+    alias = cast(Optional[PlayerAlias], PlayerAlias.objects.filter(team=team, normalized_name=normalized_name, is_confirmed=True).select_related("canonical_player").first())  # type: ignore[attr-defined]
     if alias:
         return alias.canonical_player
 
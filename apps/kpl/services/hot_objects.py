@@ -0,0 +1,226 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from apps.fantasy.cache_utils import get_or_fill
+from apps.kpl.models import Gameweek, Team
+
+logger = logging.getLogger(__name__)
+
+
+class _LocalLRU:
+    """Thread-safe, size-bounded map whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class HotObjects:
+    """
+    Two-tier cache for small, hot, rarely changing objects: the active
+    gameweek, the gameweek list and the team list.
+
+    Reads are served from a per-process LRU for up to LOCAL_TTL seconds, then
+    from Redis (filled single-flight through get_or_fill), then from the
+    database. invalidate() deletes the Redis entries once the transaction
+    commits and publishes the names on CHANNEL; every process runs a daemon
+    thread subscribed to it that drops its local copies, so a change is seen
+    everywhere within moments instead of after LOCAL_TTL. If the subscription
+    is down, local entries simply age out.
+
+    Returned model instances are copies, so callers may modify them freely.
+    Scoring rules are defined in code (scoring_rules.get_rules) and need no
+    caching.
+    """
+
+    ACTIVE_GAMEWEEK = "active_gameweek"
+    GAMEWEEKS = "gameweeks"
+    TEAMS = "teams"
+
+    CHANNEL = "hot_objects:invalidate"
+    LOCAL_TTL = 60
+    REDIS_TIMEOUT = 60 * 5
+    LISTENER_RETRY_SECONDS = 30
+
+    _local = _LocalLRU(maxsize=64, ttl=LOCAL_TTL)
+    _lock = threading.Lock()
+    _listener = None
+    _listener_pid: Optional[int] = None
+    _listener_retry_at = 0.0
+
+    @staticmethod
+    def key(name: str) -> str:
+        return f"hot_objects:{name}"
+
+    @staticmethod
+    def _load_active_gameweek() -> Optional[Gameweek]:
+        return Gameweek.objects.filter(is_active=True).first()
+
+    @staticmethod
+    def _load_gameweeks() -> List[Gameweek]:
+        return list(Gameweek.objects.order_by("number"))
+
+    @staticmethod
+    def _load_teams() -> List[Team]:
+        return list(Team.objects.order_by("name"))
+
+    @classmethod
+    def _loaders(cls) -> Dict[str, Callable]:
+        return {
+            cls.ACTIVE_GAMEWEEK: cls._load_active_gameweek,
+            cls.GAMEWEEKS: cls._load_gameweeks,
+            cls.TEAMS: cls._load_teams,
+        }
+
+    @classmethod
+    def _get(cls, name: str) -> Any:
+        cls._ensure_listener()
+        hit, value = cls._local.get(name)
+        if not hit:
+            value = get_or_fill(cls.key(name), cls._loaders()[name], cls.REDIS_TIMEOUT)
+            cls._local.set(name, value)
+        return value
+
+    @classmethod
+    def active_gameweek(cls) -> Optional[Gameweek]:
+        gameweek = cls._get(cls.ACTIVE_GAMEWEEK)
+        return copy.copy(gameweek) if gameweek else None
+
+    @classmethod
+    def gameweeks(cls) -> List[Gameweek]:
+        """Every gameweek, ordered by number"""
+        return [copy.copy(gameweek) for gameweek in cls._get(cls.GAMEWEEKS)]
+
+    @classmethod
+    def gameweek(cls, number: int) -> Optional[Gameweek]:
+        """First gameweek with the given number, like filter(number=...).first()"""
+        for gameweek in cls._get(cls.GAMEWEEKS):
+            if gameweek.number == number:
+                return copy.copy(gameweek)
+        return None
+
+    @classmethod
+    def teams(cls, include_relegated: bool = True) -> List[Team]:
+        """Every team, ordered by name"""
+        return [
+            copy.copy(team)
+            for team in cls._get(cls.TEAMS)
+            if include_relegated or not team.is_relegated
+        ]
+
+    @classmethod
+    def invalidate(cls, *names: str) -> None:
+        """
+        Drop the named objects (all of them if none are given) in every process
+        once the transaction commits.
+        """
+        names = names or tuple(cls._loaders())
+        transaction.on_commit(lambda: cls._broadcast(names))
+
+    @classmethod
+    def _broadcast(cls, names: Tuple[str, ...]) -> None:
+        cls._local.discard(names)
+        try:
+            cache.delete_many([cls.key(name) for name in names])
+            get_redis_connection("default").publish(cls.CHANNEL, ",".join(names))
+        except Exception as e:
+            logger.error(f"Error invalidating hot objects {', '.join(names)}: {e}")
+
+    @classmethod
+    def _on_message(cls, message: Dict) -> None:
+        data = message.get("data")
+        if isinstance(data, bytes):
+            data = data.decode()
+        if isinstance(data, str):
+            cls._local.discard(data.split(","))
+
+    @classmethod
+    def _on_listener_error(cls, error: Exception, pubsub, thread) -> None:
+        # Invalidations may have been missed while disconnected
+        logger.error(f"Hot object invalidation listener stopped: {error}")
+        thread.stop()
+        pubsub.close()
+        cls._local.clear()
+        cls._listener_retry_at = time.monotonic() + cls.LISTENER_RETRY_SECONDS
+
+    @classmethod
+    def _ensure_listener(cls) -> None:
+        """
+        Start the invalidation subscriber for this process, or restart it after
+        a fork or failure.
+        """
+        pid = os.getpid()
+        if (
+            cls._listener_pid == pid
+            and cls._listener is not None
+            and cls._listener.is_alive()
+        ):
+            return
+        if time.monotonic() < cls._listener_retry_at and cls._listener_pid == pid:
+            return
+
+        with cls._lock:
+            if (
+                cls._listener_pid == pid
+                and cls._listener is not None
+                and cls._listener.is_alive()
+            ):
+                return
+            if cls._listener_pid != pid:
+                # Forked: the parent's thread did not come along,
+                # nor did its subscription
+                cls._local.clear()
+            cls._listener_pid = pid
+            cls._listener = None
+            try:
+                pubsub = get_redis_connection("default").pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(**{cls.CHANNEL: cls._on_message})
+                cls._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=cls._on_listener_error,
+                )
+            except Exception as e:
+                logger.error(f"Error subscribing to hot object invalidations: {e}")
+                cls._listener_retry_at = time.monotonic() + cls.LISTENER_RETRY_SECONDS
@@ -4,7 +4,10 @@ from typing import Dict, List, Optional, Tuple
 from django.db import transaction
 
 from apps.kpl.models import Fixture, Team, ProcessedMatchEvent
-from apps.fantasy.models import PlayerPerformance, FantasyPlayer, TeamSelection
+from apps.fantasy.models import PlayerPerformance, TeamSelection
+from apps.fantasy.services.scoring import ScoringEngine
+from apps.fantasy.services.scoring_rules import ScoringRules
+from apps.fantasy.services.selection_index import SelectionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -64,115 +67,90 @@ class FixtureValidator:
 
 
 class FantasyPointsCalculator:
+    """
+    Per-performance points, delegating to the shared ScoringRules so live events
+    and the post-match rebuild always agree. Captaincy is not applied here: the
+    stored fantasy_points are a player's raw points, and captain/vice-captain
+    multipliers are applied per team by ScoringEngine.
+    """
+
     @staticmethod
-    def calculate_full(performance, is_captain=False):
+    def calculate_full(performance):
         """Calculate full points from scratch"""
-        position = performance.player.position
-        points = 0
-
-        if performance.minutes_played > 0:
-            points += 1
-        if performance.minutes_played >= 60:
-            points += 1
-
-        if position == "GKP":
-            points += performance.goals_scored * 6
-        elif position == "DEF":
-            points += performance.goals_scored * 6
-        elif position == "MID":
-            points += performance.goals_scored * 5
-        else:  # FWD
-            points += performance.goals_scored * 4
+        return ScoringRules.calculate(performance, performance.player.position)
 
-        points += performance.assists * 3
-
-        if position in ["GKP", "DEF"]:
-            points += performance.clean_sheets * 4
-        elif position == "MID":
-            points += performance.clean_sheets * 1
-
-        if position == "GKP":
-            points += performance.saves // 3
+    @staticmethod
+    def calculate_incremental(new_performance, old_values):
+        """Points difference between the stored values and the updated performance"""
+        position = new_performance.player.position
+        return ScoringRules.calculate(new_performance, position) - ScoringRules.calculate(
+            old_values, position
+        )
 
-        points += performance.penalties_saved * 5
-        points -= performance.penalties_missed * 2
 
-        points -= performance.own_goals * 2
+class ProcessedEventLedger:
+    """
+    Processed event keys for one fixture, loaded once per update cycle.
 
-        points -= performance.yellow_cards * 1
-        points -= performance.red_cards * 3
+    Lookups are answered from memory and newly processed events are written
+    together by flush(), so re-polling a fixture costs a constant number of
+    queries however many events it has already seen.
 
-        if is_captain:
-            return points * 2
-        return points
+    Every atomic block that applies events starts with lock(): it locks the
+    fixture row and (re)loads the keys under that lock, so overlapping polls of
+    the same fixture run one after another and an event is never applied twice.
+    """
 
-    @staticmethod
-    def calculate_incremental(new_performance, old_values, is_captain=False):
-        position = new_performance.player.position
-        points = 0
-
-        old_minutes = old_values["minutes_played"]
-        new_minutes = new_performance.minutes_played
-
-        if new_minutes != old_minutes:
-            if old_minutes == 0 and new_minutes > 0:
-                points += 1  # Appearance point
-            if old_minutes < 60 and new_minutes >= 60:
-                points += 1  # 60+ minutes point
-
-        goals_diff = new_performance.goals_scored - old_values["goals_scored"]
-        if goals_diff > 0:
-            if position == "GKP":
-                points += goals_diff * 6
-            elif position == "DEF":
-                points += goals_diff * 6
-            elif position == "MID":
-                points += goals_diff * 5
-            else:  # FWD
-                points += goals_diff * 4
-
-        assists_diff = new_performance.assists - old_values["assists"]
-        if assists_diff > 0:
-            points += assists_diff * 3
-
-        clean_sheets_diff = new_performance.clean_sheets - old_values["clean_sheets"]
-        if clean_sheets_diff > 0:
-            if position in ["GKP", "DEF"]:
-                points += clean_sheets_diff * 4
-            elif position == "MID":
-                points += clean_sheets_diff * 1
-
-        saves_diff = new_performance.saves - old_values["saves"]
-        if saves_diff > 0 and position == "GKP":
-            points += saves_diff // 3
-
-        penalties_saved_diff = (
-            new_performance.penalties_saved - old_values["penalties_saved"]
-        )
-        if penalties_saved_diff > 0:
-            points += penalties_saved_diff * 5
+    def __init__(self, fixture: Fixture):
+        self.fixture = fixture
+        self.keys = set()
+        self.pending = []
 
-        penalties_missed_diff = (
-            new_performance.penalties_missed - old_values["penalties_missed"]
+    def _load_keys(self) -> set:
+        return set(
+            ProcessedMatchEvent.objects.filter(fixture=self.fixture).values_list(
+                "event_key", flat=True
+            )
         )
-        if penalties_missed_diff > 0:
-            points -= penalties_missed_diff * 2
-
-        own_goals_diff = new_performance.own_goals - old_values["own_goals"]
-        if own_goals_diff > 0:
-            points -= own_goals_diff * 2
 
-        yellow_cards_diff = new_performance.yellow_cards - old_values["yellow_cards"]
-        if yellow_cards_diff > 0:
-            points -= yellow_cards_diff * 1
+    def lock(self) -> None:
+        """
+        Lock the fixture row until the current transaction ends and reload the
+        processed keys. Events left pending by a rolled-back block are dropped,
+        since their stat changes were rolled back with it.
+        """
+        Fixture.objects.select_for_update().only("pkid").get(pk=self.fixture.pk)
+        self.keys = self._load_keys()
+        self.pending = []
 
-        red_cards_diff = new_performance.red_cards - old_values["red_cards"]
-        if red_cards_diff > 0:
-            points -= red_cards_diff * 3
+    def is_processed(self, event_key: str) -> bool:
+        """Check if an event has already been processed"""
+        return event_key in self.keys
+
+    def mark(self, event_type: str, event_key: str, player=None, player_in=None,
+             player_out=None, minute=None):
+        """Mark an event as processed; written on the next flush()"""
+        self.keys.add(event_key)
+        self.pending.append(
+            ProcessedMatchEvent(
+                fixture=self.fixture,
+                event_type=event_type,
+                event_key=event_key,
+                player=player,
+                player_in=player_in,
+                player_out=player_out,
+                minute=minute,
+            )
+        )
 
-        if is_captain:
-            return points * 2
-        return points
+    def flush(self) -> int:
+        """Write pending events in one INSERT, skipping any another worker already stored"""
+        if not self.pending:
+            return 0
+        ProcessedMatchEvent.objects.bulk_create(self.pending, ignore_conflicts=True)
+        written = len(self.pending)
+        self.pending = []
+        return written
 
 
 class MatchEventService:
@@ -185,31 +163,14 @@ class MatchEventService:
             base_key += f"_{extra_data}"
         return base_key
     
-    @staticmethod
-    def _is_event_processed(fixture: Fixture, event_key: str) -> bool:
-        """Check if an event has already been processed"""
-        return ProcessedMatchEvent.objects.filter(
-            fixture=fixture,
-            event_key=event_key
-        ).exists()
-    
-    @staticmethod
-    def _mark_event_processed(fixture: Fixture, event_type: str, event_key: str, 
-                            player=None, player_in=None, player_out=None, minute=None):
-        """Mark an event as processed"""
-        ProcessedMatchEvent.objects.create(
-            fixture=fixture,
-            event_type=event_type,
-            event_key=event_key,
-            player=player,
-            player_in=player_in,
-            player_out=player_out,
-            minute=minute
-        )
-    
     @staticmethod
     def _get_captain_status(player, fixture):
         try:
+            if fixture.gameweek_id:
+                is_captain = SelectionIndex.is_captain(fixture.gameweek, player.pk)
+                if is_captain is not None:
+                    return is_captain
+
             captain_selections = TeamSelection.objects.filter(
                 gameweek=fixture.gameweek, captain__player=player
             )
@@ -219,107 +180,17 @@ class MatchEventService:
             return False
         
     @staticmethod
-    def _update_fantasy_team_points(player, fixture, incremental_points=None):
+    def _update_fantasy_team_points(fixture: Fixture):
         """
-        Update fantasy team points with proper captain/vice-captain handling.
-        If captain didn't play, vice-captain gets double points.
-        
-        Args:
-            player: The player whose performance changed
-            fixture: The fixture
-            incremental_points: If provided, use this instead of recalculating from performance
+        Rescore every fantasy team fielding a player from this fixture.
+
+        Totals are recomputed set-based from PlayerPerformance, so this is called
+        once per batch of events rather than once per player.
         """
         try:
-            fantasy_players = FantasyPlayer.objects.filter(player=player)
-
-            for fantasy_player in fantasy_players:
-                try:
-                    team_selection = TeamSelection.objects.get(
-                        fantasy_team=fantasy_player.fantasy_team,
-                        gameweek=fixture.gameweek,
-                        is_finalized=True,
-                    )
-
-                    is_starter = fantasy_player in team_selection.starters.all()
-
-                    if not is_starter:
-                        continue
-
-                    performance = PlayerPerformance.objects.get(
-                        player=player, fixture=fixture, gameweek=fixture.gameweek
-                    )
-
-                    if incremental_points is not None:
-                        base_points = incremental_points
-                    else:
-                        base_points = performance.fantasy_points
-
-                    points_to_add = base_points
-                    role = "starter"
-
-                    if team_selection.captain.player == player:
-                        captain_performance = performance
-                        
-                        if captain_performance.minutes_played > 0:
-                            role = "captain"
-                        else:
-                            role = "captain_no_play"
-                            logger.info(f"Captain {player.name} didn't play in {fantasy_player.fantasy_team.name}")
-
-                    elif team_selection.vice_captain.player == player:
-                        # This player is the vice-captain
-                        # Check if captain played
-                        try:
-                            captain_performance = PlayerPerformance.objects.get(
-                                player=team_selection.captain.player,
-                                fixture=fixture,
-                                gameweek=fixture.gameweek
-                            )
-                            
-                            if captain_performance.minutes_played == 0:
-                                if incremental_points is not None:
-                                    points_to_add = base_points * 2
-                                else:
-                                    points_to_add = base_points * 2
-                                
-                                role = "vice_captain_active"
-                                logger.info(
-                                    f"Vice-captain {player.name} gets double points "
-                                    f"(captain didn't play) for {fantasy_player.fantasy_team.name}"
-                                )
-                            else:
-                                role = "vice_captain"
-                                
-                        except PlayerPerformance.DoesNotExist:
-                            if incremental_points is not None:
-                                points_to_add = base_points * 2
-                            else:
-                                points_to_add = base_points * 2
-                            role = "vice_captain_active"
-                            logger.info(
-                                f"Vice-captain {player.name} gets double points "
-                                f"(captain no performance) for {fantasy_player.fantasy_team.name}"
-                            )
-
-                    fantasy_player.total_points += points_to_add
-                    fantasy_player.save()
-
-                    fantasy_team = fantasy_player.fantasy_team
-                    fantasy_team.total_points += points_to_add
-                    fantasy_team.save()
-
-                    logger.debug(
-                        f"Updated {fantasy_player.fantasy_team.name}: "
-                        f"+{points_to_add} points for {player.name} ({role})"
-                    )
-
-                except TeamSelection.DoesNotExist:
-                    continue
-                except PlayerPerformance.DoesNotExist:
-                    continue
-
+            ScoringEngine.score_fixture(fixture)
         except Exception as e:
-            logger.error(f"Error updating fantasy team points for {player.name}: {e}")
+            logger.error(f"Error updating fantasy team points for fixture {fixture.id}: {e}")
 
     @staticmethod
     def _store_old_values(performance):
@@ -338,7 +209,7 @@ class MatchEventService:
         }
 
     @staticmethod
-    def update_goals(fixture: Fixture, goals_data: List[Dict]) -> Dict:
+    def update_goals(fixture: Fixture, goals_data: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         from apps.kpl.tasks.fixtures import find_player
 
         updated_players = []
@@ -346,7 +217,10 @@ class MatchEventService:
         
         logger.info(f"Processing {len(goals_data)} goals for {FixtureValidator.get_fixture_summary(fixture)}")
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             for goal_data in goals_data:
                 player_name = goal_data.get("player_name", "").strip()
                 team_id = goal_data.get("team_id")
@@ -392,7 +266,7 @@ class MatchEventService:
                         "goal", fixture.id, player.id, minute
                     )
                     
-                    if MatchEventService._is_event_processed(fixture, event_key):
+                    if events.is_processed(event_key):
                         logger.info(f"Goal already processed for {player.name} at minute {minute}")
                         continue
 
@@ -423,23 +297,21 @@ class MatchEventService:
 
                     if created:
                         performance.fantasy_points = FantasyPointsCalculator.calculate_full(
-                            performance, is_captain
+                            performance
                         )
                     else:
                         incremental_points = FantasyPointsCalculator.calculate_incremental(
-                            performance, old_values, is_captain
+                            performance, old_values
                         )
                         performance.fantasy_points += incremental_points
 
                     performance.save()
                     
                     # Mark goal as processed
-                    MatchEventService._mark_event_processed(
-                        fixture, "goal", event_key, player=player, minute=minute
+                    events.mark(
+                        "goal", event_key, player=player, minute=minute
                     )
 
-                    MatchEventService._update_fantasy_team_points(player, fixture)
-
                     updated_players.append({
                         "player_name": player.name,
                         "team": team.name,
@@ -462,11 +334,16 @@ class MatchEventService:
                 except Exception as e:
                     errors.append({"player_name": player_name, "error": str(e)})
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Goals update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {"updated_players": updated_players, "errors": errors}
 
     @staticmethod
-    def update_assists(fixture: Fixture, assists_data: List[Dict]) -> Dict:
+    def update_assists(fixture: Fixture, assists_data: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         from apps.kpl.tasks.fixtures import find_player
 
         updated_players = []
@@ -474,7 +351,10 @@ class MatchEventService:
         
         logger.info(f"Processing {len(assists_data)} assists for {FixtureValidator.get_fixture_summary(fixture)}")
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             for assist_data in assists_data:
                 player_name = assist_data.get("player_name", "").strip()
                 team_id = assist_data.get("team_id")
@@ -519,7 +399,7 @@ class MatchEventService:
                         "assist", fixture.id, player.id, minute
                     )
                     
-                    if MatchEventService._is_event_processed(fixture, event_key):
+                    if events.is_processed(event_key):
                         logger.info(f"Assist already processed for {player.name} at minute {minute}")
                         continue
 
@@ -550,22 +430,20 @@ class MatchEventService:
 
                     if created:
                         performance.fantasy_points = FantasyPointsCalculator.calculate_full(
-                            performance, is_captain
+                            performance
                         )
                     else:
                         incremental_points = FantasyPointsCalculator.calculate_incremental(
-                            performance, old_values, is_captain
+                            performance, old_values
                         )
                         performance.fantasy_points += incremental_points
 
                     performance.save()
                     
-                    MatchEventService._mark_event_processed(
-                        fixture, "assist", event_key, player=player, minute=minute
+                    events.mark(
+                        "assist", event_key, player=player, minute=minute
                     )
 
-                    MatchEventService._update_fantasy_team_points(player, fixture)
-
                     updated_players.append({
                         "player_name": player.name,
                         "team": team.name,
@@ -588,21 +466,29 @@ class MatchEventService:
                 except Exception as e:
                     errors.append({"player_name": player_name, "error": str(e)})
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Assists update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {"updated_players": updated_players, "errors": errors}
 
     @staticmethod
-    def update_cards(fixture: Fixture, yellow_cards: List[Dict], red_cards: List[Dict]) -> Dict:
+    def update_cards(fixture: Fixture, yellow_cards: List[Dict], red_cards: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         updated_players = []
         errors = []
         
         logger.info(f"Processing cards for {FixtureValidator.get_fixture_summary(fixture)}")
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             # Process yellow cards
             for card_data in yellow_cards:
                 result = MatchEventService._process_card(
-                    fixture, card_data, "yellow_cards", "yellow"
+                    fixture, card_data, "yellow_cards", "yellow", events
                 )
                 if result.get("success"):
                     updated_players.append(result["data"])
@@ -612,18 +498,23 @@ class MatchEventService:
             # Process red cards
             for card_data in red_cards:
                 result = MatchEventService._process_card(
-                    fixture, card_data, "red_cards", "red"
+                    fixture, card_data, "red_cards", "red", events
                 )
                 if result.get("success"):
                     updated_players.append(result["data"])
                 else:
                     errors.append(result["error"])
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Cards update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {"updated_players": updated_players, "errors": errors}
 
     @staticmethod
-    def _process_card(fixture, card_data, field_name, card_type):
+    def _process_card(fixture, card_data, field_name, card_type, events: ProcessedEventLedger):
         from apps.kpl.tasks.fixtures import find_player
 
         player_name = card_data.get("player_name", "").strip()
@@ -677,7 +568,7 @@ class MatchEventService:
                 f"{card_type}_card", fixture.id, player.id, minute
             )
             
-            if MatchEventService._is_event_processed(fixture, event_key):
+            if events.is_processed(event_key):
                 logger.info(f"{card_type.title()} card already processed for {player.name} at minute {minute}")
                 return {
                     "success": True,
@@ -716,22 +607,20 @@ class MatchEventService:
 
             if created:
                 performance.fantasy_points = FantasyPointsCalculator.calculate_full(
-                    performance, is_captain
+                    performance
                 )
             else:
                 incremental_points = FantasyPointsCalculator.calculate_incremental(
-                    performance, old_values, is_captain
+                    performance, old_values
                 )
                 performance.fantasy_points += incremental_points
 
             performance.save()
             
-            MatchEventService._mark_event_processed(
-                fixture, f"{card_type}_card", event_key, player=player, minute=minute
+            events.mark(
+                f"{card_type}_card", event_key, player=player, minute=minute
             )
 
-            MatchEventService._update_fantasy_team_points(player, fixture)
-
             return {
                 "success": True,
                 "data": {
@@ -763,13 +652,16 @@ class MatchEventService:
             }
 
     @staticmethod
-    def update_substitutions(fixture: Fixture, substitutions: List[Dict]) -> Dict:
+    def update_substitutions(fixture: Fixture, substitutions: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         from apps.kpl.tasks.fixtures import find_player
 
         updated_players = []
         errors = []
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             for sub_data in substitutions:
                 player_out_name = sub_data.get("player_out", "").strip()
                 player_in_name = sub_data.get("player_in", "").strip()
@@ -791,7 +683,7 @@ class MatchEventService:
                             "substitution_out", fixture.id, player_out.id, minute
                         )
                         
-                        if not MatchEventService._is_event_processed(fixture, event_key_out):
+                        if not events.is_processed(event_key_out):
                             is_captain_out = MatchEventService._get_captain_status(player_out, fixture)
 
                             perf_out, created_out = PlayerPerformance.objects.get_or_create(
@@ -819,24 +711,22 @@ class MatchEventService:
 
                             if created_out:
                                 perf_out.fantasy_points = FantasyPointsCalculator.calculate_full(
-                                    perf_out, is_captain_out
+                                    perf_out
                                 )
                             else:
                                 incremental_points = FantasyPointsCalculator.calculate_incremental(
-                                    perf_out, old_values_out, is_captain_out
+                                    perf_out, old_values_out
                                 )
                                 perf_out.fantasy_points += incremental_points
 
                             perf_out.save()
                             
                             # Mark substitution out as processed
-                            MatchEventService._mark_event_processed(
-                                fixture, "substitution_out", event_key_out, 
+                            events.mark(
+                                "substitution_out", event_key_out, 
                                 player=player_out, minute=minute
                             )
 
-                            MatchEventService._update_fantasy_team_points(player_out, fixture)
-
                             updated_players.append({
                                 "player_name": player_out.name,
                                 "team": team.name,
@@ -867,7 +757,7 @@ class MatchEventService:
                             "substitution_in", fixture.id, player_in.id, minute
                         )
                         
-                        if not MatchEventService._is_event_processed(fixture, event_key_in):
+                        if not events.is_processed(event_key_in):
                             is_captain_in = MatchEventService._get_captain_status(player_in, fixture)
                             minutes_in = 90 - minute
 
@@ -896,24 +786,22 @@ class MatchEventService:
 
                             if created_in:
                                 perf_in.fantasy_points = FantasyPointsCalculator.calculate_full(
-                                    perf_in, is_captain_in
+                                    perf_in
                                 )
                             else:
                                 incremental_points = FantasyPointsCalculator.calculate_incremental(
-                                    perf_in, old_values_in, is_captain_in
+                                    perf_in, old_values_in
                                 )
                                 perf_in.fantasy_points += incremental_points
 
                             perf_in.save()
                             
                             # Mark substitution in as processed
-                            MatchEventService._mark_event_processed(
-                                fixture, "substitution_in", event_key_in, 
+                            events.mark(
+                                "substitution_in", event_key_in, 
                                 player=player_in, minute=minute
                             )
 
-                            MatchEventService._update_fantasy_team_points(player_in, fixture)
-
                             updated_players.append({
                                 "player_name": player_in.name,
                                 "team": team.name,
@@ -941,17 +829,25 @@ class MatchEventService:
                 except Exception as e:
                     errors.append({"error": str(e)})
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Substitutions update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {"updated_players": updated_players, "errors": errors}
 
     @staticmethod
-    def update_clean_sheets(fixture: Fixture, clean_sheet_data: List[Dict]) -> Dict:
+    def update_clean_sheets(fixture: Fixture, clean_sheet_data: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         from apps.kpl.tasks.fixtures import find_player
 
         updated_players = []
         errors = []
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             for cs_data in clean_sheet_data:
                 player_name = cs_data.get("player_name", "").strip()
                 team_id = cs_data.get("team_id")
@@ -981,7 +877,7 @@ class MatchEventService:
                         "clean_sheet", fixture.id, player.id, 0, f"team_{team_id}"
                     )
                     
-                    if MatchEventService._is_event_processed(fixture, event_key):
+                    if events.is_processed(event_key):
                         logger.info(f"Clean sheet already processed for {player.name}")
                         continue
 
@@ -1012,23 +908,21 @@ class MatchEventService:
 
                     if created:
                         performance.fantasy_points = FantasyPointsCalculator.calculate_full(
-                            performance, is_captain
+                            performance
                         )
                     else:
                         incremental_points = FantasyPointsCalculator.calculate_incremental(
-                            performance, old_values, is_captain
+                            performance, old_values
                         )
                         performance.fantasy_points += incremental_points
 
                     performance.save()
                     
                     # Mark clean sheet as processed
-                    MatchEventService._mark_event_processed(
-                        fixture, "clean_sheet", event_key, player=player
+                    events.mark(
+                        "clean_sheet", event_key, player=player
                     )
 
-                    MatchEventService._update_fantasy_team_points(player, fixture)
-
                     updated_players.append({
                         "player_name": player.name,
                         "team": team.name,
@@ -1051,17 +945,25 @@ class MatchEventService:
                 except Exception as e:
                     errors.append({"player_name": player_name, "error": str(e)})
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Clean sheets update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {"updated_players": updated_players, "errors": errors}
 
     @staticmethod
-    def update_own_goals(fixture: Fixture, own_goals_data: List[Dict]) -> Dict:
+    def update_own_goals(fixture: Fixture, own_goals_data: List[Dict], events: Optional[ProcessedEventLedger] = None) -> Dict:
         from apps.kpl.tasks.fixtures import find_player
 
         updated_players = []
         errors = []
 
+        events = events or ProcessedEventLedger(fixture)
+
         with transaction.atomic():
+            events.lock()
             for own_goal_data in own_goals_data:
                 player_name = own_goal_data.get("player_name", "").strip()
                 team_id = own_goal_data.get("team_id")
@@ -1101,7 +1003,7 @@ class MatchEventService:
                         "own_goal", fixture.id, player.id, minute
                     )
                     
-                    if MatchEventService._is_event_processed(fixture, event_key):
+                    if events.is_processed(event_key):
                         logger.info(f"Own goal already processed for {player.name} at minute {minute}")
                         continue
 
@@ -1132,23 +1034,21 @@ class MatchEventService:
 
                     if created:
                         performance.fantasy_points = FantasyPointsCalculator.calculate_full(
-                            performance, is_captain
+                            performance
                         )
                     else:
                         incremental_points = FantasyPointsCalculator.calculate_incremental(
-                            performance, old_values, is_captain
+                            performance, old_values
                         )
                         performance.fantasy_points += incremental_points
 
                     performance.save()
                     
                     # Mark own goal as processed
-                    MatchEventService._mark_event_processed(
-                        fixture, "own_goal", event_key, player=player, minute=minute
+                    events.mark(
+                        "own_goal", event_key, player=player, minute=minute
                     )
 
-                    MatchEventService._update_fantasy_team_points(player, fixture)
-
                     updated_players.append({
                         "player_name": player.name,
                         "team": team.name,
@@ -1178,6 +1078,11 @@ class MatchEventService:
                         "message": str(e),
                     })
 
+            events.flush()
+
+        if updated_players:
+            MatchEventService._update_fantasy_team_points(fixture)
+
         logger.info(f"Own goals update completed: {len(updated_players)} updated, {len(errors)} errors")
         return {
             "updated": len(updated_players),
@@ -0,0 +1,145 @@
+"""
+Character-trigram name matching.
+
+Names are normalized with normalize_player_name, split into words and each word
+padded ("  word ") before taking trigrams, the same scheme as PostgreSQL's
+pg_trgm. Similarity is the Jaccard index of two trigram sets, so word order does
+not matter and a single typo only costs the trigrams around it.
+
+TrigramMatcher keeps an inverted index from trigram to entries, so a lookup only
+scores entries sharing at least one trigram with the query instead of comparing
+against every name.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import (
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .fixture_lineups import normalize_player_name
+
+
+@lru_cache(maxsize=20000)
+def trigrams(normalized_name: str) -> FrozenSet[str]:
+    """Trigram set of an already normalized name"""
+    grams = set()
+    for word in normalized_name.split():
+        padded = f"  {word} "
+        grams.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return frozenset(grams)
+
+
+@lru_cache(maxsize=20000)
+def trigram_similarity(a: str, b: str) -> float:
+    """Similarity between two normalized names, from 0.0 to 1.0"""
+    grams_a = trigrams(a)
+    grams_b = trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+class NameMatch(NamedTuple):
+    key: Hashable
+    name: str
+    score: float
+
+
+class TrigramMatcher:
+    """
+    Ranked fuzzy lookup over a fixed set of (key, name) entries.
+
+    Several entries may share a key (e.g. a player's name and their aliases);
+    only the best scoring name per key is returned. Results are cached per query.
+    """
+
+    CACHE_SIZE = 2048
+
+    def __init__(
+        self, entries: Iterable[Tuple[Hashable, str]], normalize=normalize_player_name
+    ):
+        self.normalize = normalize
+        self.entries: List[Tuple[Hashable, str, int]] = []
+        self.index: Dict[str, List[int]] = {}
+        self._results: "OrderedDict[str, List[NameMatch]]" = OrderedDict()
+
+        seen = set()
+        for key, name in entries:
+            normalized = normalize(name)
+            if not normalized or (key, normalized) in seen:
+                continue
+            seen.add((key, normalized))
+
+            grams = trigrams(normalized)
+            position = len(self.entries)
+            self.entries.append((key, normalized, len(grams)))
+            for gram in grams:
+                self.index.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear_cache(self) -> None:
+        """Forget cached results and the module's trigram caches"""
+        self._results.clear()
+        trigrams.cache_clear()
+        trigram_similarity.cache_clear()
+
+    def _rank(self, normalized: str) -> List[NameMatch]:
+        query = trigrams(normalized)
+        if not query:
+            return []
+
+        shared: Dict[int, int] = {}
+        for gram in query:
+            for position in self.index.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        best: Dict[Hashable, NameMatch] = {}
+        for position, count in shared.items():
+            key, name, size = self.entries[position]
+            score = count / (len(query) + size - count)
+            if key not in best or score > best[key].score:
+                best[key] = NameMatch(key, name, score)
+
+        return sorted(best.values(), key=lambda match: (-match.score, match.name))
+
+    def search(
+        self, name: str, limit: int = 5, min_score: float = 0.3
+    ) -> List[NameMatch]:
+        """
+        Candidates for a name, best first.
+
+        Args:
+            name: Raw or normalized name
+            limit: Maximum number of candidates
+            min_score: Minimum similarity to include
+
+        Returns:
+            List of NameMatch (key, matched normalized name, similarity)
+        """
+        normalized = self.normalize(name)
+        ranked = self._results.get(normalized)
+        if ranked is None:
+            ranked = self._rank(normalized)
+            self._results[normalized] = ranked
+            if len(self._results) > self.CACHE_SIZE:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(normalized)
+
+        return [match for match in ranked if match.score >= min_score][:limit]
+
+    def best(self, name: str, min_score: float) -> Optional[NameMatch]:
+        """Single best candidate at or above min_score, if any"""
+        matches = self.search(name, limit=1, min_score=min_score)
+        return matches[0] if matches else None
@@ -4,7 +4,8 @@ import logging
 from typing import Dict
 
 from django.db import transaction
-from django.core.cache import cache
+
+from apps.fantasy.cache_utils import coalesce_invalidations
 
 from apps.kpl.models import (
     Player,
@@ -37,7 +38,7 @@ class PlayerService:
         updated_players = []
         errors = []
 
-        with transaction.atomic():
+        with coalesce_invalidations(), transaction.atomic():
             for i, row in enumerate(reader):
                 try:
                     name = row.get("name")
@@ -126,9 +127,6 @@ class PlayerService:
                         }
                     )
 
-        # Clear relevant cache
-        cache.delete_many(cache.keys("players_active_list_*"))
-
         return {
             "created_players": created_players,
             "updated_players": updated_players,
@@ -0,0 +1,284 @@
+import logging
+import re
+import threading
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+
+from apps.kpl.models import Player, PlayerAlias
+
+from .fixture_lineups import normalize_player_name
+from .name_matching import TrigramMatcher, trigram_similarity
+
+logger = logging.getLogger(__name__)
+
+
+def generate_name_variants(name: str) -> List[str]:
+    variants = []
+    name = name.strip()
+
+    variants.append(name)
+
+    no_initials = re.sub(r"\b[A-Z]\.\s*", "", name)
+    if no_initials != name:
+        variants.append(no_initials)
+
+    parts = name.split()
+    if len(parts) == 2:
+        variants.append(f"{parts[1]} {parts[0]}")
+
+    for prefix in ["Jr.", "Sr.", "II", "III"]:
+        if name.endswith(prefix):
+            variants.append(name.replace(prefix, "").strip())
+
+    return list(set(variants))
+
+
+class _ScopeIndex:
+    """Normalized lookup tables for one set of players (a team, or all players)"""
+
+    def __init__(self, players: List[Player], aliases: List[Tuple[str, int]]):
+        self.players: Dict[int, Player] = {player.pk: player for player in players}
+        self.names: Dict[str, int] = {}
+        for player in players:
+            self.names.setdefault(normalize_player_name(player.name), player.pk)
+        self.aliases: Dict[str, int] = {
+            normalized_name: player_id
+            for normalized_name, player_id in aliases
+            if player_id in self.players
+        }
+        # Unconfirmed alias suggestions already recorded for this scope
+        self.suggested: Set[str] = set()
+        self.matcher = TrigramMatcher(
+            [(player_id, name) for name, player_id in self.names.items()]
+            + [(player_id, name) for name, player_id in self.aliases.items()]
+        )
+
+    def by_name(self, normalized_name: str) -> Optional[Player]:
+        player_id = self.names.get(normalized_name)
+        return self.players[player_id] if player_id else None
+
+    def by_alias(self, normalized_name: str) -> Optional[Player]:
+        player_id = self.aliases.get(normalized_name)
+        return self.players[player_id] if player_id else None
+
+    def containing(self, part: str) -> Set[int]:
+        return {player_id for name, player_id in self.names.items() if part in name}
+
+    def closest(
+        self, normalized_name: str, cutoff: float
+    ) -> Optional[Tuple[Player, float]]:
+        match = self.matcher.best(normalized_name, min_score=cutoff)
+        return (self.players[match.key], match.score) if match else None
+
+    def candidates(
+        self, normalized_name: str, limit: int, min_score: float
+    ) -> List[Tuple[Player, float]]:
+        return [
+            (self.players[match.key], match.score)
+            for match in self.matcher.search(
+                normalized_name, limit=limit, min_score=min_score
+            )
+        ]
+
+
+class PlayerNameIndex:
+    """
+    In-memory player name resolution.
+
+    Each scope (one team, teams matching a name, or every player) is loaded with
+    one query for players and one for aliases, then answers exact, alias,
+    variant, token and trigram fuzzy lookups from memory. Scopes are dropped
+    whenever a Player or PlayerAlias is saved: the invalidation token lives in
+    the shared cache so every worker process notices.
+
+    Confident non-exact matches inside a team are recorded as unconfirmed
+    PlayerAlias rows. Only confirmed aliases are used for lookups, so a wrong
+    fuzzy match is never made permanent; once an admin confirms an alias the
+    next lookup of that scraped name is an exact alias hit.
+    """
+
+    VERSION_KEY = "player_name_index_version"
+
+    # Trigram similarity thresholds
+    CLOSE_MATCH_SCORE = 0.65
+    FUZZY_MATCH_SCORE = 0.45
+    CANDIDATE_SCORE = 0.3
+    AUTO_ALIAS_SCORE = 0.65
+
+    _scopes: Dict[Tuple, _ScopeIndex] = {}
+    _version: Optional[str] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._scopes = {}
+        cache.set(cls.VERSION_KEY, uuid.uuid4().hex, None)
+
+    @classmethod
+    def _check_version(cls) -> None:
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(cls.VERSION_KEY, version, None)
+            version = cache.get(cls.VERSION_KEY, version)
+        if version != cls._version:
+            with cls._lock:
+                cls._scopes = {}
+                cls._version = version
+
+    @classmethod
+    def _get_scope(cls, team_id=None, team_name: Optional[str] = None) -> _ScopeIndex:
+        cls._check_version()
+
+        if team_id:
+            key = ("team", str(team_id))
+            players = Player.objects.filter(team__id=team_id)
+            aliases = PlayerAlias.objects.filter(team__id=team_id)
+        elif team_name:
+            key = ("team_name", team_name.lower())
+            players = Player.objects.filter(team__name__icontains=team_name)
+            aliases = PlayerAlias.objects.filter(team__name__icontains=team_name)
+        else:
+            key = ("all",)
+            players = Player.objects.all()
+            aliases = PlayerAlias.objects.all()
+        aliases = aliases.filter(is_confirmed=True)
+
+        scope = cls._scopes.get(key)
+        if scope is None:
+            scope = _ScopeIndex(
+                list(players.select_related("team").order_by("pkid")),
+                list(aliases.values_list("normalized_name", "canonical_player_id")),
+            )
+            with cls._lock:
+                cls._scopes[key] = scope
+        return scope
+
+    @classmethod
+    def _suggest_alias(
+        cls, scope: _ScopeIndex, normalized: str, player: Player
+    ) -> None:
+        """
+        Save a fuzzy match as an unconfirmed PlayerAlias for an admin to review.
+        bulk_create skips the invalidation signal, so loaded scopes are kept
+        and the suggestion is not retried for the scope's lifetime.
+        """
+        if normalized in scope.suggested:
+            return
+        scope.suggested.add(normalized)
+        try:
+            PlayerAlias.objects.bulk_create(
+                [
+                    PlayerAlias(
+                        team_id=player.team_id,
+                        canonical_player=player,
+                        normalized_name=normalized,
+                        is_confirmed=False,
+                    )
+                ],
+                ignore_conflicts=True,
+            )
+            logger.info(
+                f"Suggested alias '{normalized}' for {player.name} "
+                f"(Team: {player.team.name})"
+            )
+        except Exception as e:
+            logger.error(f"Error recording alias '{normalized}' for {player.name}: {e}")
+
+    @classmethod
+    def _match(
+        cls, scope: _ScopeIndex, player_name: str, normalized: str
+    ) -> Optional[Tuple[Player, float, str]]:
+        player = scope.by_name(normalized)
+        if player:
+            return player, 1.0, "exact"
+
+        player = scope.by_alias(normalized)
+        if player:
+            return player, 1.0, "alias"
+
+        match = scope.closest(normalized, cutoff=cls.CLOSE_MATCH_SCORE)
+        if match:
+            return match[0], match[1], "close"
+
+        for variant in generate_name_variants(player_name):
+            player = scope.by_name(normalize_player_name(variant))
+            if player:
+                return player, 1.0, f"variant '{variant}'"
+
+        name_parts = [part for part in normalized.split() if len(part) > 1]
+        if len(name_parts) > 1:
+            for part in name_parts:
+                part_matches = scope.containing(part)
+                if len(part_matches) == 1:
+                    player = scope.players[part_matches.pop()]
+                    score = trigram_similarity(
+                        normalized, normalize_player_name(player.name)
+                    )
+                    return player, score, f"partial '{part}'"
+                for other_part in name_parts:
+                    if other_part == part:
+                        continue
+                    narrowed = part_matches & scope.containing(other_part)
+                    if len(narrowed) == 1:
+                        player = scope.players[narrowed.pop()]
+                        score = trigram_similarity(
+                            normalized, normalize_player_name(player.name)
+                        )
+                        return player, score, f"disambiguated '{part}' + '{other_part}'"
+
+        if len(normalized) > 3:
+            match = scope.closest(normalized, cutoff=cls.FUZZY_MATCH_SCORE)
+            if match:
+                return match[0], match[1], "fuzzy"
+
+        return None
+
+    @classmethod
+    def resolve(
+        cls, player_name: str, team_id=None, team_name: Optional[str] = None
+    ) -> Optional[Player]:
+        """
+        Resolve a scraped name to a Player, trying in order: exact normalized
+        name, alias, close trigram match, name variants, name parts and a looser
+        trigram match.
+        """
+        scope = cls._get_scope(team_id=team_id, team_name=team_name)
+        normalized = normalize_player_name(player_name)
+        if not normalized:
+            return None
+
+        result = cls._match(scope, player_name, normalized)
+        if not result:
+            return None
+
+        player, score, method = result
+        logger.debug(
+            f"Found {method} match for '{player_name}': {player.name} "
+            f"(Team: {player.team.name}, confidence: {score:.2f})"
+        )
+        if (
+            (team_id or team_name)
+            and method not in ("exact", "alias")
+            and score >= cls.AUTO_ALIAS_SCORE
+        ):
+            cls._suggest_alias(scope, normalized, player)
+        return player
+
+    @classmethod
+    def candidates(
+        cls,
+        player_name: str,
+        team_id=None,
+        team_name: Optional[str] = None,
+        limit: int = 5,
+    ) -> List[Tuple[Player, float]]:
+        """Ranked (player, confidence) candidates for a name, best first"""
+        scope = cls._get_scope(team_id=team_id, team_name=team_name)
+        normalized = normalize_player_name(player_name)
+        if not normalized:
+            return []
+        return scope.candidates(normalized, limit=limit, min_score=cls.CANDIDATE_SCORE)
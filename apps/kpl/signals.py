@@ -1,20 +1,37 @@
-from django_redis import get_redis_connection
-from apps.kpl.models import Player, Standing
+from apps.fantasy.cache_utils import invalidate_tags
+from apps.kpl.models import FixtureLineup, Gameweek, Player, PlayerAlias, Standing, Team
+from apps.kpl.services.hot_objects import HotObjects
+from apps.kpl.services.player_names import PlayerNameIndex
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 
 @receiver([post_save, post_delete], sender=Player)
 def invalidate_player_cache(sender, instance, **kwargs):
-    redis_conn = get_redis_connection("default")
-    keys = redis_conn.keys("players_active_list_*")
-    if keys:
-        redis_conn.delete(*keys)
+    invalidate_tags("players")
+
+
+@receiver([post_save, post_delete], sender=Player)
+@receiver([post_save, post_delete], sender=PlayerAlias)
+def invalidate_player_name_index(sender, instance, **kwargs):
+    PlayerNameIndex.invalidate()
 
 
 @receiver([post_save, post_delete], sender=Standing)
 def invalidate_standing_cache(sender, instance, **kwargs):
-    redis_conn = get_redis_connection("default")
-    keys = redis_conn.keys("standings_list_page_*")
-    if keys:
-        redis_conn.delete(*keys)
+    invalidate_tags("standings")
+
+
+@receiver([post_save, post_delete], sender=FixtureLineup)
+def invalidate_fixture_lineups_cache(sender, instance, **kwargs):
+    invalidate_tags(f"fixture_lineups_{instance.fixture_id}")
+
+
+@receiver([post_save, post_delete], sender=Gameweek)
+def invalidate_hot_gameweeks(sender, instance, **kwargs):
+    HotObjects.invalidate(HotObjects.ACTIVE_GAMEWEEK, HotObjects.GAMEWEEKS)
+
+
+@receiver([post_save, post_delete], sender=Team)
+def invalidate_hot_teams(sender, instance, **kwargs):
+    HotObjects.invalidate(HotObjects.TEAMS)
@@ -1,14 +1,17 @@
 import logging
 import os
 from datetime import datetime
-from difflib import get_close_matches
 
 import requests
 from bs4 import BeautifulSoup
 from celery import shared_task
 from django.utils import timezone
 
+from apps.fantasy.tasks.scoring import score_gameweek_task
 from apps.kpl.models import Fixture, Gameweek, Player, Team
+from apps.kpl.services.hot_objects import HotObjects
+from apps.kpl.services.name_matching import TrigramMatcher
+from apps.kpl.services.player_names import PlayerNameIndex
 from config.settings import base
 from util.views import headers
 import logging
@@ -31,20 +34,19 @@ def find_team(team_name: str) -> Team | None:
 
     cleaned_name = clean_team_name(team_name)
 
-    all_teams = list(Team.objects.values_list("name", flat=True))
+    teams = {team.pk: team for team in Team.objects.all()}
 
-    for db_team in all_teams:
-        if cleaned_name == clean_team_name(db_team):
-            return Team.objects.get(name=db_team)
+    for team in teams.values():
+        if cleaned_name == clean_team_name(team.name):
+            return team
 
-    match = get_close_matches(
-        cleaned_name, [clean_team_name(t) for t in all_teams], n=1, cutoff=0.4
+    matcher = TrigramMatcher(
+        [(pk, team.name) for pk, team in teams.items()], normalize=clean_team_name
     )
+    match = matcher.best(cleaned_name, min_score=0.3)
 
     if match:
-        for db_team in all_teams:
-            if clean_team_name(db_team) == match[0]:
-                return Team.objects.get(name=db_team)
+        return teams[match.key]
 
     return None
 
@@ -74,27 +76,6 @@ def clean_team_name(name: str) -> str:
     return cleaned
 
 
-def generate_name_variants(name: str) -> list[str]:
-    variants = []
-    name = name.strip()
-    
-    variants.append(name)
-    
-    no_initials = re.sub(r'\b[A-Z]\.\s*', '', name)
-    if no_initials != name:
-        variants.append(no_initials)
-    
-    parts = name.split()
-    if len(parts) == 2:
-        variants.append(f"{parts[1]} {parts[0]}")
-    
-    for prefix in ['Jr.', 'Sr.', 'II', 'III']:
-        if name.endswith(prefix):
-            variants.append(name.replace(prefix, '').strip())
-    
-    return list(set(variants))
-
-
 def clean_player_name(name: str) -> Optional[str]:
     """
     Clean player name by removing minute markers and extra whitespace.
@@ -156,84 +137,11 @@ def find_player(player_name: str, team_id: Optional[str] = None, team_name: Opti
     player_name = cleaned_name
     
     require_team_match = bool(team_id or team_name)
-    
-    if require_team_match:
-        logger.debug(f"STRICT MODE: Searching for '{player_name}' with team requirement")
-    
-    if team_id:
-        base_queryset = Player.objects.filter(team__id=team_id)
-        logger.debug(f"   Filtered by team ID: {team_id}")
-    elif team_name:
-        base_queryset = Player.objects.filter(team__name__icontains=team_name)
-        logger.debug(f"   Filtered by team name: {team_name}")
-    else:
-        base_queryset = Player.objects.all()
-        logger.debug(f"   No team filter - searching all players")
-    
-    exact_match = base_queryset.filter(name__iexact=player_name).first()
-    if exact_match:
-        logger.debug(f"Found exact match for '{player_name}': {exact_match.name} (Team: {exact_match.team.name})")
-        return exact_match
-    
-    all_player_names = list(base_queryset.values_list("name", flat=True))
-    if all_player_names:
-        matches = get_close_matches(
-            player_name.lower(), 
-            [p.lower() for p in all_player_names], 
-            n=1, 
-            cutoff=0.85  
-        )
-        
-        if matches:
-            found_player = base_queryset.filter(name__iexact=matches[0]).first()
-            if found_player:
-                logger.debug(f"Found close match for '{player_name}': {found_player.name} (Team: {found_player.team.name})")
-                return found_player
-    
-    name_variants = generate_name_variants(player_name)
-    logger.debug(f"   Trying variants: {name_variants}")
-    
-    for variant in name_variants:
-        variant_match = base_queryset.filter(name__iexact=variant).first()
-        if variant_match:
-            logger.debug(f"Found variant match for '{player_name}': {variant_match.name} (variant: {variant}, Team: {variant_match.team.name})")
-            return variant_match
-    
-    name_parts = [part.strip() for part in player_name.split() if len(part.strip()) > 1]
-    
-    if len(name_parts) > 1:
-        logger.debug(f"   Trying partial name matching for parts: {name_parts}")
-        
-        for i, part in enumerate(name_parts):
-            part_matches = base_queryset.filter(name__icontains=part)
-            
-            if part_matches.count() == 1:
-                found_player = part_matches.first()
-                logger.debug(f"Found unique partial match for '{player_name}': {found_player.name} (using part: '{part}', Team: {found_player.team.name})")
-                return found_player
-            elif part_matches.count() > 1:
-                for other_part in name_parts:
-                    if other_part != part:
-                        disambiguated = part_matches.filter(name__icontains=other_part)
-                        if disambiguated.count() == 1:
-                            found_player = disambiguated.first()
-                            logger.debug(f"Found disambiguated match for '{player_name}': {found_player.name} (using parts: '{part}' + '{other_part}', Team: {found_player.team.name})")
-                            return found_player
-    
-    if all_player_names and len(player_name) > 3:
-        matches = get_close_matches(
-            player_name.lower(), 
-            [p.lower() for p in all_player_names], 
-            n=1, 
-            cutoff=0.75  
-        )
-        
-        if matches:
-            found_player = base_queryset.filter(name__iexact=matches[0]).first()
-            if found_player:
-                logger.debug(f"Found fuzzy match for '{player_name}': {found_player.name} (Team: {found_player.team.name}) - Consider verifying")
-                return found_player
-    
+
+    found_player = PlayerNameIndex.resolve(player_name, team_id=team_id, team_name=team_name)
+    if found_player:
+        return found_player
+
     # Player not found - auto-create 
     if auto_create and team_id:
         try:
@@ -253,10 +161,6 @@ def find_player(player_name: str, team_id: Optional[str] = None, team_name: Opti
     else:
         logger.warning(f"Player not found: '{player_name}'")
     
-    similar_players = base_queryset.filter(name__icontains=player_name[:4])[:5]
-    if similar_players:
-        logger.debug(f"   Similar players in {'specified team' if require_team_match else 'database'}: {[f'{p.name} ({p.team.name})' for p in similar_players]}")
-    
     return None
 
 def extract_fixtures_data(headers) -> bool:
@@ -404,7 +308,13 @@ def update_active_gameweek():
             setup_gameweek_monitoring.delay()
             return True
 
+        outgoing = Gameweek.objects.filter(is_active=True).first()
+        if outgoing:
+            score_gameweek_task.delay(str(outgoing.id))
+
         Gameweek.objects.update(is_active=False)
+        # Queryset updates skip the Gameweek signals
+        HotObjects.invalidate(HotObjects.ACTIVE_GAMEWEEK, HotObjects.GAMEWEEKS)
 
         if set_active_gameweek_from_fixtures(current_datetime, current_date):
             setup_gameweek_monitoring.delay()
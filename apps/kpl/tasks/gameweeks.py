@@ -2,13 +2,16 @@ import json
 import logging
 from datetime import datetime, timedelta
 
-from celery import shared_task
-from django.db import transaction
-from django.db.models import F
+from celery import chord, group, shared_task
+from django.db import connection, transaction
+from django.db.models import F, Max, Min, OuterRef, Subquery, Sum
 from django.utils import timezone
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
 
-from apps.fantasy.models import FantasyTeam, TeamSelection
+from apps.fantasy.models import FantasyTeam, FinalizationChunk, TeamSelection
+from apps.fantasy.services.lineup_snapshot import LineupSnapshot
+from apps.fantasy.services.selection_index import SelectionIndex
+from apps.fantasy.services.team_summary import TeamSummaryCache
 from apps.kpl.models import Fixture, Gameweek
 from config.settings import base
 
@@ -84,47 +87,79 @@ def setup_team_finalization_task(gameweek):
         return f"Error: {e}"
 
 
-@shared_task
-def finalize_gameweek_teams(gameweek_id):
-    try:
-        gameweek = Gameweek.objects.get(id=gameweek_id)
-        logger.info(f"Starting team finalization for Gameweek {gameweek.number}")
+FINALIZE_CHUNK_SIZE = 2000
 
-        fantasy_teams = FantasyTeam.objects.all()
+StarterLink = TeamSelection.starters.through
+BenchLink = TeamSelection.bench.through
 
-        finalized_count = 0
-        created_from_previous_count = 0
-        skipped_count = 0
 
-        for team in fantasy_teams:
-            try:
-                result = finalize_team_for_gameweek(team, gameweek)
+def plan_finalization_chunks(gameweek, chunk_size=FINALIZE_CHUNK_SIZE):
+    """
+    Split fantasy teams into pk ranges aligned to chunk_size and record a
+    FinalizationChunk for each. Ranges are deterministic for a given chunk size,
+    so a rerun finds the chunks a crashed run already completed.
+    """
+    bounds = FantasyTeam.objects.aggregate(low=Min("pkid"), high=Max("pkid"))
+    if bounds["low"] is None:
+        return []
+
+    first = (bounds["low"] // chunk_size) * chunk_size
+    ranges = [
+        (start, start + chunk_size)
+        for start in range(first, bounds["high"] + 1, chunk_size)
+    ]
+
+    FinalizationChunk.objects.bulk_create(
+        [
+            FinalizationChunk(gameweek=gameweek, start_pkid=start, end_pkid=end)
+            for start, end in ranges
+        ],
+        ignore_conflicts=True,
+    )
 
-                if result == "finalized":
-                    finalized_count += 1
-                elif result == "created_from_previous":
-                    created_from_previous_count += 1
-                elif result == "skipped":
-                    skipped_count += 1
+    wanted = set(ranges)
+    return [
+        chunk
+        for chunk in FinalizationChunk.objects.filter(gameweek=gameweek).order_by("start_pkid")
+        if (chunk.start_pkid, chunk.end_pkid) in wanted
+    ]
 
-            except Exception as e:
-                logger.error(f"Error finalizing team {team.name} (ID: {team.id}): {e}")
-                continue
 
-        FantasyTeam.objects.update(transfers_available=F("free_transfers") + 1)
+@shared_task
+def finalize_gameweek_teams(gameweek_id, chunk_size=FINALIZE_CHUNK_SIZE):
+    """
+    Finalize every team's selection for a gameweek.
+
+    Teams are split into pk-range chunks finalized in parallel by a Celery
+    chord; complete_gameweek_finalization runs once every chunk is done.
+    Chunks completed by an earlier, interrupted run are not dispatched again.
+    """
+    try:
+        gameweek = Gameweek.objects.get(id=gameweek_id)
+        logger.info(f"Starting team finalization for Gameweek {gameweek.number}")
+
+        chunks = plan_finalization_chunks(gameweek, chunk_size)
+        pending = [chunk for chunk in chunks if not chunk.completed_at]
+
+        if pending:
+            chord(
+                group(
+                    finalize_team_chunk.s(str(gameweek.id), chunk.start_pkid, chunk.end_pkid)
+                    for chunk in pending
+                )
+            )(complete_gameweek_finalization.s(str(gameweek.id)))
+        else:
+            complete_gameweek_finalization.delay([], str(gameweek.id))
 
         logger.info(
-            f"Gameweek {gameweek.number} finalization complete. "
-            f"Finalized: {finalized_count}, "
-            f"Created from previous: {created_from_previous_count}, "
-            f"Skipped: {skipped_count}"
+            f"Dispatched {len(pending)} of {len(chunks)} finalization chunks "
+            f"for Gameweek {gameweek.number}"
         )
 
         return {
             "gameweek": gameweek.number,
-            "finalized": finalized_count,
-            "created_from_previous": created_from_previous_count,
-            "skipped": skipped_count,
+            "chunks": len(chunks),
+            "dispatched": len(pending),
         }
 
     except Gameweek.DoesNotExist:
@@ -135,104 +170,256 @@ def finalize_gameweek_teams(gameweek_id):
         return False
 
 
-@transaction.atomic
-def finalize_team_for_gameweek(fantasy_team, gameweek):
-    existing_selection = TeamSelection.objects.filter(
-        fantasy_team=fantasy_team, gameweek=gameweek
-    ).first()
+@shared_task
+def finalize_team_chunk(gameweek_id, start_pkid, end_pkid):
+    """Finalize the teams whose pk falls in [start_pkid, end_pkid) and record the outcome"""
+    try:
+        gameweek = Gameweek.objects.get(id=gameweek_id)
+        chunk = FinalizationChunk.objects.get(
+            gameweek=gameweek, start_pkid=start_pkid, end_pkid=end_pkid
+        )
+    except (Gameweek.DoesNotExist, FinalizationChunk.DoesNotExist) as e:
+        logger.error(f"Cannot finalize chunk {start_pkid}-{end_pkid}: {e}")
+        return {"error": str(e)}
 
-    if existing_selection:
-        if not existing_selection.is_finalized:
-            existing_selection.is_finalized = True
-            existing_selection.save(update_fields=["is_finalized"])
-            logger.info(
-                f"Finalized existing selection for {fantasy_team.name} "
-                f"in Gameweek {gameweek.number}"
+    if chunk.completed_at:
+        return {
+            "finalized": chunk.finalized,
+            "created_from_previous": chunk.created_from_previous,
+            "skipped": chunk.skipped,
+        }
+
+    try:
+        with transaction.atomic():
+            result = finalize_teams_for_gameweek(gameweek, start_pkid, end_pkid)
+
+            chunk.finalized = result["finalized"]
+            chunk.created_from_previous = result["created_from_previous"]
+            chunk.skipped = result["skipped"]
+            chunk.completed_at = timezone.now()
+            chunk.error = ""
+            chunk.save(
+                update_fields=[
+                    "finalized",
+                    "created_from_previous",
+                    "skipped",
+                    "completed_at",
+                    "error",
+                    "updated_at",
+                ]
             )
-            return "finalized"
-        else:
-            logger.debug(
-                f"Selection already finalized for {fantasy_team.name} "
-                f"in Gameweek {gameweek.number}"
+            # Roll-forward bulk inserts bypass the model signals
+            TeamSummaryCache.invalidate_teams(
+                FantasyTeam.objects.filter(pkid__gte=start_pkid, pkid__lt=end_pkid).values("pkid")
             )
-            return "skipped"
 
-    previous_selection = get_previous_gameweek_selection(fantasy_team, gameweek)
+        return result
 
-    if not previous_selection:
-        logger.warning(
-            f"No previous selection found for {fantasy_team.name}. "
-            f"Cannot create selection for Gameweek {gameweek.number}"
+    except Exception as e:
+        logger.error(
+            f"Error finalizing teams {start_pkid}-{end_pkid} for Gameweek {gameweek.number}: {e}"
         )
-        return "skipped"
+        chunk.error = str(e)
+        chunk.save(update_fields=["error", "updated_at"])
+        return {"error": str(e)}
 
+
+@shared_task
+def complete_gameweek_finalization(results, gameweek_id):
+    """Chord callback: build the selection index and log totals across all chunks"""
     try:
-        new_selection = create_selection_from_previous(
-            fantasy_team, gameweek, previous_selection
-        )
-        logger.info(
-            f"Created and finalized selection for {fantasy_team.name} "
-            f"in Gameweek {gameweek.number} from Gameweek {previous_selection.gameweek.number}"
-        )
-        return "created_from_previous"
+        gameweek = Gameweek.objects.get(id=gameweek_id)
+    except Gameweek.DoesNotExist:
+        logger.error(f"Gameweek with ID {gameweek_id} not found")
+        return False
 
-    except Exception as e:
+    chunks = FinalizationChunk.objects.filter(gameweek=gameweek)
+    totals = chunks.filter(completed_at__isnull=False).aggregate(
+        finalized=Sum("finalized"),
+        created_from_previous=Sum("created_from_previous"),
+        skipped=Sum("skipped"),
+    )
+    failed = chunks.filter(completed_at__isnull=True).count()
+
+    if failed:
         logger.error(
-            f"Failed to create selection from previous for {fantasy_team.name}: {e}"
+            f"{failed} finalization chunks failed for Gameweek {gameweek.number}; "
+            "rerun finalize_gameweek_teams to resume"
         )
-        return "skipped"
 
+    try:
+        SelectionIndex.build(gameweek)
+    except Exception as e:
+        logger.error(f"Error building selection index for Gameweek {gameweek.number}: {e}")
 
-def get_previous_gameweek_selection(fantasy_team, current_gameweek):
-    """Get the most recent team selection before the current gameweek"""
-    return (
-        TeamSelection.objects.filter(
-            fantasy_team=fantasy_team,
-            gameweek__number__lt=current_gameweek.number,
-            is_finalized=True,
+    try:
+        FantasyTeam.objects.update(transfers_available=F("free_transfers") + 1)
+
+        logger.info(
+            f"Gameweek {gameweek.number} finalization complete. "
+            f"Finalized: {totals['finalized'] or 0}, "
+            f"Created from previous: {totals['created_from_previous'] or 0}, "
+            f"Skipped: {totals['skipped'] or 0}"
         )
-        .order_by("-gameweek__number")
-        .first()
+    except Exception as e:
+        logger.error(f"Error in complete_gameweek_finalization: {e}")
+        return False
+
+    return {
+        "gameweek": gameweek.number,
+        "finalized": totals["finalized"] or 0,
+        "created_from_previous": totals["created_from_previous"] or 0,
+        "skipped": totals["skipped"] or 0,
+        "failed_chunks": failed,
+    }
+
+
+def finalize_teams_for_gameweek(gameweek, start_pkid, end_pkid):
+    """
+    Finalize one pk range of teams: a single UPDATE for existing selections,
+    a set-based roll-forward for teams without one, then freeze every
+    finalized selection's lineup snapshot.
+    """
+    selections = TeamSelection.objects.filter(
+        gameweek=gameweek,
+        fantasy_team_id__gte=start_pkid,
+        fantasy_team_id__lt=end_pkid,
     )
 
+    already_finalized = selections.filter(is_finalized=True).count()
+    finalized = selections.filter(is_finalized=False).update(is_finalized=True)
 
-def create_selection_from_previous(fantasy_team, gameweek, previous_selection):
-    captain = previous_selection.captain
-    vice_captain = previous_selection.vice_captain
+    missing = (
+        FantasyTeam.objects.filter(pkid__gte=start_pkid, pkid__lt=end_pkid)
+        .exclude(pkid__in=selections.values("fantasy_team_id"))
+        .count()
+    )
+    created = create_selections_from_previous(gameweek, start_pkid, end_pkid)
+    LineupSnapshot.freeze(selections)
 
-    current_fantasy_players = fantasy_team.players.all()
-    current_player_ids = set(fp.player.id for fp in current_fantasy_players)
+    return {
+        "finalized": finalized,
+        "created_from_previous": created,
+        "skipped": already_finalized + missing - created,
+    }
 
-    if captain.player.id not in current_player_ids:
-        captain = current_fantasy_players.filter(is_starter=True).first()
-        if not captain:
-            captain = current_fantasy_players.first()
 
-    if vice_captain.player.id not in current_player_ids:
-        vice_captain = (
-            current_fantasy_players.filter(is_starter=True)
-            .exclude(id=captain.id)
-            .first()
-        )
-        if not vice_captain:
-            vice_captain = current_fantasy_players.exclude(id=captain.id).first()
+ROLL_FORWARD_BATCH_SIZE = 5000
+
+COPY_LINEUP_SQL = """
+    INSERT INTO {link} ({link_selection}, {link_player})
+    SELECT target.{pk}, link.{link_player}
+    FROM {selection} target
+    JOIN {selection} source ON source.{pk} = (
+        SELECT p.{pk}
+        FROM {selection} p
+        JOIN {gameweek} g ON g.{gameweek_pk} = p.{selection_gameweek}
+        WHERE p.{selection_team} = target.{selection_team}
+          AND p.{selection_finalized} = %s
+          AND g.{gameweek_number} < %s
+        ORDER BY g.{gameweek_number} DESC
+        LIMIT 1
+    )
+    JOIN {link} link ON link.{link_selection} = source.{pk}
+    WHERE target.{selection_gameweek} = %s
+      AND target.{pk} IN ({created})
+      AND NOT EXISTS (
+          SELECT 1 FROM {link} existing WHERE existing.{link_selection} = target.{pk}
+      )
+"""
+
+
+def _copy_lineup_sql(link_model, created_count):
+    quote = connection.ops.quote_name
+    selection = TeamSelection._meta
+    return COPY_LINEUP_SQL.format(
+        created=", ".join(["%s"] * created_count),
+        link=quote(link_model._meta.db_table),
+        link_selection=quote(link_model._meta.get_field("teamselection").column),
+        link_player=quote(link_model._meta.get_field("fantasyplayer").column),
+        selection=quote(selection.db_table),
+        pk=quote(selection.pk.column),
+        selection_team=quote(selection.get_field("fantasy_team").column),
+        selection_gameweek=quote(selection.get_field("gameweek").column),
+        selection_finalized=quote(selection.get_field("is_finalized").column),
+        gameweek=quote(Gameweek._meta.db_table),
+        gameweek_pk=quote(Gameweek._meta.pk.column),
+        gameweek_number=quote(Gameweek._meta.get_field("number").column),
+    )
 
-    starters = current_fantasy_players.filter(is_starter=True)
-    bench = current_fantasy_players.filter(is_starter=False)
 
-    new_selection = TeamSelection.objects.create(
-        fantasy_team=fantasy_team,
-        gameweek=gameweek,
-        formation=previous_selection.formation,
-        captain=captain,
-        vice_captain=vice_captain,
-        is_finalized=True,
+def create_selections_from_previous(gameweek, start_pkid=None, end_pkid=None):
+    """
+    Roll forward every team without a selection for the gameweek (optionally
+    limited to a team pk range) by copying its latest finalized selection.
+
+    Formation, captain and vice-captain are copied as-is and the chip is reset.
+    Unlike the old per-team create_selection_from_previous, the captaincy is not
+    re-picked from the current squad: the previous selection's armbands carry
+    over unchanged.
+
+    The new selections are read with one SELECT and written in batched bulk
+    inserts, then starters and bench are copied with one INSERT ... SELECT per
+    through table and batch. The copy is limited to the exact pks created here,
+    so rows from a concurrent chunk are never picked up.
+
+    Returns:
+        Number of selections created
+    """
+    teams = FantasyTeam.objects.all()
+    if start_pkid is not None:
+        teams = teams.filter(pkid__gte=start_pkid)
+    if end_pkid is not None:
+        teams = teams.filter(pkid__lt=end_pkid)
+    missing = teams.exclude(
+        pkid__in=TeamSelection.objects.filter(gameweek=gameweek).values("fantasy_team_id")
     )
 
-    new_selection.starters.set(starters)
-    new_selection.bench.set(bench)
+    latest = (
+        TeamSelection.objects.filter(
+            fantasy_team=OuterRef("pkid"),
+            gameweek__number__lt=gameweek.number,
+            is_finalized=True,
+        )
+        .order_by("-gameweek__number")
+        .values("pkid")[:1]
+    )
+    previous = TeamSelection.objects.filter(
+        pkid__in=missing.annotate(previous=Subquery(latest)).values("previous")
+    ).values_list("fantasy_team_id", "formation", "captain_id", "vice_captain_id")
+
+    created = TeamSelection.objects.bulk_create(
+        [
+            TeamSelection(
+                fantasy_team_id=team_id,
+                gameweek=gameweek,
+                formation=formation,
+                captain_id=captain_id,
+                vice_captain_id=vice_captain_id,
+                active_chip=None,
+                is_finalized=True,
+            )
+            for team_id, formation, captain_id, vice_captain_id in previous
+        ],
+        batch_size=ROLL_FORWARD_BATCH_SIZE,
+    )
+    created_pks = [selection.pk for selection in created]
+
+    if not created_pks:
+        return 0
 
-    return new_selection
+    with connection.cursor() as cursor:
+        for start in range(0, len(created_pks), ROLL_FORWARD_BATCH_SIZE):
+            end = start + ROLL_FORWARD_BATCH_SIZE
+            batch = created_pks[start:end]
+            params = [True, gameweek.number, gameweek.pk, *batch]
+            for link_model in (StarterLink, BenchLink):
+                cursor.execute(_copy_lineup_sql(link_model, len(batch)), params)
+
+    logger.info(
+        f"Rolled forward {len(created_pks)} selections into Gameweek {gameweek.number}"
+    )
+    return len(created_pks)
 
 
 def check_current_active_gameweek(current_datetime):
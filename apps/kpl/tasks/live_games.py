@@ -5,7 +5,7 @@ import re
 import time
 from datetime import timedelta
 
-from celery import shared_task
+from celery import chain, shared_task
 from django.db.models import Q
 from django.utils import timezone
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
@@ -14,10 +14,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
 
-from apps.kpl.services.match_events import MatchEventService
+from apps.kpl.services.match_events import MatchEventService, ProcessedEventLedger
 from apps.kpl.tasks.gameweeks import setup_team_finalization_task
 from apps.kpl.models import Fixture, Gameweek
 from apps.fantasy.tasks.fixture_completion import process_clean_sheets_on_completion
+from apps.fantasy.tasks.scoring import update_overall_ranks
 from config.settings import base
 from util.selenium import SeleniumManager
 
@@ -567,12 +568,14 @@ def update_match_events_in_db(fixture, match_events):
         return
 
     try:
+        events = ProcessedEventLedger(fixture)
+
         all_goals = (
             match_events["home_team"]["goals"] + match_events["away_team"]["goals"]
         )
         if all_goals:
             logger.info(f"Updating {len(all_goals)} goals for fixture {fixture.id}")
-            result = MatchEventService.update_goals(fixture, all_goals)
+            result = MatchEventService.update_goals(fixture, all_goals, events=events)
             
             if result['errors']:
                 logger.error(f"🔴 GOAL UPDATE FAILURES for {fixture.id}:")
@@ -598,7 +601,7 @@ def update_match_events_in_db(fixture, match_events):
                 f"{len(all_red_cards)} red cards for fixture {fixture.id}"
             )
             result = MatchEventService.update_cards(
-                fixture, all_yellow_cards, all_red_cards
+                fixture, all_yellow_cards, all_red_cards, events=events
             )
             
             # Enhanced logging for cards
@@ -620,7 +623,7 @@ def update_match_events_in_db(fixture, match_events):
             logger.info(
                 f"Updating {len(all_substitutions)} substitutions for fixture {fixture.id}"
             )
-            result = MatchEventService.update_substitutions(fixture, all_substitutions)
+            result = MatchEventService.update_substitutions(fixture, all_substitutions, events=events)
             
             # Enhanced logging for substitutions
             if result['errors']:
@@ -712,7 +715,10 @@ def update_fixture_task(selenium_manager, live_data):
                     
                     try:
                         logger.info(f"Triggering clean sheet processing for fixture {fixture.id}")
-                        process_clean_sheets_on_completion.delay(str(fixture.id))
+                        chain(
+                            process_clean_sheets_on_completion.si(str(fixture.id)),
+                            update_overall_ranks.si(),
+                        ).delay()
                     except Exception as e:
                         logger.error(f"Failed to trigger clean sheet processing for fixture {fixture.id}: {e}")
 
@@ -8,6 +8,7 @@ from bs4 import BeautifulSoup
 from celery import shared_task
 from django.db.models import Q
 
+from apps.fantasy.cache_utils import coalesce_invalidations
 from apps.kpl.models import Player, Team
 from config.settings import base
 from util.views import headers
@@ -138,6 +139,7 @@ def get_players(team_name):
 
 
 @shared_task
+@coalesce_invalidations()
 def get_all_players():
     teams = Team.objects.all()
     results = {}
@@ -8,6 +8,7 @@ import requests
 from bs4 import BeautifulSoup
 from celery import shared_task
 
+from apps.fantasy.cache_utils import coalesce_invalidations
 from apps.kpl.models import Standing, Team
 from config.settings import base
 from util.views import headers
@@ -280,6 +281,7 @@ def edit_team_logo(headers) -> str:
 
 
 @shared_task
+@coalesce_invalidations()
 def get_kpl_table():
     try:
         first_response = extract_table_standings_data(headers)
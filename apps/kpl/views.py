@@ -1,17 +1,18 @@
 import logging
 import logging.config
 
-from django.core.cache import cache
 from django.db.models import Prefetch
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from apps.kpl.models import Fixture, FixtureLineup, Player, Standing, Team, Gameweek, FixtureLineupPlayer
+from apps.fantasy.cache_utils import get_or_fill_response
+from apps.kpl.models import Fixture, FixtureLineup, Player, Standing, Team, FixtureLineupPlayer
 from config.settings import base
+from util.parsers import ORJSONParser
 
 from .serializers import (
     FixtureLineupDetailSerializer,
@@ -23,6 +24,7 @@ from .serializers import (
     LineupSubmissionSerializer
 )
 
+from .services.hot_objects import HotObjects
 from .services.lineup import LineupService
 from .services.player import PlayerService
 from .services.match_events import MatchEventService
@@ -38,6 +40,13 @@ class TeamViewSet(ReadOnlyModelViewSet):
     queryset = Team.objects.filter(is_relegated=False)
     permission_classes = [IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        teams = HotObjects.teams(include_relegated=False)
+        page = self.paginate_queryset(teams)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(teams, many=True).data)
+
 
 class StandingViewSet(ReadOnlyModelViewSet):
     """ViewSet for viewing league standings with caching"""
@@ -50,23 +59,17 @@ class StandingViewSet(ReadOnlyModelViewSet):
         page_number = request.query_params.get("page", 1)
         cache_key = f"standings_list_page_{page_number}"
 
-        # cached_data = cache.get(cache_key)
-        # if cached_data:
-        #     return Response(cached_data)
+        def build():
+            queryset = self.get_queryset()
+            page = self.paginate_queryset(queryset)
 
-        queryset = self.get_queryset()
-        page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data).data
 
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
-            cache.set(cache_key, paginated_response.data, timeout=86400)
-            return Response(paginated_response.data, status=status.HTTP_200_OK)
+            return self.get_serializer(queryset, many=True).data
 
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        cache.set(cache_key, data, timeout=86400)
-        return Response(data, status=status.HTTP_200_OK)
+        return get_or_fill_response(request, cache_key, build, timeout=86400, tags=["standings"])
 
 
 class FixtureViewSet(ReadOnlyModelViewSet):
@@ -76,22 +79,16 @@ class FixtureViewSet(ReadOnlyModelViewSet):
     queryset = Fixture.objects.all()
     lookup_field = "id"
     permission_classes = [IsAuthenticated]
-    parser_classes = [JSONParser, MultiPartParser]
+    parser_classes = [ORJSONParser, MultiPartParser]
 
     def get_queryset(self):
         qs = super().get_queryset()
         if getattr(self, "action", None) == "list":
-            # Cache the active gameweek number
-            cache_key = "active_gameweek_number"
-            active_gw_number = cache.get(cache_key)
-            
-            if active_gw_number is None:
-                try:
-                    active_gw = Gameweek.objects.filter(is_active=True).values("number").first()
-                    active_gw_number = active_gw["number"] if active_gw else 1
-                    cache.set(cache_key, active_gw_number, timeout=3600)  # 1 hour cache
-                except:
-                    active_gw_number = 1
+            try:
+                active_gw = HotObjects.active_gameweek()
+                active_gw_number = active_gw.number if active_gw else 1
+            except Exception:
+                active_gw_number = 1
 
             # Only fetch current and recent gameweeks for better performance
             qs = (
@@ -114,34 +111,36 @@ class FixtureViewSet(ReadOnlyModelViewSet):
         fixture = self.get_object()
         
         cache_key = f"fixture_lineups_{fixture.id}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-
-        qs = (
-            FixtureLineup.objects.filter(fixture=fixture)
-            .select_related("team")
-            .prefetch_related(
-                Prefetch(
-                    'players',
-                    queryset=FixtureLineupPlayer.objects.select_related('player__team')
-                    .only(
-                        'id', 'position', 'order_index', 'is_bench',
-                        'player__id', 'player__name', 'player__position',
-                        'player__team__name'
+
+        def build():
+            qs = (
+                FixtureLineup.objects.filter(fixture=fixture)
+                .select_related("team")
+                .prefetch_related(
+                    Prefetch(
+                        'players',
+                        queryset=FixtureLineupPlayer.objects.select_related('player__team')
+                        .only(
+                            'id', 'position', 'order_index', 'is_bench',
+                            'player__id', 'player__name', 'player__position',
+                            'player__team__name'
+                        )
                     )
                 )
+                .only('id', 'formation', 'side', 'team__name')
             )
-            .only('id', 'formation', 'side', 'team__name')
-        )
         
-        serializer = FixtureLineupDetailSerializer(qs, many=True)
-        response_data = serializer.data
-        
-        # Cache for 30 minutes
-        cache.set(cache_key, response_data, timeout=1800)
-        return Response(response_data)
+            return FixtureLineupDetailSerializer(qs, many=True).data
+
+        # Cache for 30 minutes; a fixture without lineups yet is rechecked after a minute
+        return get_or_fill_response(
+            request,
+            cache_key,
+            build,
+            timeout=1800,
+            tags=[f"fixture_lineups_{fixture.pk}"],
+            empty_timeout=60,
+        )
 
     @action(detail=False, methods=['post'], url_path='submit-lineup')
     def submit_lineup(self, request):        
@@ -216,7 +215,7 @@ class PlayerViewSet(ModelViewSet):
     serializer_class = PlayerSerializer
     queryset = Player.objects.filter(team__is_relegated=False)
     permission_classes = [IsAuthenticated]
-    parser_classes = [JSONParser, MultiPartParser]
+    parser_classes = [ORJSONParser, MultiPartParser]
     
     def get_permissions(self):
         if self.action in [
@@ -250,30 +249,23 @@ class PlayerViewSet(ModelViewSet):
         page_number = request.query_params.get("page", 1)
         
         cache_key = f"players_list_team_{team_id}_page_{page_number}"
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
 
-        queryset = self.get_queryset()
-        
-        if team_id:
-            queryset = queryset.filter(team_id=team_id)
+        def build():
+            queryset = self.get_queryset()
 
-        self.pagination_class.page_size = 30
-        page = self.paginate_queryset(queryset)
+            if team_id:
+                queryset = queryset.filter(team_id=team_id)
 
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-            
-            cache.set(cache_key, response.data, timeout=14400)
-            return response
+            self.pagination_class.page_size = 30
+            page = self.paginate_queryset(queryset)
+
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data).data
+
+            return self.get_serializer(queryset, many=True).data
 
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        cache.set(cache_key, data, timeout=14400)
-        return Response(data)
+        return get_or_fill_response(request, cache_key, build, timeout=14400, tags=["players"])
 
     @action(detail=False, methods=["post"], url_path="bulk-upload")
     def bulk_upload(self, request):
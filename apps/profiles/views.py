@@ -1,12 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from rest_framework import permissions, status
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.kpl.tasks import fixtures, players, standings
 from apps.profiles.models import Profile
+from util.parsers import ORJSONParser
 
 from .serializers import ProfileSerializer
 from .services import ProfileService
@@ -32,7 +33,7 @@ class GetProfileAPIView(APIView):
 class UpdateProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ProfileSerializer
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, ORJSONParser]
 
     def patch(self, request, uuid):
         try:
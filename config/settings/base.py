@@ -179,8 +179,12 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication"
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_RENDERER_CLASSES": [
+        "util.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        "util.parsers.ORJSONParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 50,
@@ -379,6 +383,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.kpl.tasks.scorers.scrape_top_scorers",
         "schedule": crontab(day_of_week=1, hour=23, minute=0),  # Monday at 11 PM
     },
+    "reconcile-leaderboards": {
+        "task": "apps.fantasy.tasks.leaderboards.reconcile_leaderboards",
+        "schedule": timedelta(hours=1).total_seconds(),
+    },
 }
 
 
@@ -0,0 +1,32 @@
+"""
+orjson-backed JSON parsing for the API.
+
+ORJSONParser is the project-wide DRF JSON parser. orjson decodes the request
+body directly from bytes and, like DRF with STRICT_JSON, rejects NaN and
+Infinity. orjson is an optional dependency; without it parsing falls back to
+JSONParser.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser parsing through orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,79 @@
+"""
+orjson-backed JSON rendering for the API.
+
+ORJSONRenderer is the project-wide DRF renderer. It produces JSON equivalent
+to DRF's JSONRenderer: compact separators, UTF-8, UUIDs as hyphenated strings,
+and datetimes, Decimals and anything else orjson does not serialize itself
+passed to DRF's JSONEncoder. The bytes are not always identical: orjson writes
+some floats differently (1e16 rather than 1e+16, 2.5e-7 rather than 2.5e-07)
+and leaves U+2028/U+2029 unescaped, all of which parse to the same values.
+
+Data orjson cannot render faithfully is handed to JSONRenderer instead:
+integers beyond 64 bits, and NaN or infinite floats, which orjson would write
+as null. Under STRICT_JSON (the default) those raise ValueError as before.
+orjson is an optional dependency; without it rendering falls back to
+JSONRenderer.
+"""
+
+import math
+from typing import Any
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Datetimes go through DRF's encoder so they keep its format (millisecond
+# precision, "Z" for UTC); integer dict keys are allowed like json.dumps does
+_drf_encoder = JSONEncoder()
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _has_non_finite(data: Any) -> bool:
+    """Whether data holds a NaN or infinite float in any nested dict, list or tuple"""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def render_json(data: Any) -> bytes:
+    """Render data to compact UTF-8 JSON, equivalent to DRF's JSONRenderer output"""
+    if orjson is not None:
+        try:
+            body = orjson.dumps(
+                data, default=_drf_encoder.default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the json module renders
+            return JSONRenderer().render(data)
+        # orjson writes NaN and Infinity as null; only then is the data walked
+        if b"null" not in body or not _has_non_finite(data):
+            return body
+    return JSONRenderer().render(data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer rendering through orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(
+            accepted_media_type or "", renderer_context or {}
+        ):
+            # Indented output (e.g. "Accept: application/json; indent=4")
+            # keeps DRF's formatting
+            return super().render(data, accepted_media_type, renderer_context)
+        return render_json(data)